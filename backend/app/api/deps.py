@@ -4,41 +4,129 @@ from uuid import UUID
 
 from fastapi import Depends, Header, HTTPException, Request
 
-from app.core.security import decode_access_token
+from app.core.security import VerifiedTokenCache, decode_access_token
 from app.core.settings import Settings
-from app.data.db import Database
-from app.data.repositories.ideas import PostgresIdeaRepository
-from app.data.repositories.swipes import PostgresSwipeRepository
-from app.data.repositories.users import PostgresUserRepository
+from app.data.db import AsyncDatabase, Database
+from app.data.idea_cache import IdeaCache
+from app.data.oidc import OidcVerifier
+from app.data.repositories.idea_media import AsyncPostgresIdeaMediaRepository, PostgresIdeaMediaRepository
+from app.data.repositories.ideas import AsyncPostgresIdeaRepository, PostgresIdeaRepository
+from app.data.repositories.swipes import AsyncPostgresSwipeRepository, PostgresSwipeRepository
+from app.data.repositories.users import AsyncPostgresUserRepository, PostgresUserRepository
+from app.data.seen_ideas import SeenIdeaCache
+from app.data.swipe_buffer import SwipeWriteBuffer
+from app.data.user_cache import UserCache
 
 
-def get_settings(request: Request) -> Settings:
+# None of these block, so they are `async def`: FastAPI then resolves them on the
+# event loop instead of dispatching each one to the threadpool.
+
+
+async def get_settings(request: Request) -> Settings:
     return request.app.state.settings
 
 
-def get_db(request: Request) -> Database:
+async def get_db(request: Request) -> Database:
     return request.app.state.db
 
 
-def users_repo(db: Database = Depends(get_db)) -> PostgresUserRepository:
-    return PostgresUserRepository(db)
+async def get_async_db(request: Request) -> AsyncDatabase:
+    return request.app.state.async_db
+
+
+async def get_token_cache(request: Request) -> VerifiedTokenCache:
+    return request.app.state.token_cache
+
+
+async def get_idea_cache(request: Request) -> IdeaCache:
+    return request.app.state.idea_cache
+
+
+async def get_user_cache(request: Request) -> UserCache:
+    return request.app.state.user_cache
+
+
+async def get_seen_ideas(request: Request) -> SeenIdeaCache:
+    return request.app.state.seen_ideas
+
+
+async def get_oidc_verifier(request: Request) -> OidcVerifier | None:
+    return request.app.state.oidc_verifier
+
+
+async def get_swipe_buffer(request: Request) -> SwipeWriteBuffer | None:
+    return request.app.state.swipe_buffer
 
 
-def ideas_repo(db: Database = Depends(get_db)) -> PostgresIdeaRepository:
-    return PostgresIdeaRepository(db)
+async def users_repo(
+    db: Database = Depends(get_db),
+    cache: UserCache = Depends(get_user_cache),
+) -> PostgresUserRepository:
+    return PostgresUserRepository(db, cache=cache)
 
 
-def swipes_repo(db: Database = Depends(get_db)) -> PostgresSwipeRepository:
+async def ideas_repo(
+    db: Database = Depends(get_db),
+    cache: IdeaCache = Depends(get_idea_cache),
+) -> PostgresIdeaRepository:
+    return PostgresIdeaRepository(db, cache=cache)
+
+
+async def idea_media_repo(
+    db: Database = Depends(get_db),
+    cache: IdeaCache = Depends(get_idea_cache),
+) -> PostgresIdeaMediaRepository:
+    return PostgresIdeaMediaRepository(db, cache=cache)
+
+
+async def swipes_repo(db: Database = Depends(get_db)) -> PostgresSwipeRepository:
     return PostgresSwipeRepository(db)
 
 
-def require_user_id(
+async def async_users_repo(
+    db: AsyncDatabase = Depends(get_async_db),
+    cache: UserCache = Depends(get_user_cache),
+) -> AsyncPostgresUserRepository:
+    return AsyncPostgresUserRepository(db, cache=cache)
+
+
+async def async_ideas_repo(
+    db: AsyncDatabase = Depends(get_async_db),
+    seen: SeenIdeaCache = Depends(get_seen_ideas),
+    cache: IdeaCache = Depends(get_idea_cache),
+    buffer: SwipeWriteBuffer | None = Depends(get_swipe_buffer),
+) -> AsyncPostgresIdeaRepository:
+    return AsyncPostgresIdeaRepository(db, seen=seen, cache=cache, buffer=buffer)
+
+
+async def async_idea_media_repo(
+    db: AsyncDatabase = Depends(get_async_db),
+    cache: IdeaCache = Depends(get_idea_cache),
+) -> AsyncPostgresIdeaMediaRepository:
+    return AsyncPostgresIdeaMediaRepository(db, cache=cache)
+
+
+async def async_swipes_repo(
+    db: AsyncDatabase = Depends(get_async_db),
+    seen: SeenIdeaCache = Depends(get_seen_ideas),
+    cache: IdeaCache = Depends(get_idea_cache),
+    buffer: SwipeWriteBuffer | None = Depends(get_swipe_buffer),
+) -> AsyncPostgresSwipeRepository:
+    return AsyncPostgresSwipeRepository(db, seen=seen, cache=cache, buffer=buffer)
+
+
+async def require_user_id(
     authorization: str | None = Header(default=None),
     settings: Settings = Depends(get_settings),
+    token_cache: VerifiedTokenCache = Depends(get_token_cache),
 ) -> UUID:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing bearer token")
     token = authorization.removeprefix("Bearer ").strip()
+    cached = token_cache.get(token)
+    if cached is not None:
+        return UUID(cached)
+
     try:
         claims = decode_access_token(
             token=token,
@@ -51,12 +139,17 @@ def require_user_id(
 
     sub = claims.get("sub")
     try:
-        return UUID(str(sub))
+        user_id = UUID(str(sub))
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token subject")
+    # Tokens without an expiry are valid forever as far as jose is concerned; don't pin those.
+    exp = claims.get("exp")
+    if isinstance(exp, (int, float)):
+        token_cache.put(token, subject=str(user_id), expires_at=exp)
+    return user_id
 
 
-def require_admin_key(
+async def require_admin_key(
     x_admin_key: str | None = Header(default=None, alias="X-Admin-Key"),
     settings: Settings = Depends(get_settings),
 ) -> None:
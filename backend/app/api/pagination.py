@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException
+
+from app.domain.models import KeysetCursor
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(cursor: KeysetCursor) -> str:
+    raw = json.dumps([cursor.created_at.isoformat(), str(cursor.id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str | None) -> KeysetCursor | None:
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        created_at, idea_id = json.loads(raw)
+        return KeysetCursor(created_at=datetime.fromisoformat(created_at), id=UUID(idea_id))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
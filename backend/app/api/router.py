@@ -1,10 +1,11 @@
 from fastapi import APIRouter
 
-from app.api.routes import auth, feed, health, ideas, me, my_ideas, stats, swipes
+from app.api.routes import auth, feed, health, ideas, me, metrics, my_ideas, stats, swipes
 
 
 api_router = APIRouter()
 api_router.include_router(health.router)
+api_router.include_router(metrics.router)
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(me.router, prefix="/me", tags=["me"])
 api_router.include_router(my_ideas.router, prefix="/me/ideas", tags=["my-ideas"])
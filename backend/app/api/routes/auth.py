@@ -3,10 +3,10 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
-from app.api.deps import get_settings, users_repo
+from app.api.deps import get_oidc_verifier, get_settings, users_repo
 from app.core.security import create_access_token
 from app.core.settings import Settings
-from app.data.oidc import OidcConfig, OidcVerifier
+from app.data.oidc import OidcVerifier
 from app.domain.ports import UserRepository
 from app.domain.usecases.login import login_with_subject
 
@@ -30,16 +30,14 @@ def login(
     body: LoginRequest,
     settings: Settings = Depends(get_settings),
     users: UserRepository = Depends(users_repo),
+    verifier: OidcVerifier | None = Depends(get_oidc_verifier),
 ) -> LoginResponse:
-    if not settings.oidc_issuer or not settings.oidc_jwks_url or not settings.oidc_audience:
+    if verifier is None:
         raise HTTPException(status_code=503, detail="OIDC is not configured")
 
     if settings.oidc_provider and body.provider != settings.oidc_provider:
         raise HTTPException(status_code=400, detail="Unsupported provider")
 
-    verifier = OidcVerifier(
-        OidcConfig(issuer=settings.oidc_issuer, jwks_url=settings.oidc_jwks_url, audience=settings.oidc_audience)
-    )
     try:
         claims = verifier.verify_id_token(body.id_token)
     except Exception:
@@ -2,25 +2,36 @@ from __future__ import annotations
 
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
-from app.api.deps import get_db, get_settings, ideas_repo, require_user_id
+from app.api.deps import (
+    async_idea_media_repo,
+    async_ideas_repo,
+    async_swipes_repo,
+    async_users_repo,
+    get_settings,
+    require_user_id,
+)
+from app.api.routes.swipes import CreateSwipeRequest, SwipeResponse, to_swipe_response
 from app.core.settings import Settings
-from app.data.db import Database
-from app.data.repositories.idea_media import PostgresIdeaMediaRepository
-from app.domain.ports import IdeaRepository
-from app.domain.usecases.feed import get_next_idea
-from app.services.s3_presign import presign_get
+from app.data.repositories.swipes import DuplicateSwipeError, UnknownIdeaError
+from app.domain.models import Idea, IdeaMedia
+from app.domain.ports import (
+    AsyncIdeaMediaRepository,
+    AsyncIdeaRepository,
+    AsyncSwipeRepository,
+    AsyncUserRepository,
+)
+from app.domain.usecases.feed import get_next_idea, get_next_ideas
+from app.domain.usecases.swipe import record_swipe_and_get_next
+from app.services.s3_presign import presign_get_many
 
 
 router = APIRouter()
 
 
-def _media_repo(db: Database = Depends(get_db)) -> PostgresIdeaMediaRepository:
-    return PostgresIdeaMediaRepository(db)
-
-
 class FeedMediaItem(BaseModel):
     id: str
     media_type: str
@@ -46,33 +57,36 @@ class FeedIdeaResponse(BaseModel):
     media: list[FeedMediaItem] = []
 
 
-def _presign(s3_key: str, settings: Settings) -> str:
-    if not settings.s3_bucket:
-        return s3_key
+class SwipeAndNextResponse(BaseModel):
+    swipe: SwipeResponse
+    next: FeedIdeaResponse | None
+
+
+def _presign_all(s3_keys: list[str], settings: Settings) -> dict[str, str]:
+    if not settings.s3_bucket or not s3_keys:
+        return {}
     try:
-        return presign_get(
+        urls = presign_get_many(
             region=settings.aws_region,
             bucket=settings.s3_bucket,
-            object_key=s3_key,
+            object_keys=s3_keys,
             ttl_seconds=settings.s3_presign_ttl_seconds,
         )
     except Exception:
-        return s3_key
+        return {}
+    return dict(zip(s3_keys, urls))
 
 
-@router.get("/next", response_model=FeedIdeaResponse | None)
-def next_idea(
-    user_id: UUID = Depends(require_user_id),
-    ideas: IdeaRepository = Depends(ideas_repo),
-    media_repo: PostgresIdeaMediaRepository = Depends(_media_repo),
-    settings: Settings = Depends(get_settings),
-) -> FeedIdeaResponse | None:
-    idea = get_next_idea(ideas=ideas, user_id=user_id)
-    if not idea:
-        return None
+async def _to_feed_responses(
+    items: list[tuple[Idea, list[IdeaMedia]]], settings: Settings
+) -> list[FeedIdeaResponse]:
+    s3_keys = [m.s3_key for _, media_items in items for m in media_items]
+    # botocore may refresh credentials over the network while signing, so keep it off the event loop.
+    urls = await run_in_threadpool(_presign_all, s3_keys, settings) if s3_keys else {}
+    return [_to_feed_response(idea, media_items, urls) for idea, media_items in items]
 
-    media_items = media_repo.list_by_idea(idea_id=idea.id)
 
+def _to_feed_response(idea: Idea, media_items: list[IdeaMedia], urls: dict[str, str]) -> FeedIdeaResponse:
     return FeedIdeaResponse(
         id=str(idea.id),
         title=idea.title,
@@ -91,9 +105,77 @@ def next_idea(
             FeedMediaItem(
                 id=str(m.id),
                 media_type=m.media_type,
-                url=_presign(m.s3_key, settings),
+                url=urls.get(m.s3_key, m.s3_key),
                 position=m.position,
             )
             for m in media_items
         ],
     )
+
+
+@router.get("/next", response_model=FeedIdeaResponse | None)
+async def next_idea(
+    user_id: UUID = Depends(require_user_id),
+    ideas: AsyncIdeaRepository = Depends(async_ideas_repo),
+    users: AsyncUserRepository = Depends(async_users_repo),
+    media_repo: AsyncIdeaMediaRepository = Depends(async_idea_media_repo),
+    settings: Settings = Depends(get_settings),
+) -> FeedIdeaResponse | None:
+    idea = await get_next_idea(ideas=ideas, users=users, user_id=user_id)
+    if not idea:
+        return None
+
+    media_by_idea = await media_repo.list_by_ideas(idea_ids=[idea.id])
+    responses = await _to_feed_responses([(idea, media_by_idea[idea.id])], settings)
+    return responses[0]
+
+
+@router.get("/batch", response_model=list[FeedIdeaResponse])
+async def next_ideas_batch(
+    limit: int = Query(default=10, ge=1, le=50),
+    exclude: list[UUID] = Query(default=[], max_length=200),
+    user_id: UUID = Depends(require_user_id),
+    ideas: AsyncIdeaRepository = Depends(async_ideas_repo),
+    users: AsyncUserRepository = Depends(async_users_repo),
+    media_repo: AsyncIdeaMediaRepository = Depends(async_idea_media_repo),
+    settings: Settings = Depends(get_settings),
+) -> list[FeedIdeaResponse]:
+    """Return a deck of unseen ideas; `exclude` lists ids the client already holds."""
+    deck = await get_next_ideas(
+        ideas=ideas,
+        users=users,
+        user_id=user_id,
+        limit=limit,
+        exclude_ids=exclude,
+    )
+    media_by_idea = await media_repo.list_by_ideas(idea_ids=[idea.id for idea in deck])
+    return await _to_feed_responses([(idea, media_by_idea.get(idea.id, [])) for idea in deck], settings)
+
+
+@router.post("/swipe", response_model=SwipeAndNextResponse)
+async def swipe_and_next(
+    body: CreateSwipeRequest,
+    user_id: UUID = Depends(require_user_id),
+    swipes: AsyncSwipeRepository = Depends(async_swipes_repo),
+    users: AsyncUserRepository = Depends(async_users_repo),
+    settings: Settings = Depends(get_settings),
+) -> SwipeAndNextResponse:
+    """Record a swipe and return the next card in a single round trip."""
+    try:
+        swipe, card = await record_swipe_and_get_next(
+            swipes=swipes,
+            users=users,
+            user_id=user_id,
+            idea_id=body.idea_id,
+            direction=body.direction,
+            decision_time_ms=body.decision_time_ms,
+        )
+    except DuplicateSwipeError:
+        raise HTTPException(status_code=409, detail="Swipe already recorded")
+    except UnknownIdeaError:
+        raise HTTPException(status_code=404, detail="Idea not found")
+    except ValueError as ex:
+        raise HTTPException(status_code=422, detail=str(ex))
+
+    next_card = (await _to_feed_responses([(card.idea, card.media)], settings))[0] if card else None
+    return SwipeAndNextResponse(swipe=to_swipe_response(swipe), next=next_card)
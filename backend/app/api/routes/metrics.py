@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import anyio.to_thread
+from fastapi import APIRouter, Depends
+
+from app.api.deps import (
+    get_async_db,
+    get_db,
+    get_idea_cache,
+    get_oidc_verifier,
+    get_swipe_buffer,
+    get_token_cache,
+    get_user_cache,
+    require_admin_key,
+)
+from app.core.security import VerifiedTokenCache
+from app.data.db import AsyncDatabase, Database
+from app.data.idea_cache import IdeaCache
+from app.data.oidc import OidcVerifier
+from app.data.swipe_buffer import SwipeWriteBuffer
+from app.data.user_cache import UserCache
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", tags=["metrics"], dependencies=[Depends(require_admin_key)])
+async def metrics(
+    idea_cache: IdeaCache = Depends(get_idea_cache),
+    db: Database = Depends(get_db),
+    async_db: AsyncDatabase = Depends(get_async_db),
+    swipe_buffer: SwipeWriteBuffer | None = Depends(get_swipe_buffer),
+    token_cache: VerifiedTokenCache = Depends(get_token_cache),
+    oidc_verifier: OidcVerifier | None = Depends(get_oidc_verifier),
+    user_cache: UserCache = Depends(get_user_cache),
+) -> dict:
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    return {
+        "token_cache": token_cache.stats(),
+        "idea_cache": idea_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "db_pool": db.stats(),
+        "db_replica_pool": db.replica_stats(),
+        "async_db_pool": async_db.stats(),
+        "async_db_replica_pool": async_db.replica_stats(),
+        "threadpool": {
+            "total": int(limiter.total_tokens),
+            "in_use": limiter.borrowed_tokens,
+            "waiting": limiter.statistics().tasks_waiting,
+        },
+        "swipe_buffer": swipe_buffer.stats() if swipe_buffer is not None else None,
+        "jwks": oidc_verifier.jwks_stats() if oidc_verifier is not None else None,
+    }
@@ -2,25 +2,23 @@ from __future__ import annotations
 
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel, Field
 
-from app.api.deps import get_settings, ideas_repo, require_user_id
+from app.api.deps import get_settings, idea_media_repo, ideas_repo, require_user_id
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 from app.core.settings import Settings
 from app.data.repositories.idea_media import PostgresIdeaMediaRepository
-from app.api.deps import get_db
-from app.data.db import Database
+from app.domain.models import IdeaCard, KeysetCursor
 from app.domain.ports import IdeaRepository
-from app.services.s3_presign import presign_get, presign_put_idea_media
+from app.services.s3_presign import presign_get, presign_get_many, presign_put_idea_media
 
 router = APIRouter()
 
+_DEFAULT_PAGE_SIZE = 50
 
-# ── helpers ───────────────────────────────────────────────────────
-
-def _media_repo(db: Database = Depends(get_db)) -> PostgresIdeaMediaRepository:
-    return PostgresIdeaMediaRepository(db)
 
+# ── helpers ───────────────────────────────────────────────────────
 
 def _presign_media_url(s3_key: str, settings: Settings) -> str:
     if not settings.s3_bucket:
@@ -36,6 +34,21 @@ def _presign_media_url(s3_key: str, settings: Settings) -> str:
         return s3_key
 
 
+def _presign_media_urls(s3_keys: list[str], settings: Settings) -> dict[str, str]:
+    if not settings.s3_bucket or not s3_keys:
+        return {}
+    try:
+        urls = presign_get_many(
+            region=settings.aws_region,
+            bucket=settings.s3_bucket,
+            object_keys=s3_keys,
+            ttl_seconds=settings.s3_presign_ttl_seconds,
+        )
+    except Exception:
+        return {}
+    return dict(zip(s3_keys, urls))
+
+
 # ── request / response models ────────────────────────────────────
 
 class MediaResponse(BaseModel):
@@ -107,46 +120,68 @@ class MediaUploadUrlResponse(BaseModel):
     headers: dict[str, str]
 
 
+def _to_my_idea_responses(cards: list[IdeaCard], settings: Settings) -> list[MyIdeaResponse]:
+    urls = _presign_media_urls([m.s3_key for card in cards for m in card.media], settings)
+    return [_to_my_idea_response(card, urls) for card in cards]
+
+
+def _to_my_idea_response(card: IdeaCard, urls: dict[str, str]) -> MyIdeaResponse:
+    idea = card.idea
+    return MyIdeaResponse(
+        id=str(idea.id),
+        title=idea.title,
+        short_pitch=idea.short_pitch,
+        category=idea.category,
+        tags=idea.tags,
+        media_url=idea.media_url,
+        one_liner=idea.one_liner,
+        problem=idea.problem,
+        solution=idea.solution,
+        audience=idea.audience,
+        differentiator=idea.differentiator,
+        stage=idea.stage,
+        links=idea.links,
+        status=idea.status,
+        created_at=idea.created_at.isoformat(),
+        media=[
+            MediaResponse(
+                id=str(m.id),
+                media_type=m.media_type,
+                url=urls.get(m.s3_key, m.s3_key),
+                position=m.position,
+            )
+            for m in card.media
+        ],
+    )
+
+
 # ── endpoints ────────────────────────────────────────────────────
 
 @router.get("", response_model=list[MyIdeaResponse])
 def list_my_ideas(
+    response: Response,
+    limit: int | None = Query(default=None, ge=1, le=100),
+    cursor: str | None = Query(default=None),
     user_id: UUID = Depends(require_user_id),
     ideas: IdeaRepository = Depends(ideas_repo),
-    media_repo: PostgresIdeaMediaRepository = Depends(_media_repo),
     settings: Settings = Depends(get_settings),
 ) -> list[MyIdeaResponse]:
-    rows = ideas.list_by_author(author_id=user_id)
-    result: list[MyIdeaResponse] = []
-    for idea in rows:
-        media_items = media_repo.list_by_idea(idea_id=idea.id)
-        result.append(MyIdeaResponse(
-            id=str(idea.id),
-            title=idea.title,
-            short_pitch=idea.short_pitch,
-            category=idea.category,
-            tags=idea.tags,
-            media_url=idea.media_url,
-            one_liner=idea.one_liner,
-            problem=idea.problem,
-            solution=idea.solution,
-            audience=idea.audience,
-            differentiator=idea.differentiator,
-            stage=idea.stage,
-            links=idea.links,
-            status=idea.status,
-            created_at=idea.created_at.isoformat(),
-            media=[
-                MediaResponse(
-                    id=str(m.id),
-                    media_type=m.media_type,
-                    url=_presign_media_url(m.s3_key, settings),
-                    position=m.position,
-                )
-                for m in media_items
-            ],
-        ))
-    return result
+    """Newest first.
+
+    With `limit` or `cursor`, one page is returned and the next page's cursor,
+    if any, is sent in X-Next-Cursor. Without either, every idea is returned,
+    as clients that don't page expect.
+    """
+    if limit is None and cursor is None:
+        return _to_my_idea_responses(ideas.list_cards_by_author(author_id=user_id), settings)
+
+    limit = limit or _DEFAULT_PAGE_SIZE
+    cards = ideas.list_cards_by_author(author_id=user_id, limit=limit + 1, after=decode_cursor(cursor))
+    if len(cards) > limit:
+        cards = cards[:limit]
+        last = cards[-1].idea
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(KeysetCursor(created_at=last.created_at, id=last.id))
+    return _to_my_idea_responses(cards, settings)
 
 
 @router.post("", response_model=MyIdeaResponse, status_code=201)
@@ -195,40 +230,12 @@ def get_my_idea(
     idea_id: UUID,
     user_id: UUID = Depends(require_user_id),
     ideas: IdeaRepository = Depends(ideas_repo),
-    media_repo: PostgresIdeaMediaRepository = Depends(_media_repo),
     settings: Settings = Depends(get_settings),
 ) -> MyIdeaResponse:
-    idea = ideas.get_by_id(idea_id=idea_id)
-    if not idea or idea.author_id != user_id:
+    card = ideas.get_card(idea_id=idea_id)
+    if not card or card.idea.author_id != user_id:
         raise HTTPException(status_code=404, detail="Idea not found")
-
-    media_items = media_repo.list_by_idea(idea_id=idea.id)
-    return MyIdeaResponse(
-        id=str(idea.id),
-        title=idea.title,
-        short_pitch=idea.short_pitch,
-        category=idea.category,
-        tags=idea.tags,
-        media_url=idea.media_url,
-        one_liner=idea.one_liner,
-        problem=idea.problem,
-        solution=idea.solution,
-        audience=idea.audience,
-        differentiator=idea.differentiator,
-        stage=idea.stage,
-        links=idea.links,
-        status=idea.status,
-        created_at=idea.created_at.isoformat(),
-        media=[
-            MediaResponse(
-                id=str(m.id),
-                media_type=m.media_type,
-                url=_presign_media_url(m.s3_key, settings),
-                position=m.position,
-            )
-            for m in media_items
-        ],
-    )
+    return _to_my_idea_responses([card], settings)[0]
 
 
 @router.put("/{idea_id}", response_model=MyIdeaResponse)
@@ -358,7 +365,7 @@ def register_media(
     body: _RegisterMediaRequest,
     user_id: UUID = Depends(require_user_id),
     ideas: IdeaRepository = Depends(ideas_repo),
-    media_repo: PostgresIdeaMediaRepository = Depends(_media_repo),
+    media_repo: PostgresIdeaMediaRepository = Depends(idea_media_repo),
     settings: Settings = Depends(get_settings),
 ) -> MediaResponse:
     """After uploading to S3, client calls this to register the media in DB."""
@@ -394,7 +401,7 @@ def delete_media(
     media_id: UUID,
     user_id: UUID = Depends(require_user_id),
     ideas: IdeaRepository = Depends(ideas_repo),
-    media_repo: PostgresIdeaMediaRepository = Depends(_media_repo),
+    media_repo: PostgresIdeaMediaRepository = Depends(idea_media_repo),
 ) -> Response:
     idea = ideas.get_by_id(idea_id=idea_id)
     if not idea or idea.author_id != user_id:
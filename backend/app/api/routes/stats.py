@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 
 from app.api.deps import ideas_repo, require_user_id, swipes_repo
+from app.domain.models import DecisionTimeQuantiles, SwipeBucket
 from app.domain.ports import IdeaRepository, SwipeRepository
 
 
@@ -28,6 +30,12 @@ class UserStatsResponse(BaseModel):
     by_category: list[CategoryStat]
 
 
+class DecisionTimeResponse(BaseModel):
+    p50_ms: int
+    p90_ms: int
+    p99_ms: int
+
+
 class IdeaStatResponse(BaseModel):
     idea_id: str
     title: str
@@ -35,6 +43,9 @@ class IdeaStatResponse(BaseModel):
     total_vibes: int
     total_no_vibes: int
     vibe_rate: float
+    avg_decision_time_ms: float | None = None
+    decision_time: DecisionTimeResponse | None = None
+    category_decision_time: DecisionTimeResponse | None = None
 
 
 class MyIdeasStatsResponse(BaseModel):
@@ -43,6 +54,56 @@ class MyIdeasStatsResponse(BaseModel):
     total_vibes: int
 
 
+class TimeseriesPoint(BaseModel):
+    bucket: str
+    total: int
+    vibes: int
+    no_vibes: int
+    vibe_rate: float
+    avg_decision_time_ms: float | None
+
+
+class IdeaTimeseriesResponse(BaseModel):
+    idea_id: str
+    granularity: str
+    points: list[TimeseriesPoint]
+
+
+_BUCKET_STEP = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+_DEFAULT_SPAN = {"hour": timedelta(hours=48), "day": timedelta(days=30)}
+_MAX_SPAN = {"hour": timedelta(days=31), "day": timedelta(days=366)}
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _bucket_start(value: datetime, granularity: str) -> datetime:
+    value = value.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        value = value.replace(hour=0)
+    return value
+
+
+def _to_decision_time_response(quantiles: DecisionTimeQuantiles | None) -> DecisionTimeResponse | None:
+    if quantiles is None:
+        return None
+    return DecisionTimeResponse(p50_ms=quantiles.p50_ms, p90_ms=quantiles.p90_ms, p99_ms=quantiles.p99_ms)
+
+
+def _to_timeseries_point(bucket: SwipeBucket) -> TimeseriesPoint:
+    return TimeseriesPoint(
+        bucket=_as_utc(bucket.bucket).isoformat(),
+        total=bucket.total,
+        vibes=bucket.vibes,
+        no_vibes=bucket.no_vibes,
+        vibe_rate=round(bucket.vibes / bucket.total * 100, 1) if bucket.total > 0 else 0.0,
+        avg_decision_time_ms=bucket.avg_decision_time_ms,
+    )
+
+
 @router.get("/me", response_model=UserStatsResponse)
 def get_my_stats(
     user_id: UUID = Depends(require_user_id),
@@ -75,23 +136,23 @@ def get_my_stats(
 @router.get("/my-ideas", response_model=MyIdeasStatsResponse)
 def get_my_ideas_stats(
     user_id: UUID = Depends(require_user_id),
-    ideas: IdeaRepository = Depends(ideas_repo),
     swipes: SwipeRepository = Depends(swipes_repo),
 ) -> MyIdeasStatsResponse:
-    my_ideas = ideas.list_by_author(author_id=user_id)
     idea_stats: list[IdeaStatResponse] = []
     sum_views = 0
     sum_vibes = 0
 
-    for idea in my_ideas:
-        st = swipes.get_idea_stats(idea_id=idea.id)
+    for st in swipes.get_author_idea_stats(author_id=user_id):
         idea_stats.append(IdeaStatResponse(
-            idea_id=str(idea.id),
-            title=idea.title,
+            idea_id=str(st.idea_id),
+            title=st.title or "",
             total_views=st.total_views,
             total_vibes=st.total_vibes,
             total_no_vibes=st.total_no_vibes,
             vibe_rate=st.vibe_rate,
+            avg_decision_time_ms=st.avg_decision_time_ms,
+            decision_time=_to_decision_time_response(st.decision_time),
+            category_decision_time=_to_decision_time_response(st.category_decision_time),
         ))
         sum_views += st.total_views
         sum_vibes += st.total_vibes
@@ -101,3 +162,45 @@ def get_my_ideas_stats(
         total_views=sum_views,
         total_vibes=sum_vibes,
     )
+
+
+@router.get("/my-ideas/{idea_id}/timeseries", response_model=IdeaTimeseriesResponse)
+def get_my_idea_timeseries(
+    idea_id: UUID,
+    granularity: str = Query(default="day", pattern="^(hour|day)$"),
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    user_id: UUID = Depends(require_user_id),
+    ideas: IdeaRepository = Depends(ideas_repo),
+    swipes: SwipeRepository = Depends(swipes_repo),
+) -> IdeaTimeseriesResponse:
+    """Swipes per UTC hour or day for one of the caller's ideas; every bucket in range is listed.
+
+    Without `since` the series starts at the idea's creation, or one default
+    span (48 hours / 30 days) before `until` if that is later.
+    """
+    idea = ideas.get_by_id(idea_id=idea_id)
+    if not idea or idea.author_id != user_id:
+        raise HTTPException(status_code=404, detail="Idea not found")
+
+    until = _as_utc(until) if until else datetime.now(timezone.utc)
+    if since is None:
+        since = max(_as_utc(idea.created_at), until - _DEFAULT_SPAN[granularity])
+    since = _bucket_start(_as_utc(since), granularity)
+    if since >= until:
+        raise HTTPException(status_code=422, detail="since must be before until")
+    if until - since > _MAX_SPAN[granularity]:
+        raise HTTPException(status_code=422, detail=f"Range too long for {granularity} buckets")
+
+    by_start = {
+        b.bucket: b
+        for b in swipes.get_idea_timeseries(idea_id=idea_id, granularity=granularity, since=since, until=until)
+    }
+    points: list[TimeseriesPoint] = []
+    step = _BUCKET_STEP[granularity]
+    start = since
+    while start < until:
+        points.append(_to_timeseries_point(by_start.get(start) or SwipeBucket(bucket=start)))
+        start += step
+
+    return IdeaTimeseriesResponse(idea_id=str(idea_id), granularity=granularity, points=points)
@@ -3,12 +3,13 @@ from __future__ import annotations
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, Field
+from pydantic import AwareDatetime, BaseModel, Field
 
-from app.api.deps import require_user_id, swipes_repo
-from app.data.repositories.swipes import DuplicateSwipeError
-from app.domain.ports import SwipeRepository
-from app.domain.usecases.swipe import record_swipe
+from app.api.deps import async_swipes_repo, require_user_id
+from app.data.repositories.swipes import DuplicateSwipeError, UnknownIdeaError
+from app.domain.models import NewSwipe, Swipe, SwipeResult
+from app.domain.ports import AsyncSwipeRepository
+from app.domain.usecases.swipe import record_swipe, record_swipes
 
 
 router = APIRouter()
@@ -20,6 +21,14 @@ class CreateSwipeRequest(BaseModel):
     decision_time_ms: int | None = Field(default=None, ge=0)
 
 
+class QueuedSwipeRequest(CreateSwipeRequest):
+    swiped_at: AwareDatetime | None = None
+
+
+class CreateSwipesBatchRequest(BaseModel):
+    swipes: list[QueuedSwipeRequest] = Field(min_length=1, max_length=500)
+
+
 class SwipeResponse(BaseModel):
     id: str
     user_id: str
@@ -29,14 +38,43 @@ class SwipeResponse(BaseModel):
     created_at: str
 
 
+class SwipeResultResponse(BaseModel):
+    idea_id: str
+    status: str  # 'created' | 'duplicate' | 'invalid_idea'
+    swipe: SwipeResponse | None
+
+
+class SwipesBatchResponse(BaseModel):
+    results: list[SwipeResultResponse]
+
+
+def to_swipe_response(swipe: Swipe) -> SwipeResponse:
+    return SwipeResponse(
+        id=str(swipe.id),
+        user_id=str(swipe.user_id),
+        idea_id=str(swipe.idea_id),
+        direction=swipe.direction,
+        decision_time_ms=swipe.decision_time_ms,
+        created_at=swipe.created_at.isoformat(),
+    )
+
+
+def _to_swipe_result_response(result: SwipeResult) -> SwipeResultResponse:
+    return SwipeResultResponse(
+        idea_id=str(result.idea_id),
+        status=result.status,
+        swipe=to_swipe_response(result.swipe) if result.swipe else None,
+    )
+
+
 @router.post("", response_model=SwipeResponse)
-def create_swipe(
+async def create_swipe(
     body: CreateSwipeRequest,
     user_id: UUID = Depends(require_user_id),
-    swipes: SwipeRepository = Depends(swipes_repo),
+    swipes: AsyncSwipeRepository = Depends(async_swipes_repo),
 ) -> SwipeResponse:
     try:
-        swipe = record_swipe(
+        swipe = await record_swipe(
             swipes=swipes,
             user_id=user_id,
             idea_id=body.idea_id,
@@ -45,14 +83,36 @@ def create_swipe(
         )
     except DuplicateSwipeError:
         raise HTTPException(status_code=409, detail="Swipe already recorded")
+    except UnknownIdeaError:
+        raise HTTPException(status_code=404, detail="Idea not found")
     except ValueError as ex:
         raise HTTPException(status_code=422, detail=str(ex))
 
-    return SwipeResponse(
-        id=str(swipe.id),
-        user_id=str(swipe.user_id),
-        idea_id=str(swipe.idea_id),
-        direction=swipe.direction,
-        decision_time_ms=swipe.decision_time_ms,
-        created_at=swipe.created_at.isoformat(),
-    )
+    return to_swipe_response(swipe)
+
+
+@router.post("/batch", response_model=SwipesBatchResponse)
+async def create_swipes_batch(
+    body: CreateSwipesBatchRequest,
+    user_id: UUID = Depends(require_user_id),
+    swipes: AsyncSwipeRepository = Depends(async_swipes_repo),
+) -> SwipesBatchResponse:
+    """Record queued swipes in one go; results follow the order of `swipes`."""
+    try:
+        results = await record_swipes(
+            swipes=swipes,
+            user_id=user_id,
+            items=[
+                NewSwipe(
+                    idea_id=item.idea_id,
+                    direction=item.direction,
+                    decision_time_ms=item.decision_time_ms,
+                    swiped_at=item.swiped_at,
+                )
+                for item in body.swipes
+            ],
+        )
+    except ValueError as ex:
+        raise HTTPException(status_code=422, detail=str(ex))
+
+    return SwipesBatchResponse(results=[_to_swipe_result_response(r) for r in results])
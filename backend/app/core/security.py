@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 
 from jose import jwt
@@ -19,3 +23,66 @@ def create_access_token(*, subject: str, secret: str, issuer: str, audience: str
 
 def decode_access_token(*, token: str, secret: str, issuer: str, audience: str) -> dict:
     return jwt.decode(token, secret, algorithms=["HS256"], issuer=issuer, audience=audience)
+
+
+class VerifiedTokenCache:
+    """Size-bounded LRU of access tokens that already passed `decode_access_token`.
+
+    Entries are keyed by the token's SHA-256 digest and hold the subject until
+    the token's `exp`, so a cached token is still rejected once it expires.
+    Issuer, audience and secret are fixed per process; call `clear()` when the
+    signing secret is rotated so tokens signed with the old one are re-checked.
+    """
+
+    def __init__(self, *, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[bytes, tuple[str, float]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, token: str) -> str | None:
+        key = _token_digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            subject, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return subject
+
+    def put(self, token: str, *, subject: str, expires_at: float) -> None:
+        if self._max_entries <= 0:
+            return
+        key = _token_digest(token)
+        with self._lock:
+            self._entries[key] = (subject, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
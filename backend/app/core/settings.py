@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -6,6 +8,22 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
     database_url: str = Field(alias="DATABASE_URL")
+    db_pool_min_size: int = Field(default=1, alias="DB_POOL_MIN_SIZE")
+    db_pool_max_size: int = Field(default=10, alias="DB_POOL_MAX_SIZE")
+    db_pool_max_waiting: int = Field(default=0, alias="DB_POOL_MAX_WAITING")
+    db_pool_timeout_seconds: float = Field(default=30.0, alias="DB_POOL_TIMEOUT_SECONDS")
+    db_pool_max_lifetime_seconds: float = Field(default=3600.0, alias="DB_POOL_MAX_LIFETIME_SECONDS")
+    db_pool_max_idle_seconds: float = Field(default=600.0, alias="DB_POOL_MAX_IDLE_SECONDS")
+    db_prepared_statements: bool = Field(default=True, alias="DB_PREPARED_STATEMENTS")
+    # Optional streaming replica for reads that tolerate lag (stats, profiles, author listings).
+    database_replica_url: str | None = Field(default=None, alias="DATABASE_REPLICA_URL")
+    db_replica_sticky_seconds: float = Field(default=5.0, alias="DB_REPLICA_STICKY_SECONDS")
+    db_replica_retry_seconds: float = Field(default=30.0, alias="DB_REPLICA_RETRY_SECONDS")
+    db_replica_timeout_seconds: float = Field(default=1.0, alias="DB_REPLICA_TIMEOUT_SECONDS")
+    async_db_pool_min_size: int = Field(default=1, alias="ASYNC_DB_POOL_MIN_SIZE")
+    async_db_pool_max_size: int = Field(default=10, alias="ASYNC_DB_POOL_MAX_SIZE")
+    # Concurrent sync handlers; defaults to DB_POOL_MAX_SIZE so threads never queue on the pool.
+    threadpool_size: int | None = Field(default=None, alias="THREADPOOL_SIZE")
     app_env: str = Field(default="local", alias="APP_ENV")
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
 
@@ -15,11 +33,32 @@ class Settings(BaseSettings):
     jwt_issuer: str = Field(default="vibecheck", alias="JWT_ISSUER")
     jwt_audience: str = Field(default="vibecheck-api", alias="JWT_AUDIENCE")
     jwt_ttl_seconds: int = Field(default=7 * 24 * 60 * 60, alias="JWT_TTL_SECONDS")
+    # Verified access tokens kept in memory so repeat requests skip the JWT decode; 0 disables.
+    token_cache_max_entries: int = Field(default=10_000, alias="TOKEN_CACHE_MAX_ENTRIES")
 
     oidc_issuer: str | None = Field(default=None, alias="OIDC_ISSUER")
     oidc_jwks_url: str | None = Field(default=None, alias="OIDC_JWKS_URL")
     oidc_audience: str | None = Field(default=None, alias="OIDC_AUDIENCE")
     oidc_provider: str | None = Field(default=None, alias="OIDC_PROVIDER")
+    # Used when the JWKS response carries no Cache-Control max-age.
+    oidc_jwks_max_age_seconds: float = Field(default=300.0, alias="OIDC_JWKS_MAX_AGE_SECONDS")
+
+    idea_cache_max_entries: int = Field(default=5_000, alias="IDEA_CACHE_MAX_ENTRIES")
+    user_cache_max_entries: int = Field(default=10_000, alias="USER_CACHE_MAX_ENTRIES")
+    seen_ideas_max_users: int = Field(default=10_000, alias="SEEN_IDEAS_MAX_USERS")
+    seen_ideas_max_per_user: int = Field(default=5_000, alias="SEEN_IDEAS_MAX_PER_USER")
+    # direct: one INSERT per swipe. group: swipes are batched and each request
+    # waits for its batch to commit. write_behind: requests return once the
+    # swipe is queued; queued swipes are lost if the process dies without a
+    # clean shutdown.
+    swipe_write_mode: Literal["direct", "group", "write_behind"] = Field(default="direct", alias="SWIPE_WRITE_MODE")
+    swipe_buffer_max_batch: int = Field(default=500, alias="SWIPE_BUFFER_MAX_BATCH")
+    swipe_buffer_flush_ms: int = Field(default=20, alias="SWIPE_BUFFER_FLUSH_MS")
+    swipe_buffer_max_pending: int = Field(default=10_000, alias="SWIPE_BUFFER_MAX_PENDING")
+    # How long shutdown keeps retrying failed write-behind flushes before spooling the rest.
+    swipe_buffer_drain_seconds: float = Field(default=30.0, alias="SWIPE_BUFFER_DRAIN_SECONDS")
+    # Write-behind swipes that could not be stored; replay with `python -m scripts.replay_swipe_dead_letters`.
+    swipe_dead_letter_path: str = Field(default="swipe-dead-letters.jsonl", alias="SWIPE_DEAD_LETTER_PATH")
 
     admin_api_key: str | None = Field(default=None, alias="ADMIN_API_KEY")
 
@@ -1,21 +1,87 @@
 from __future__ import annotations
 
-from psycopg_pool import ConnectionPool
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import TypeVar
+from uuid import UUID
+
+import psycopg
+from psycopg_pool import AsyncConnectionPool, ConnectionPool, PoolTimeout
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    min_size: int = 1
+    max_size: int = 10
+    max_waiting: int = 0  # 0 queues without bound; otherwise extra requests fail fast
+    timeout: float = 30.0
+    max_lifetime: float = 3600.0
+    max_idle: float = 600.0
+    # Server-side prepared statements; see app/data/statements.py.
+    prepared_statements: bool = True
+
+
+@dataclass(frozen=True)
+class ReplicaConfig:
+    dsn: str
+    # Reads by a user who wrote within this window go to the primary.
+    sticky_seconds: float = 5.0
+    # After a failed checkout or a dropped connection, skip the replica for this long.
+    retry_seconds: float = 30.0
+    timeout: float = 1.0
 
 
 class Database:
-    def __init__(self, dsn: str) -> None:
+    """Primary pool plus an optional read replica.
+
+    Repositories use `pool()` for writes and for reads that must see them, and
+    `read()` for reads a replica may serve; writes made on behalf of a user are
+    reported with `note_write()`. Pass the same `router` to `AsyncDatabase` so
+    a write on either pool keeps that user's reads on the primary.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        *,
+        config: PoolConfig | None = None,
+        replica: ReplicaConfig | None = None,
+        router: ReplicaRouter | None = None,
+    ) -> None:
         self._dsn = dsn
+        self._config = config or PoolConfig()
+        self._replica = replica
+        self._router = router or (ReplicaRouter(replica) if replica is not None else None)
         self._pool: ConnectionPool | None = None
+        self._replica_pool: ConnectionPool | None = None
 
     def open(self) -> None:
         if self._pool is not None:
             return
-        self._pool = ConnectionPool(conninfo=self._dsn, min_size=1, max_size=10, open=True)
+        self._pool = ConnectionPool(conninfo=self._dsn, name="db", open=True, **_pool_kwargs(self._config))
+        if self._replica is not None:
+            self._replica_pool = ConnectionPool(
+                conninfo=self._replica.dsn,
+                name="db_replica",
+                open=True,
+                **_pool_kwargs(self._config, timeout=self._replica.timeout),
+            )
 
     def close(self) -> None:
         if self._pool is None:
             return
+        if self._replica_pool is not None:
+            self._replica_pool.close()
+            self._replica_pool = None
         self._pool.close()
         self._pool = None
 
@@ -23,3 +89,162 @@ class Database:
         if self._pool is None:
             raise RuntimeError("Database pool is not initialized")
         return self._pool
+
+    def read(self, fn: Callable[[psycopg.Connection], T], *, user_id: UUID | None = None) -> T:
+        """Run read-only `fn` on the replica when it may serve `user_id`, else on the primary.
+
+        If the replica fails, it is marked down and `fn` runs again on the primary.
+        """
+        replica = self._replica_pool
+        if replica is not None and self._router.use_replica(user_id):
+            try:
+                with replica.connection() as conn:
+                    return fn(conn)
+            except (PoolTimeout, psycopg.OperationalError):
+                self._router.mark_down()
+        with self.pool().connection() as conn:
+            return fn(conn)
+
+    def note_write(self, user_id: UUID) -> None:
+        if self._router is not None:
+            self._router.note_write(user_id)
+
+    def stats(self) -> dict[str, int]:
+        return _pool_stats(self._pool)
+
+    def replica_stats(self) -> dict[str, int]:
+        return _pool_stats(self._replica_pool)
+
+
+class AsyncDatabase:
+    """Asyncio counterpart of `Database` for routes served on the event loop."""
+
+    def __init__(
+        self,
+        dsn: str,
+        *,
+        config: PoolConfig | None = None,
+        replica: ReplicaConfig | None = None,
+        router: ReplicaRouter | None = None,
+    ) -> None:
+        self._dsn = dsn
+        self._config = config or PoolConfig()
+        self._replica = replica
+        self._router = router or (ReplicaRouter(replica) if replica is not None else None)
+        self._pool: AsyncConnectionPool | None = None
+        self._replica_pool: AsyncConnectionPool | None = None
+
+    async def open(self) -> None:
+        if self._pool is not None:
+            return
+        pool = AsyncConnectionPool(conninfo=self._dsn, name="async_db", open=False, **_pool_kwargs(self._config))
+        await pool.open()
+        if self._replica is not None:
+            replica_pool = AsyncConnectionPool(
+                conninfo=self._replica.dsn,
+                name="async_db_replica",
+                open=False,
+                **_pool_kwargs(self._config, timeout=self._replica.timeout),
+            )
+            await replica_pool.open()
+            self._replica_pool = replica_pool
+        self._pool = pool
+
+    async def close(self) -> None:
+        if self._pool is None:
+            return
+        if self._replica_pool is not None:
+            await self._replica_pool.close()
+            self._replica_pool = None
+        await self._pool.close()
+        self._pool = None
+
+    def pool(self) -> AsyncConnectionPool:
+        if self._pool is None:
+            raise RuntimeError("Database pool is not initialized")
+        return self._pool
+
+    async def read(
+        self,
+        fn: Callable[[psycopg.AsyncConnection], Awaitable[T]],
+        *,
+        user_id: UUID | None = None,
+    ) -> T:
+        replica = self._replica_pool
+        if replica is not None and self._router.use_replica(user_id):
+            try:
+                async with replica.connection() as conn:
+                    return await fn(conn)
+            except (PoolTimeout, psycopg.OperationalError):
+                self._router.mark_down()
+        async with self.pool().connection() as conn:
+            return await fn(conn)
+
+    def note_write(self, user_id: UUID) -> None:
+        if self._router is not None:
+            self._router.note_write(user_id)
+
+    def stats(self) -> dict[str, int]:
+        return _pool_stats(self._pool)
+
+    def replica_stats(self) -> dict[str, int]:
+        return _pool_stats(self._replica_pool)
+
+
+class ReplicaRouter:
+    """Read-your-writes stickiness and replica health, shared by a process's pools."""
+
+    _MAX_STICKY_USERS = 100_000
+
+    def __init__(self, config: ReplicaConfig) -> None:
+        self._config = config
+        self._lock = threading.Lock()
+        # user id -> monotonic deadline, oldest first (every entry gets the same window).
+        self._sticky: OrderedDict[UUID, float] = OrderedDict()
+        self._down_until = 0.0
+
+    def use_replica(self, user_id: UUID | None) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now < self._down_until:
+                return False
+            while self._sticky:
+                oldest, deadline = next(iter(self._sticky.items()))
+                if deadline > now:
+                    break
+                del self._sticky[oldest]
+            return user_id is None or user_id not in self._sticky
+
+    def note_write(self, user_id: UUID) -> None:
+        with self._lock:
+            self._sticky[user_id] = time.monotonic() + self._config.sticky_seconds
+            self._sticky.move_to_end(user_id)
+            while len(self._sticky) > self._MAX_STICKY_USERS:
+                self._sticky.popitem(last=False)
+
+    def mark_down(self) -> None:
+        logger.warning("Read replica unavailable; reading from the primary for %.0fs", self._config.retry_seconds)
+        with self._lock:
+            self._down_until = time.monotonic() + self._config.retry_seconds
+
+
+def _pool_kwargs(config: PoolConfig, *, timeout: float | None = None) -> dict:
+    return {
+        "min_size": config.min_size,
+        "max_size": config.max_size,
+        "max_waiting": config.max_waiting,
+        "timeout": config.timeout if timeout is None else timeout,
+        "max_lifetime": config.max_lifetime,
+        "max_idle": config.max_idle,
+        # psycopg's default threshold for statements not executed with prepare=True.
+        "kwargs": {"prepare_threshold": 5 if config.prepared_statements else None},
+    }
+
+
+def _pool_stats(pool: ConnectionPool | AsyncConnectionPool | None) -> dict[str, int]:
+    """psycopg_pool counters since the pool opened, plus connections currently checked out."""
+    if pool is None:
+        return {}
+    stats = pool.get_stats()
+    stats["connections_in_use"] = stats.get("pool_size", 0) - stats.get("pool_available", 0)
+    return stats
@@ -0,0 +1,61 @@
+"""Read the decision-time sketches maintained by migration 0011.
+
+A sketch is a DDSketch with 2% relative accuracy stored as a list of bucket
+counts: index 0 counts zero-millisecond decisions, index k + 1 counts
+decisions in (gamma^(k-1), gamma^k] ms. Sketches merge by adding counts, and
+any quantile is within 2% of the exact value (decisions are capped at one
+hour). Keep the layout in sync with the SQL functions in the migration.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from app.domain.models import DecisionTimeQuantiles
+
+
+RELATIVE_ACCURACY = 0.02
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+
+
+def merge(sketches: Iterable[list[int] | None]) -> list[int]:
+    merged: list[int] = []
+    for sketch in sketches:
+        if not sketch:
+            continue
+        if len(sketch) > len(merged):
+            merged.extend([0] * (len(sketch) - len(merged)))
+        for idx, count in enumerate(sketch):
+            merged[idx] += count or 0
+    return merged
+
+
+def quantile(sketch: list[int], q: float) -> float | None:
+    total = sum(sketch)
+    if total <= 0:
+        return None
+    rank = q * (total - 1)
+    seen = 0
+    for idx, count in enumerate(sketch):
+        seen += count
+        if seen > rank:
+            return _bucket_value(idx)
+    return _bucket_value(len(sketch) - 1)
+
+
+def quantiles(sketch: list[int] | None) -> DecisionTimeQuantiles | None:
+    """p50/p90/p99 decision time in ms, or None for an empty sketch."""
+    if not sketch or sum(sketch) <= 0:
+        return None
+    return DecisionTimeQuantiles(
+        p50_ms=round(quantile(sketch, 0.5)),
+        p90_ms=round(quantile(sketch, 0.9)),
+        p99_ms=round(quantile(sketch, 0.99)),
+    )
+
+
+def _bucket_value(idx: int) -> float:
+    if idx == 0:
+        return 0.0
+    # The value with the same relative error to both bucket bounds.
+    return 2 * _GAMMA ** (idx - 1) / (_GAMMA + 1)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from uuid import UUID
+
+from app.data.keyed_cache import KeyedCache
+from app.domain.models import Idea, IdeaMedia
+
+
+# Fired by the triggers in migrations/0007_idea_cache_notify.sql with the idea id as payload.
+IDEA_CHANGED_CHANNEL = "idea_changed"
+
+
+@dataclass(frozen=True)
+class _Entry:
+    idea: Idea | None = None
+    media: tuple[IdeaMedia, ...] | None = None
+
+
+class IdeaCache(KeyedCache[_Entry]):
+    """Size-bounded LRU of published ideas and their media, keyed by idea id.
+
+    An idea and its media are cached independently under the same key, and
+    one invalidation drops both.
+    """
+
+    def get_idea(self, idea_id: UUID) -> Idea | None:
+        return self._read(idea_id, lambda entry: entry.idea)
+
+    def get_media(self, idea_id: UUID) -> list[IdeaMedia] | None:
+        media = self._read(idea_id, lambda entry: entry.media)
+        return list(media) if media is not None else None
+
+    def put_idea(self, idea: Idea, *, token: int) -> None:
+        if idea.status != "published":
+            return
+        self._write(idea.id, lambda entry: replace(entry or _Entry(), idea=idea), token=token)
+
+    def put_media(self, idea_id: UUID, media: list[IdeaMedia], *, token: int) -> None:
+        self._write(idea_id, lambda entry: replace(entry or _Entry(), media=tuple(media)), token=token)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Generic, Protocol, TypeVar
+from uuid import UUID
+
+import psycopg
+
+
+logger = logging.getLogger(__name__)
+
+_STRIPES = 256  # A power of two
+
+V = TypeVar("V")
+T = TypeVar("T")
+
+
+class KeyedCache(Generic[V]):
+    """Size-bounded LRU of rows keyed by id, kept coherent by invalidation.
+
+    Readers take a `read_token()` before querying Postgres and pass it to
+    `put`; if the key was invalidated in between (or the cache cleared) the
+    value is dropped, so a slow reader cannot re-insert a row that was changed
+    under it. Invalidations are tracked per stripe of key hashes, so a busy
+    stream of unrelated invalidations does not discard every in-flight put;
+    a key sharing a stripe with an invalidated one loses only that one put.
+    """
+
+    def __init__(self, *, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[UUID, V] = OrderedDict()
+        # A clock ticked by every invalidation; each stripe, and the cache as a
+        # whole for clear(), remembers the tick of its latest one.
+        self._clock = 0
+        self._stripe_invalidated = [0] * _STRIPES
+        self._cleared = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def read_token(self) -> int:
+        with self._lock:
+            return self._clock
+
+    def get(self, key: UUID) -> V | None:
+        return self._read(key, lambda value: value)
+
+    def put(self, key: UUID, value: V, *, token: int) -> None:
+        self._write(key, lambda _: value, token=token)
+
+    def invalidate(self, key: UUID) -> None:
+        with self._lock:
+            self._clock += 1
+            self._stripe_invalidated[hash(key) & (_STRIPES - 1)] = self._clock
+            self._invalidations += 1
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clock += 1
+            self._cleared = self._clock
+            self._invalidations += 1
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+    def _read(self, key: UUID, pick: Callable[[V], T | None]) -> T | None:
+        """`pick(value)` for a cached key, counted as a hit unless it returns None."""
+        with self._lock:
+            value = self._entries.get(key)
+            found = pick(value) if value is not None else None
+            if found is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return found
+
+    def _write(self, key: UUID, update: Callable[[V | None], V], *, token: int) -> None:
+        """Store `update(current value or None)` unless `key` was invalidated since `token`."""
+        with self._lock:
+            if max(self._cleared, self._stripe_invalidated[hash(key) & (_STRIPES - 1)]) > token:
+                return
+            self._entries[key] = update(self._entries.get(key))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+
+class _Invalidatable(Protocol):
+    def invalidate(self, key: UUID) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class CacheInvalidator:
+    """Background LISTEN loop that evicts ids announced on `channel` by any worker.
+
+    The payload is the changed row's id; an unparsable payload clears the
+    whole cache, as does (re)connecting, since anything may have changed
+    while the listener was not connected.
+    """
+
+    def __init__(self, dsn: str, cache: _Invalidatable, *, channel: str) -> None:
+        self._dsn = dsn
+        self._cache = cache
+        self._channel = channel
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"{self._channel}-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5.0)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(self._dsn, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {self._channel}")
+                    self._cache.clear()
+                    while not self._stop.is_set():
+                        for notify in conn.notifies(timeout=1.0):
+                            self._handle(notify.payload)
+            except Exception:
+                logger.exception("Cache listener on %s failed; reconnecting", self._channel)
+                self._cache.clear()
+                self._stop.wait(1.0)
+
+    def _handle(self, payload: str) -> None:
+        try:
+            self._cache.invalidate(UUID(payload))
+        except ValueError:
+            self._cache.clear()
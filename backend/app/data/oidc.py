@@ -1,9 +1,19 @@
 from __future__ import annotations
 
+import logging
+import re
+import threading
+import time
 from dataclasses import dataclass
 
 import httpx
-from jose import jwt
+from jose import jwk, jwt
+from jose.backends.base import Key
+
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE = re.compile(r"(?:^|,)\s*max-age\s*=\s*(\d+)", re.IGNORECASE)
 
 
 @dataclass(frozen=True)
@@ -13,34 +23,136 @@ class OidcConfig:
     audience: str
 
 
+@dataclass(frozen=True)
+class _SigningKey:
+    key: Key
+    algorithm: str
+
+
+class JwksCache:
+    """The provider's signing keys, parsed once and shared by every login.
+
+    Keys are kept for the JWKS response's `Cache-Control: max-age`, or
+    `default_max_age` seconds without one. An unknown `kid` triggers one
+    refresh (at most every `min_refresh_interval` seconds, so tokens with
+    made-up kids cannot hammer the provider). Concurrent refreshes collapse
+    into a single fetch; if it fails, the previous keys stay in use.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        *,
+        default_max_age: float = 300.0,
+        min_refresh_interval: float = 30.0,
+        timeout: float = 10.0,
+    ) -> None:
+        self._jwks_url = jwks_url
+        self._default_max_age = default_max_age
+        self._min_refresh_interval = min_refresh_interval
+        self._client = httpx.Client(timeout=timeout)
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._keys: dict[str, _SigningKey] = {}
+        self._fetched_at = 0.0
+        self._expires_at = 0.0
+        self._generation = 0
+        self._fetches = 0
+        self._fetch_errors = 0
+
+    def get(self, kid: str | None) -> _SigningKey | None:
+        with self._lock:
+            key = self._keys.get(kid)
+            fresh = time.monotonic() < self._expires_at
+            generation = self._generation
+            fetched_at = self._fetched_at
+        if key is not None and fresh:
+            return key
+
+        if key is None and fresh and time.monotonic() - fetched_at < self._min_refresh_interval:
+            return None
+        self._refresh(generation)
+        with self._lock:
+            return self._keys.get(kid)
+
+    def close(self) -> None:
+        self._client.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "keys": len(self._keys),
+                "fetches": self._fetches,
+                "fetch_errors": self._fetch_errors,
+                "expires_in": max(0.0, round(self._expires_at - time.monotonic(), 1)),
+            }
+
+    def _refresh(self, seen_generation: int) -> None:
+        with self._refresh_lock:
+            with self._lock:
+                # Another caller refreshed while we waited for the lock; use its result.
+                if self._generation != seen_generation:
+                    return
+            try:
+                keys, max_age = self._fetch()
+            except Exception:
+                with self._lock:
+                    self._fetch_errors += 1
+                    # Callers already waiting on this refresh share its failure.
+                    self._generation += 1
+                    if not self._keys:
+                        raise
+                    # Keep serving the old keys; retry after the refresh interval.
+                    self._fetched_at = time.monotonic()
+                    self._expires_at = self._fetched_at + self._min_refresh_interval
+                logger.warning("JWKS refresh from %s failed; keeping cached keys", self._jwks_url, exc_info=True)
+                return
+            with self._lock:
+                self._keys = keys
+                self._fetched_at = time.monotonic()
+                self._expires_at = self._fetched_at + max_age
+                self._generation += 1
+                self._fetches += 1
+
+    def _fetch(self) -> tuple[dict[str, _SigningKey], float]:
+        resp = self._client.get(self._jwks_url)
+        resp.raise_for_status()
+        keys: dict[str, _SigningKey] = {}
+        for data in resp.json().get("keys", []):
+            kid = data.get("kid")
+            algorithm = data.get("alg", "RS256")
+            try:
+                keys[kid] = _SigningKey(key=jwk.construct(data, algorithm), algorithm=algorithm)
+            except Exception:
+                logger.warning("Skipping unusable JWKS key %s", kid, exc_info=True)
+        match = _MAX_AGE.search(resp.headers.get("cache-control", ""))
+        max_age = float(match.group(1)) if match else self._default_max_age
+        return keys, max_age
+
+
 class OidcVerifier:
-    def __init__(self, config: OidcConfig) -> None:
+    def __init__(self, config: OidcConfig, *, jwks: JwksCache | None = None) -> None:
         self._config = config
+        self._jwks = jwks or JwksCache(config.jwks_url)
 
     def verify_id_token(self, id_token: str) -> dict:
-        jwks = self._fetch_jwks()
         header = jwt.get_unverified_header(id_token)
-        kid = header.get("kid")
-        key = None
-        for jwk in jwks.get("keys", []):
-            if jwk.get("kid") == kid:
-                key = jwk
-                break
+        key = self._jwks.get(header.get("kid"))
         if key is None:
             raise ValueError("Unknown key id")
 
         claims = jwt.decode(
             id_token,
-            key,
-            algorithms=[header.get("alg", "RS256")],
+            key.key,
+            algorithms=[key.algorithm],
             issuer=self._config.issuer,
             audience=self._config.audience,
             options={"verify_at_hash": False},
         )
         return claims
 
-    def _fetch_jwks(self) -> dict:
-        with httpx.Client(timeout=10.0) as client:
-            resp = client.get(self._config.jwks_url)
-            resp.raise_for_status()
-            return resp.json()
+    def jwks_stats(self) -> dict:
+        return self._jwks.stats()
+
+    def close(self) -> None:
+        self._jwks.close()
@@ -1,17 +1,21 @@
 from __future__ import annotations
 
+from datetime import datetime
 from uuid import UUID
 
 from psycopg.rows import dict_row
 
-from app.data.db import Database
+from app.data import statements
+from app.data.db import AsyncDatabase, Database
+from app.data.idea_cache import IdeaCache
 from app.domain.models import IdeaMedia
-from app.domain.ports import IdeaMediaRepository
+from app.domain.ports import AsyncIdeaMediaRepository, IdeaMediaRepository
 
 
 class PostgresIdeaMediaRepository(IdeaMediaRepository):
-    def __init__(self, db: Database) -> None:
+    def __init__(self, db: Database, *, cache: IdeaCache | None = None) -> None:
         self._db = db
+        self._cache = cache
 
     def add(self, *, idea_id: UUID, media_type: str, s3_key: str, position: int) -> IdeaMedia:
         with self._db.pool().connection() as conn:
@@ -20,36 +24,42 @@ class PostgresIdeaMediaRepository(IdeaMediaRepository):
                     """
                     INSERT INTO idea_media(idea_id, media_type, s3_key, position)
                     VALUES (%s, %s, %s, %s)
-                    RETURNING *
+                    RETURNING *, (SELECT author_id FROM ideas WHERE id = idea_media.idea_id) AS author_id
                     """,
                     (idea_id, media_type, s3_key, position),
                 )
                 row = cur.fetchone()
             conn.commit()
+        self._invalidate(idea_id, author_id=row["author_id"] if row else None)
         if not row:
             raise RuntimeError("Failed to add idea media")
         return _to_media(row)
 
     def list_by_idea(self, *, idea_id: UUID) -> list[IdeaMedia]:
-        with self._db.pool().connection() as conn:
-            with conn.cursor(row_factory=dict_row) as cur:
-                cur.execute(
-                    "SELECT * FROM idea_media WHERE idea_id = %s ORDER BY position",
-                    (idea_id,),
-                )
-                rows = cur.fetchall()
-        return [_to_media(r) for r in rows]
+        return self.list_by_ideas(idea_ids=[idea_id])[idea_id]
+
+    def list_by_ideas(self, *, idea_ids: list[UUID]) -> dict[UUID, list[IdeaMedia]]:
+        media, missing = cached_media(self._cache, idea_ids)
+        if missing:
+            with self._db.pool().connection() as conn:
+                with conn.cursor(row_factory=dict_row) as cur:
+                    media.update(fetch_by_ideas(cur, idea_ids=missing, cache=self._cache))
+        return media
 
     def delete(self, *, media_id: UUID, idea_id: UUID) -> bool:
         with self._db.pool().connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(
-                    "DELETE FROM idea_media WHERE id = %s AND idea_id = %s",
+                    """
+                    DELETE FROM idea_media WHERE id = %s AND idea_id = %s
+                    RETURNING (SELECT author_id FROM ideas WHERE id = idea_media.idea_id)
+                    """,
                     (media_id, idea_id),
                 )
-                deleted = cur.rowcount > 0
+                row = cur.fetchone()
             conn.commit()
-        return deleted
+        self._invalidate(idea_id, author_id=row[0] if row else None)
+        return row is not None
 
     def reorder(self, *, idea_id: UUID, media_ids: list[UUID]) -> None:
         with self._db.pool().connection() as conn:
@@ -59,7 +69,89 @@ class PostgresIdeaMediaRepository(IdeaMediaRepository):
                         "UPDATE idea_media SET position = %s WHERE id = %s AND idea_id = %s",
                         (idx, mid, idea_id),
                     )
+                cur.execute("SELECT author_id FROM ideas WHERE id = %s", (idea_id,))
+                row = cur.fetchone()
             conn.commit()
+        self._invalidate(idea_id, author_id=row[0] if row else None)
+
+    def _invalidate(self, idea_id: UUID, *, author_id: UUID | None) -> None:
+        # Other workers are notified by the idea_media trigger; evict locally right away.
+        if self._cache is not None:
+            self._cache.invalidate(idea_id)
+        # The author's listings include media, so they must read their own change.
+        if author_id is not None:
+            self._db.note_write(author_id)
+
+
+class AsyncPostgresIdeaMediaRepository(AsyncIdeaMediaRepository):
+    def __init__(self, db: AsyncDatabase, *, cache: IdeaCache | None = None) -> None:
+        self._db = db
+        self._cache = cache
+
+    async def list_by_ideas(self, *, idea_ids: list[UUID]) -> dict[UUID, list[IdeaMedia]]:
+        media, missing = cached_media(self._cache, idea_ids)
+        if missing:
+            async with self._db.pool().connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    media.update(await fetch_by_ideas_async(cur, idea_ids=missing, cache=self._cache))
+        return media
+
+
+def cached_media(
+    cache: IdeaCache | None,
+    idea_ids: list[UUID],
+) -> tuple[dict[UUID, list[IdeaMedia]], list[UUID]]:
+    """Split idea ids into media served from the cache and ids still to fetch."""
+    if cache is None:
+        return {}, list(idea_ids)
+    media: dict[UUID, list[IdeaMedia]] = {}
+    missing: list[UUID] = []
+    for idea_id in idea_ids:
+        cached = cache.get_media(idea_id)
+        if cached is None:
+            missing.append(idea_id)
+        else:
+            media[idea_id] = cached
+    return media, missing
+
+
+def fetch_by_ideas(cur, *, idea_ids: list[UUID], cache: IdeaCache | None = None) -> dict[UUID, list[IdeaMedia]]:
+    """Load ordered media for several ideas with one query on an open cursor."""
+    if not idea_ids:
+        return {}
+    token = cache.read_token() if cache is not None else 0
+    cur.execute(statements.MEDIA_BY_IDEAS, (idea_ids,), prepare=True)
+    return _group_media(idea_ids, cur.fetchall(), cache=cache, token=token)
+
+
+async def fetch_by_ideas_async(
+    cur,
+    *,
+    idea_ids: list[UUID],
+    cache: IdeaCache | None = None,
+) -> dict[UUID, list[IdeaMedia]]:
+    """`fetch_by_ideas` on an open async cursor."""
+    if not idea_ids:
+        return {}
+    token = cache.read_token() if cache is not None else 0
+    await cur.execute(statements.MEDIA_BY_IDEAS, (idea_ids,), prepare=True)
+    return _group_media(idea_ids, await cur.fetchall(), cache=cache, token=token)
+
+
+def _group_media(
+    idea_ids: list[UUID],
+    rows: list[dict],
+    *,
+    cache: IdeaCache | None,
+    token: int,
+) -> dict[UUID, list[IdeaMedia]]:
+    result: dict[UUID, list[IdeaMedia]] = {idea_id: [] for idea_id in idea_ids}
+    for r in rows:
+        result[r["idea_id"]].append(_to_media(r))
+    if cache is not None:
+        for idea_id, items in result.items():
+            cache.put_media(idea_id, items, token=token)
+    return result
 
 
 def _to_media(row: dict) -> IdeaMedia:
@@ -71,3 +163,18 @@ def _to_media(row: dict) -> IdeaMedia:
         position=row["position"],
         created_at=row["created_at"],
     )
+
+
+def media_from_json(items: list[dict] | None) -> list[IdeaMedia]:
+    """Convert idea_media rows aggregated with json_agg back into models."""
+    return [
+        IdeaMedia(
+            id=UUID(m["id"]),
+            idea_id=UUID(m["idea_id"]),
+            media_type=m["media_type"],
+            s3_key=m["s3_key"],
+            position=m["position"],
+            created_at=datetime.fromisoformat(m["created_at"]),
+        )
+        for m in items or []
+    ]
@@ -1,18 +1,30 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+from typing import TYPE_CHECKING
 from uuid import UUID
 
+import psycopg
 from psycopg.rows import dict_row
 from psycopg.types.json import Jsonb
 
-from app.data.db import Database
-from app.domain.models import Idea
-from app.domain.ports import IdeaRepository
+from app.data import statements
+from app.data.db import AsyncDatabase, Database
+from app.data.idea_cache import IdeaCache
+from app.data.repositories.idea_media import media_from_json
+from app.data.repositories.user_stats import fetch_user_stats_async
+from app.data.seen_ideas import SeenIdeaCache
+from app.domain.models import FeedCandidate, Idea, IdeaCard, KeysetCursor, SwipeStats
+from app.domain.ports import AsyncIdeaRepository, IdeaRepository
+
+if TYPE_CHECKING:
+    from app.data.swipe_buffer import SwipeWriteBuffer
 
 
 class PostgresIdeaRepository(IdeaRepository):
-    def __init__(self, db: Database) -> None:
+    def __init__(self, db: Database, *, cache: IdeaCache | None = None) -> None:
         self._db = db
+        self._cache = cache
 
     def create(
         self,
@@ -56,45 +68,87 @@ class PostgresIdeaRepository(IdeaRepository):
             conn.commit()
         if not row:
             raise RuntimeError("Failed to create idea")
+        if author_id is not None:
+            self._db.note_write(author_id)
         return _to_idea(row)
 
-    def get_next_for_user(self, *, user_id: UUID) -> Idea | None:
+    def get_by_id(self, *, idea_id: UUID) -> Idea | None:
+        if self._cache is not None:
+            cached = self._cache.get_idea(idea_id)
+            if cached is not None:
+                return cached
+        token = self._cache.read_token() if self._cache is not None else 0
         with self._db.pool().connection() as conn:
             with conn.cursor(row_factory=dict_row) as cur:
-                cur.execute(
-                    """
-                    SELECT i.*
-                    FROM ideas i
-                    WHERE i.status = 'published'
-                      AND i.author_id IS DISTINCT FROM %s
-                      AND NOT EXISTS (
-                        SELECT 1 FROM swipes s
-                        WHERE s.user_id = %s AND s.idea_id = i.id
-                      )
-                    ORDER BY i.created_at DESC
-                    LIMIT 1
-                    """,
-                    (user_id, user_id),
-                )
+                cur.execute(statements.IDEA_BY_ID, (idea_id,), prepare=True)
                 row = cur.fetchone()
-        return _to_idea(row) if row else None
+        idea = _to_idea(row) if row else None
+        if idea is not None and self._cache is not None:
+            self._cache.put_idea(idea, token=token)
+        return idea
 
-    def get_by_id(self, *, idea_id: UUID) -> Idea | None:
+    def list_by_author(
+        self,
+        *,
+        author_id: UUID,
+        limit: int | None = None,
+        after: KeysetCursor | None = None,
+    ) -> list[Idea]:
+        def query(conn: psycopg.Connection) -> list[dict]:
+            with conn.cursor(row_factory=dict_row) as cur:
+                if after is None:
+                    cur.execute(statements.IDEAS_BY_AUTHOR, (author_id, limit), prepare=True)
+                else:
+                    cur.execute(
+                        statements.IDEAS_BY_AUTHOR_AFTER,
+                        (author_id, after.created_at, after.id, limit),
+                        prepare=True,
+                    )
+                return cur.fetchall()
+
+        return [_to_idea(r) for r in self._db.read(query, user_id=author_id)]
+
+    def get_card(self, *, idea_id: UUID) -> IdeaCard | None:
+        if self._cache is not None:
+            idea = self._cache.get_idea(idea_id)
+            media = self._cache.get_media(idea_id) if idea is not None else None
+            if idea is not None and media is not None:
+                return IdeaCard(idea=idea, media=media)
+        token = self._cache.read_token() if self._cache is not None else 0
         with self._db.pool().connection() as conn:
             with conn.cursor(row_factory=dict_row) as cur:
-                cur.execute("SELECT * FROM ideas WHERE id = %s", (idea_id,))
+                cur.execute(statements.IDEA_CARD_BY_ID, (idea_id,), prepare=True)
                 row = cur.fetchone()
-        return _to_idea(row) if row else None
+        if not row:
+            return None
+        return self._to_card(row, token=token)
 
-    def list_by_author(self, *, author_id: UUID) -> list[Idea]:
-        with self._db.pool().connection() as conn:
+    def list_cards_by_author(
+        self,
+        *,
+        author_id: UUID,
+        limit: int | None = None,
+        after: KeysetCursor | None = None,
+    ) -> list[IdeaCard]:
+        """Like list_by_author, with each idea's ordered media aggregated in the same statement.
+
+        These rows may come from the replica, so unlike get_card they are not cached.
+        """
+
+        def query(conn: psycopg.Connection) -> list[dict]:
             with conn.cursor(row_factory=dict_row) as cur:
-                cur.execute(
-                    "SELECT * FROM ideas WHERE author_id = %s ORDER BY created_at DESC",
-                    (author_id,),
-                )
-                rows = cur.fetchall()
-        return [_to_idea(r) for r in rows]
+                if after is None:
+                    cur.execute(statements.IDEA_CARDS_BY_AUTHOR, (author_id, limit), prepare=True)
+                else:
+                    cur.execute(
+                        statements.IDEA_CARDS_BY_AUTHOR_AFTER,
+                        (author_id, after.created_at, after.id, limit),
+                        prepare=True,
+                    )
+                return cur.fetchall()
+
+        rows = self._db.read(query, user_id=author_id)
+        return [IdeaCard(idea=_to_idea(r), media=media_from_json(r["media"])) for r in rows]
 
     def update(
         self,
@@ -137,6 +191,7 @@ class PostgresIdeaRepository(IdeaRepository):
                 )
                 row = cur.fetchone()
             conn.commit()
+        self._invalidate(idea_id, author_id=author_id)
         return _to_idea(row) if row else None
 
     def delete(self, *, idea_id: UUID, author_id: UUID) -> bool:
@@ -148,6 +203,7 @@ class PostgresIdeaRepository(IdeaRepository):
                 )
                 deleted = cur.rowcount > 0
             conn.commit()
+        self._invalidate(idea_id, author_id=author_id)
         return deleted
 
     def publish(self, *, idea_id: UUID, author_id: UUID) -> Idea | None:
@@ -163,8 +219,191 @@ class PostgresIdeaRepository(IdeaRepository):
                 )
                 row = cur.fetchone()
             conn.commit()
+        self._invalidate(idea_id, author_id=author_id)
         return _to_idea(row) if row else None
 
+    def _to_card(self, row: dict, *, token: int) -> IdeaCard:
+        card = IdeaCard(idea=_to_idea(row), media=media_from_json(row["media"]))
+        if self._cache is not None:
+            self._cache.put_idea(card.idea, token=token)
+            self._cache.put_media(card.idea.id, card.media, token=token)
+        return card
+
+    def _invalidate(self, idea_id: UUID, *, author_id: UUID) -> None:
+        # Other workers are notified by the ideas trigger; evict locally right away.
+        if self._cache is not None:
+            self._cache.invalidate(idea_id)
+        self._db.note_write(author_id)
+
+
+class AsyncPostgresIdeaRepository(AsyncIdeaRepository):
+    def __init__(
+        self,
+        db: AsyncDatabase,
+        *,
+        seen: SeenIdeaCache | None = None,
+        cache: IdeaCache | None = None,
+        buffer: SwipeWriteBuffer | None = None,
+    ) -> None:
+        self._db = db
+        self._seen = seen
+        self._cache = cache
+        self._buffer = buffer
+
+    async def list_next_for_user(
+        self,
+        *,
+        user_id: UUID,
+        limit: int,
+        exclude_ids: list[UUID],
+        window: int = 0,
+        rank: Callable[[list[FeedCandidate], SwipeStats], list[FeedCandidate]] | None = None,
+    ) -> list[Idea]:
+        """The next `limit` unseen ideas from the user's feed queue, in one transaction.
+
+        The ranking columns of `max(limit, window)` candidates are read and
+        ordered by `rank` (if given), with the user's swipe stats read in the
+        same transaction; only the first `limit` are loaded in full.
+        """
+        if self._seen is not None:
+            await self._seen.warm_async(user_id)
+        if self._buffer is not None:
+            # Swipes still queued in the write buffer are not in the swipes table yet.
+            exclude_ids = exclude_ids + self._buffer.pending_idea_ids(user_id)
+        async with self._db.pool().connection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cur:
+                candidates = await rank_next_for_user_async(
+                    cur,
+                    user_id=user_id,
+                    window=max(limit, window),
+                    exclude_ids=exclude_ids,
+                    seen=self._seen,
+                    rank=rank,
+                )
+                ideas = await fetch_ideas_async(cur, idea_ids=[c.id for c in candidates[:limit]], cache=self._cache)
+            await conn.commit()
+        return ideas
+
+
+# Ideas pulled into a user's feed queue per refill.
+_QUEUE_REFILL_SIZE = 200
+
+
+async def rank_next_for_user_async(
+    cur,
+    *,
+    user_id: UUID,
+    window: int,
+    exclude_ids: list[UUID],
+    seen: SeenIdeaCache | None = None,
+    rank: Callable[[list[FeedCandidate], SwipeStats], list[FeedCandidate]] | None = None,
+) -> list[FeedCandidate]:
+    """The next `window` queued ideas as ranking candidates, ordered by `rank` if given.
+
+    Only the ranking columns are read. `rank` gets the user's swipe stats,
+    read on the same cursor, and is skipped for fewer than two candidates.
+    """
+    rows = await _next_queued_async(
+        cur, statements.FEED_QUEUE_CANDIDATES, user_id=user_id, limit=window, exclude_ids=exclude_ids, seen=seen
+    )
+    candidates = [
+        FeedCandidate(id=r["id"], category=r["category"], tags=r["tags"], created_at=r["created_at"]) for r in rows
+    ]
+    if rank is not None and len(candidates) > 1:
+        candidates = rank(candidates, await fetch_user_stats_async(cur, user_id=user_id))
+    return candidates
+
+
+async def fetch_card_async(cur, *, idea_id: UUID, cache: IdeaCache | None = None) -> IdeaCard | None:
+    """An idea and its media on an open cursor, from `cache` when it holds both."""
+    if cache is not None:
+        idea = cache.get_idea(idea_id)
+        media = cache.get_media(idea_id) if idea is not None else None
+        if idea is not None and media is not None:
+            return IdeaCard(idea=idea, media=media)
+    token = cache.read_token() if cache is not None else 0
+    await cur.execute(statements.IDEA_CARD_BY_ID, (idea_id,), prepare=True)
+    row = await cur.fetchone()
+    if not row:
+        return None
+    card = IdeaCard(idea=_to_idea(row), media=media_from_json(row["media"]))
+    if cache is not None:
+        cache.put_idea(card.idea, token=token)
+        cache.put_media(idea_id, card.media, token=token)
+    return card
+
+
+async def fetch_ideas_async(cur, *, idea_ids: list[UUID], cache: IdeaCache | None = None) -> list[Idea]:
+    """Ideas by id on an open cursor, in the order given, from `cache` where it has them; missing ids are skipped."""
+    found: dict[UUID, Idea] = {}
+    if cache is not None:
+        for idea_id in idea_ids:
+            idea = cache.get_idea(idea_id)
+            if idea is not None:
+                found[idea_id] = idea
+    missing = [idea_id for idea_id in idea_ids if idea_id not in found]
+    if missing:
+        token = cache.read_token() if cache is not None else 0
+        await cur.execute(statements.IDEAS_BY_IDS, (missing,), prepare=True)
+        for row in await cur.fetchall():
+            idea = _to_idea(row)
+            found[idea.id] = idea
+            if cache is not None:
+                cache.put_idea(idea, token=token)
+    return [found[idea_id] for idea_id in idea_ids if idea_id in found]
+
+
+async def _next_queued_async(
+    cur,
+    statement: str,
+    *,
+    user_id: UUID,
+    limit: int,
+    exclude_ids: list[UUID],
+    seen: SeenIdeaCache | None,
+) -> list[dict]:
+    """Peek the queue with `statement`, refilling it in bulk when it runs low."""
+    rows = await _peek_queue_async(cur, statement, user_id=user_id, limit=limit, exclude_ids=exclude_ids, seen=seen)
+    if len(rows) < limit:
+        refill_size = max(_QUEUE_REFILL_SIZE, limit + len(exclude_ids))
+        if await _refill_queue_async(cur, user_id=user_id, size=refill_size):
+            rows = await _peek_queue_async(
+                cur, statement, user_id=user_id, limit=limit, exclude_ids=exclude_ids, seen=seen
+            )
+    return rows
+
+
+async def _peek_queue_async(
+    cur,
+    statement: str,
+    *,
+    user_id: UUID,
+    limit: int,
+    exclude_ids: list[UUID],
+    seen: SeenIdeaCache | None,
+) -> list[dict]:
+    while True:
+        await cur.execute(statement, (user_id, exclude_ids, limit), prepare=True)
+        rows = await cur.fetchall()
+        stale = seen.filter_seen(user_id, [r["id"] for r in rows]) if seen is not None else []
+        if not stale:
+            return rows
+        await cur.execute(statements.FEED_QUEUE_DROP, (user_id, stale), prepare=True)
+
+
+async def _refill_queue_async(cur, *, user_id: UUID, size: int) -> bool:
+    """Append up to `size` unseen ideas to the queue. Returns False if already exhausted."""
+    await cur.execute(statements.FEED_QUEUE_LOCK, (user_id,), prepare=True)
+    await cur.execute(statements.FEED_QUEUE_EXHAUSTED, (user_id,), prepare=True)
+    state = await cur.fetchone()
+    if state and state["exhausted"]:
+        return False
+
+    await cur.execute(statements.FEED_QUEUE_REFILL, (user_id, user_id, user_id, user_id, size), prepare=True)
+    exhausted = cur.rowcount < size
+    await cur.execute(statements.FEED_QUEUE_STATE_UPSERT, (user_id, exhausted), prepare=True)
+    return True
+
 
 def _to_idea(row: dict) -> Idea:
     tags = row.get("tags")
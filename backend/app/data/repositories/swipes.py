@@ -1,125 +1,408 @@
 from __future__ import annotations
 
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
 from uuid import UUID
 
-from psycopg.errors import UniqueViolation
+import psycopg
+from psycopg.errors import ForeignKeyViolation, UniqueViolation
 from psycopg.rows import dict_row
 
-from app.data.db import Database
-from app.domain.models import IdeaStats, Swipe, SwipeStats
-from app.domain.ports import SwipeRepository
+from app.data import decision_sketch, statements
+from app.data.db import AsyncDatabase, Database
+from app.data.idea_cache import IdeaCache
+from app.data.repositories.ideas import fetch_card_async, rank_next_for_user_async
+from app.data.repositories.user_stats import to_swipe_stats
+from app.data.seen_ideas import SeenIdeaCache
+from app.domain.models import (
+    DecisionTimeQuantiles,
+    FeedCandidate,
+    IdeaCard,
+    IdeaStats,
+    NewSwipe,
+    Swipe,
+    SwipeBucket,
+    SwipeResult,
+    SwipeStats,
+)
+from app.domain.ports import AsyncSwipeRepository, SwipeRepository
+
+if TYPE_CHECKING:
+    from app.data.swipe_buffer import SwipeWriteBuffer
+
+
+SWIPE_CREATED = "created"
+SWIPE_DUPLICATE = "duplicate"
+SWIPE_INVALID_IDEA = "invalid_idea"
+
+# How far back a client's swiped_at may date a queued swipe: well inside the
+# hour that rollup_swipes re-aggregates behind its watermark, so an older
+# timestamp cannot land in an hour bucket that is never rolled up again.
+_MAX_SWIPE_BACKDATE = timedelta(minutes=30)
 
 
 class DuplicateSwipeError(Exception):
     pass
 
 
+class UnknownIdeaError(Exception):
+    pass
+
+
 class PostgresSwipeRepository(SwipeRepository):
     def __init__(self, db: Database) -> None:
         self._db = db
 
-    def create(self, *, user_id: UUID, idea_id: UUID, direction: str, decision_time_ms: int | None) -> Swipe:
-        with self._db.pool().connection() as conn:
+    def get_user_stats(self, *, user_id: UUID) -> SwipeStats:
+        def query(conn: psycopg.Connection) -> list[dict]:
+            with conn.cursor(row_factory=dict_row) as cur:
+                cur.execute(statements.USER_CATEGORY_STATS, (user_id,), prepare=True)
+                return cur.fetchall()
+
+        return to_swipe_stats(self._db.read(query, user_id=user_id))
+
+    def get_author_idea_stats(self, *, author_id: UUID) -> list[IdeaStats]:
+        """Stats for every idea by `author_id`, newest first, from a single grouped query."""
+        def query(conn: psycopg.Connection) -> tuple[list[dict], dict[str, list]]:
+            with conn.cursor(row_factory=dict_row) as cur:
+                cur.execute(statements.AUTHOR_IDEA_SWIPE_TOTALS, (author_id,), prepare=True)
+                rows = cur.fetchall()
+                categories = sorted({r["category"] for r in rows})
+                shards: dict[str, list] = {}
+                if categories:
+                    cur.execute(statements.CATEGORY_DECISION_SKETCHES, (categories,), prepare=True)
+                    for r in cur.fetchall():
+                        shards.setdefault(r["category"], []).append(r["sketch"])
+            return rows, shards
+
+        rows, shards = self._db.read(query, user_id=author_id)
+
+        category_times = {
+            category: decision_sketch.quantiles(decision_sketch.merge(sketches))
+            for category, sketches in shards.items()
+        }
+        return [
+            _to_idea_stats(
+                r,
+                idea_id=r["idea_id"],
+                title=r["title"],
+                category_decision_time=category_times.get(r["category"]),
+            )
+            for r in rows
+        ]
+
+    def get_idea_timeseries(
+        self,
+        *,
+        idea_id: UUID,
+        granularity: str,
+        since: datetime,
+        until: datetime,
+    ) -> list[SwipeBucket]:
+        """Non-empty `granularity` ('hour' | 'day') buckets starting in [since, until), oldest first."""
+        params = {"idea_id": idea_id, "granularity": granularity, "since": since, "until": until}
+
+        def query(conn: psycopg.Connection) -> list[dict]:
+            with conn.cursor(row_factory=dict_row) as cur:
+                cur.execute(statements.IDEA_SWIPE_TIMESERIES, params, prepare=True)
+                return cur.fetchall()
+
+        return [_to_swipe_bucket(r) for r in self._db.read(query)]
+
+
+class AsyncPostgresSwipeRepository(AsyncSwipeRepository):
+    def __init__(
+        self,
+        db: AsyncDatabase,
+        *,
+        seen: SeenIdeaCache | None = None,
+        cache: IdeaCache | None = None,
+        buffer: SwipeWriteBuffer | None = None,
+    ) -> None:
+        self._db = db
+        self._seen = seen
+        self._cache = cache
+        self._buffer = buffer
+
+    async def create(self, *, user_id: UUID, idea_id: UUID, direction: str, decision_time_ms: int | None) -> Swipe:
+        await self._check_unseen(user_id=user_id, idea_id=idea_id)
+        if self._buffer is not None:
+            return await self._buffer.submit(
+                user_id=user_id,
+                idea_id=idea_id,
+                direction=direction,
+                decision_time_ms=decision_time_ms,
+            )
+        async with self._db.pool().connection() as conn:
             try:
-                with conn.cursor(row_factory=dict_row) as cur:
-                    cur.execute(
-                        """
-                        INSERT INTO swipes(user_id, idea_id, direction, decision_time_ms)
-                        VALUES (%s, %s, %s, %s)
-                        RETURNING *
-                        """,
-                        (user_id, idea_id, direction, decision_time_ms),
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    row = await insert_swipe_async(
+                        cur,
+                        user_id=user_id,
+                        idea_id=idea_id,
+                        direction=direction,
+                        decision_time_ms=decision_time_ms,
                     )
-                    row = cur.fetchone()
-                conn.commit()
+                await conn.commit()
             except UniqueViolation as ex:
-                conn.rollback()
+                await conn.rollback()
+                self._mark_seen(user_id=user_id, idea_id=idea_id)
                 raise DuplicateSwipeError("Swipe already recorded") from ex
+            except ForeignKeyViolation as ex:
+                await conn.rollback()
+                raise UnknownIdeaError("Idea not found") from ex
 
         if not row:
             raise RuntimeError("Failed to create swipe")
+        self._mark_seen(user_id=user_id, idea_id=idea_id)
+        self._db.note_write(user_id)
 
-        return Swipe(
-            id=row["id"],
-            user_id=row["user_id"],
-            idea_id=row["idea_id"],
-            direction=row["direction"],
-            decision_time_ms=row.get("decision_time_ms"),
-            created_at=row["created_at"],
-        )
+        return _to_swipe(row)
 
-    def get_user_stats(self, *, user_id: UUID) -> SwipeStats:
-        with self._db.pool().connection() as conn:
-            with conn.cursor(row_factory=dict_row) as cur:
-                # Totals
-                cur.execute(
-                    """
-                    SELECT
-                      COUNT(*)::int AS total,
-                      COUNT(*) FILTER (WHERE direction = 'vibe')::int AS vibes,
-                      COUNT(*) FILTER (WHERE direction = 'no_vibe')::int AS no_vibes
-                    FROM swipes WHERE user_id = %s
-                    """,
-                    (user_id,),
-                )
-                totals = cur.fetchone() or {}
-
-                # By category
-                cur.execute(
-                    """
-                    SELECT
-                      i.category,
-                      COUNT(*)::int AS total,
-                      COUNT(*) FILTER (WHERE s.direction = 'vibe')::int AS vibes,
-                      COUNT(*) FILTER (WHERE s.direction = 'no_vibe')::int AS no_vibes
-                    FROM swipes s
-                    JOIN ideas i ON i.id = s.idea_id
-                    WHERE s.user_id = %s
-                    GROUP BY i.category
-                    ORDER BY total DESC
-                    """,
-                    (user_id,),
-                )
-                cat_rows = cur.fetchall()
-
-        by_category = {}
-        for r in cat_rows:
-            by_category[r["category"]] = {
-                "total": r["total"],
-                "vibes": r["vibes"],
-                "no_vibes": r["no_vibes"],
-            }
-
-        return SwipeStats(
-            total_swipes=totals.get("total", 0),
-            total_vibes=totals.get("vibes", 0),
-            total_no_vibes=totals.get("no_vibes", 0),
-            by_category=by_category,
-        )
+    async def create_many(self, *, user_id: UUID, swipes: list[NewSwipe]) -> list[SwipeResult]:
+        """Insert a user's swipes with one statement.
 
-    def get_idea_stats(self, *, idea_id: UUID) -> IdeaStats:
-        with self._db.pool().connection() as conn:
-            with conn.cursor(row_factory=dict_row) as cur:
-                cur.execute(
-                    """
-                    SELECT
-                      COUNT(*)::int AS total,
-                      COUNT(*) FILTER (WHERE direction = 'vibe')::int AS vibes,
-                      COUNT(*) FILTER (WHERE direction = 'no_vibe')::int AS no_vibes
-                    FROM swipes WHERE idea_id = %s
-                    """,
-                    (idea_id,),
+        Repeats within the batch, seen-set hits and swipes still queued in the
+        write buffer are reported as duplicates without reaching Postgres; the
+        rest are inserted together, or handed to the write buffer when there is one.
+
+        A swipe's created_at is the client's swiped_at clamped to the last
+        _MAX_SWIPE_BACKDATE up to now (the server clock wins over a skewed or
+        future one), else now. Swipes replayed after a longer offline spell
+        therefore share the oldest allowed time and lose their relative order.
+        """
+        results: list[SwipeResult | None] = []
+        rows: list[Swipe] = []
+        keys: set[UUID] = set()
+        now = datetime.now(timezone.utc)
+        for item in swipes:
+            if item.idea_id in keys or await self._is_seen(user_id=user_id, idea_id=item.idea_id):
+                results.append(SwipeResult(idea_id=item.idea_id, status=SWIPE_DUPLICATE))
+                continue
+            keys.add(item.idea_id)
+            results.append(None)
+            rows.append(
+                Swipe(
+                    id=uuid.uuid4(),
+                    user_id=user_id,
+                    idea_id=item.idea_id,
+                    direction=item.direction,
+                    decision_time_ms=item.decision_time_ms,
+                    created_at=_clamp_swiped_at(item.swiped_at, now=now),
                 )
-                row = cur.fetchone() or {}
-
-        total = row.get("total", 0)
-        vibes = row.get("vibes", 0)
-        vibe_rate = (vibes / total * 100) if total > 0 else 0.0
-
-        return IdeaStats(
-            idea_id=idea_id,
-            total_views=total,
-            total_vibes=vibes,
-            total_no_vibes=row.get("no_vibes", 0),
-            vibe_rate=round(vibe_rate, 1),
+            )
+
+        outcomes: dict[UUID, str] = {}
+        if rows and self._buffer is not None:
+            # The buffer marks flushed swipes seen and notes the write itself.
+            statuses = await self._buffer.submit_many(rows)
+            outcomes = {row.id: status for row, status in zip(rows, statuses)}
+        elif rows:
+            async with self._db.pool().connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    outcomes = await insert_swipes_async(cur, rows)
+                await conn.commit()
+
+        pending = iter(rows)
+        for idx, result in enumerate(results):
+            if result is not None:
+                continue
+            row = next(pending)
+            status = outcomes.get(row.id, SWIPE_DUPLICATE)
+            if status != SWIPE_INVALID_IDEA and self._buffer is None:
+                self._mark_seen(user_id=user_id, idea_id=row.idea_id)
+            results[idx] = SwipeResult(
+                idea_id=row.idea_id,
+                status=status,
+                swipe=row if status == SWIPE_CREATED else None,
+            )
+        if self._buffer is None and any(status == SWIPE_CREATED for status in outcomes.values()):
+            self._db.note_write(user_id)
+        return results  # type: ignore[return-value]
+
+    async def create_and_get_next(
+        self,
+        *,
+        user_id: UUID,
+        idea_id: UUID,
+        direction: str,
+        decision_time_ms: int | None,
+        window: int = 1,
+        rank: Callable[[list[FeedCandidate], SwipeStats], list[FeedCandidate]] | None = None,
+    ) -> tuple[Swipe, IdeaCard | None]:
+        """Record a swipe and load the next feed card in one transaction.
+
+        The ranking columns of `window` unseen candidates are read from the
+        feed queue and `rank` (if given) picks the card, with the user's swipe
+        stats read in the same transaction; only the picked idea and its media
+        are loaded in full. With a write buffer the swipe goes through the
+        buffer and the card is read once it has been accepted.
+        """
+        await self._check_unseen(user_id=user_id, idea_id=idea_id)
+        if self._buffer is not None:
+            swipe = await self._buffer.submit(
+                user_id=user_id,
+                idea_id=idea_id,
+                direction=direction,
+                decision_time_ms=decision_time_ms,
+            )
+            async with self._db.pool().connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    card = await self._next_card(cur, user_id=user_id, window=window, rank=rank)
+                await conn.commit()
+            return swipe, card
+
+        async with self._db.pool().connection() as conn:
+            try:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    row = await insert_swipe_async(
+                        cur,
+                        user_id=user_id,
+                        idea_id=idea_id,
+                        direction=direction,
+                        decision_time_ms=decision_time_ms,
+                    )
+                    card = await self._next_card(cur, user_id=user_id, window=window, rank=rank)
+                await conn.commit()
+            except UniqueViolation as ex:
+                await conn.rollback()
+                self._mark_seen(user_id=user_id, idea_id=idea_id)
+                raise DuplicateSwipeError("Swipe already recorded") from ex
+            except ForeignKeyViolation as ex:
+                await conn.rollback()
+                raise UnknownIdeaError("Idea not found") from ex
+
+        if not row:
+            raise RuntimeError("Failed to create swipe")
+        self._mark_seen(user_id=user_id, idea_id=idea_id)
+        self._db.note_write(user_id)
+
+        return _to_swipe(row), card
+
+    async def get_user_stats(self, *, user_id: UUID) -> SwipeStats:
+        async def query(conn: psycopg.AsyncConnection) -> list[dict]:
+            async with conn.cursor(row_factory=dict_row) as cur:
+                await cur.execute(statements.USER_CATEGORY_STATS, (user_id,), prepare=True)
+                return await cur.fetchall()
+
+        return to_swipe_stats(await self._db.read(query, user_id=user_id))
+
+    async def _check_unseen(self, *, user_id: UUID, idea_id: UUID) -> None:
+        if await self._is_seen(user_id=user_id, idea_id=idea_id):
+            raise DuplicateSwipeError("Swipe already recorded")
+
+    async def _is_seen(self, *, user_id: UUID, idea_id: UUID) -> bool:
+        # Swipes queued in the write buffer reach the seen-set only when they flush.
+        if self._buffer is not None and self._buffer.is_pending(user_id, idea_id):
+            return True
+        return self._seen is not None and await self._seen.contains_async(user_id, idea_id)
+
+    async def _next_card(
+        self,
+        cur,
+        *,
+        user_id: UUID,
+        window: int,
+        rank: Callable[[list[FeedCandidate], SwipeStats], list[FeedCandidate]] | None,
+    ) -> IdeaCard | None:
+        candidates = await rank_next_for_user_async(
+            cur,
+            user_id=user_id,
+            window=window,
+            exclude_ids=self._buffer.pending_idea_ids(user_id) if self._buffer is not None else [],
+            seen=self._seen,
+            rank=rank,
         )
+        if not candidates:
+            return None
+        return await fetch_card_async(cur, idea_id=candidates[0].id, cache=self._cache)
+
+    def _mark_seen(self, *, user_id: UUID, idea_id: UUID) -> None:
+        if self._seen is not None:
+            self._seen.add(user_id, idea_id)
+
+
+async def insert_swipe_async(
+    cur,
+    *,
+    user_id: UUID,
+    idea_id: UUID,
+    direction: str,
+    decision_time_ms: int | None,
+) -> dict | None:
+    await cur.execute(statements.SWIPE_INSERT, (user_id, idea_id, direction, decision_time_ms), prepare=True)
+    return await cur.fetchone()
+
+
+def _clamp_swiped_at(swiped_at: datetime | None, *, now: datetime) -> datetime:
+    if swiped_at is None:
+        return now
+    if swiped_at.tzinfo is None:
+        swiped_at = swiped_at.replace(tzinfo=timezone.utc)
+    return min(max(swiped_at, now - _MAX_SWIPE_BACKDATE), now)
+
+
+def _swipe_columns(swipes: list[Swipe]) -> tuple[list, ...]:
+    return (
+        [s.id for s in swipes],
+        [s.user_id for s in swipes],
+        [s.idea_id for s in swipes],
+        [s.direction for s in swipes],
+        [s.decision_time_ms for s in swipes],
+        [s.created_at for s in swipes],
+    )
+
+
+async def insert_swipes_async(cur, swipes: list[Swipe]) -> dict[UUID, str]:
+    """Insert swipes with one statement; returns each swipe id's SWIPE_* outcome."""
+    await cur.execute(statements.SWIPE_INSERT_MANY, _swipe_columns(swipes), prepare=True)
+    return {row["id"]: row["status"] for row in await cur.fetchall()}
+
+
+def _to_idea_stats(
+    row: dict,
+    *,
+    idea_id: UUID,
+    title: str | None = None,
+    category_decision_time: DecisionTimeQuantiles | None = None,
+) -> IdeaStats:
+    total = row.get("total", 0)
+    vibes = row.get("vibes", 0)
+    vibe_rate = (vibes / total * 100) if total > 0 else 0.0
+    timed = row.get("decision_time_count", 0)
+
+    return IdeaStats(
+        idea_id=idea_id,
+        title=title,
+        total_views=total,
+        total_vibes=vibes,
+        total_no_vibes=row.get("no_vibes", 0),
+        vibe_rate=round(vibe_rate, 1),
+        avg_decision_time_ms=round(row["decision_time_ms_sum"] / timed, 1) if timed else None,
+        decision_time=decision_sketch.quantiles(row.get("decision_time_sketch")),
+        category_decision_time=category_decision_time,
+    )
+
+
+def _to_swipe_bucket(row: dict) -> SwipeBucket:
+    timed = row["decision_time_count"]
+    return SwipeBucket(
+        bucket=row["bucket"],
+        total=row["total"],
+        vibes=row["vibes"],
+        no_vibes=row["no_vibes"],
+        avg_decision_time_ms=round(row["decision_time_ms_sum"] / timed, 1) if timed else None,
+    )
+
+
+def _to_swipe(row: dict) -> Swipe:
+    return Swipe(
+        id=row["id"],
+        user_id=row["user_id"],
+        idea_id=row["idea_id"],
+        direction=row["direction"],
+        decision_time_ms=row.get("decision_time_ms"),
+        created_at=row["created_at"],
+    )
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from uuid import UUID
+
+from app.data import statements
+from app.domain.models import SwipeStats
+
+
+async def fetch_user_stats_async(cur, *, user_id: UUID) -> SwipeStats:
+    """A user's swipe totals per category on an open dict-row cursor (e.g. inside a feed transaction)."""
+    await cur.execute(statements.USER_CATEGORY_STATS, (user_id,), prepare=True)
+    return to_swipe_stats(await cur.fetchall())
+
+
+def to_swipe_stats(cat_rows: list[dict]) -> SwipeStats:
+    by_category = {}
+    for r in cat_rows:
+        by_category[r["category"]] = {
+            "total": r["total"],
+            "vibes": r["vibes"],
+            "no_vibes": r["no_vibes"],
+        }
+
+    return SwipeStats(
+        total_swipes=sum(r["total"] for r in cat_rows),
+        total_vibes=sum(r["vibes"] for r in cat_rows),
+        total_no_vibes=sum(r["no_vibes"] for r in cat_rows),
+        by_category=by_category,
+    )
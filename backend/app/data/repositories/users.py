@@ -2,24 +2,61 @@ from __future__ import annotations
 
 from uuid import UUID
 
+import psycopg
 from psycopg.rows import dict_row
 from psycopg.types.json import Jsonb
 
-from app.data.db import Database
+from app.data import statements
+from app.data.db import AsyncDatabase, Database
+from app.data.user_cache import UserCache
 from app.domain.models import User
-from app.domain.ports import UserRepository
+from app.domain.ports import AsyncUserRepository, UserRepository
 
 
 class PostgresUserRepository(UserRepository):
-    def __init__(self, db: Database) -> None:
+    def __init__(self, db: Database, *, cache: UserCache | None = None) -> None:
         self._db = db
+        self._cache = cache
 
     def get_by_id(self, user_id: UUID) -> User | None:
+        if self._cache is not None:
+            cached = self._cache.get(user_id)
+            if cached is not None:
+                return cached
+        token = self._cache.read_token() if self._cache is not None else 0
+
+        def query(conn: psycopg.Connection) -> dict | None:
+            with conn.cursor(row_factory=dict_row) as cur:
+                cur.execute(statements.USER_BY_ID, (user_id,), prepare=True)
+                return cur.fetchone()
+
+        if self._cache is not None:
+            # A lagging replica's row would stay cached until the user next changes; fill from the primary.
+            with self._db.pool().connection() as conn:
+                row = query(conn)
+        else:
+            row = self._db.read(query, user_id=user_id)
+        if not row:
+            return None
+        user = _to_user(row)
+        if self._cache is not None:
+            self._cache.put(user.id, user, token=token)
+        return user
+
+    def get_by_auth(self, *, auth_provider: str, auth_subject: str) -> User | None:
+        # Read the primary: the row is cached, and a lagging replica could hand back an old profile.
+        token = self._cache.read_token() if self._cache is not None else 0
         with self._db.pool().connection() as conn:
             with conn.cursor(row_factory=dict_row) as cur:
-                cur.execute("SELECT * FROM users WHERE id = %s", (user_id,))
+                cur.execute(statements.USER_BY_AUTH, (auth_provider, auth_subject), prepare=True)
                 row = cur.fetchone()
-        return _to_user(row) if row else None
+        if not row:
+            return None
+        user = _to_user(row)
+        if self._cache is not None:
+            # The app usually asks for /me right after login.
+            self._cache.put(user.id, user, token=token)
+        return user
 
     def upsert_by_auth(self, *, auth_provider: str, auth_subject: str) -> User:
         with self._db.pool().connection() as conn:
@@ -38,6 +75,7 @@ class PostgresUserRepository(UserRepository):
             conn.commit()
         if not row:
             raise RuntimeError("Failed to upsert user")
+        self._db.note_write(row["id"])
         return _to_user(row)
 
     def update_interests(self, *, user_id: UUID, interests: dict | None) -> User:
@@ -50,6 +88,9 @@ class PostgresUserRepository(UserRepository):
                 )
                 row = cur.fetchone()
             conn.commit()
+        self._db.note_write(user_id)
+        if self._cache is not None:
+            self._cache.invalidate(user_id)
         if not row:
             raise KeyError("User not found")
         return _to_user(row)
@@ -77,11 +118,44 @@ class PostgresUserRepository(UserRepository):
                 )
                 row = cur.fetchone()
             conn.commit()
+        self._db.note_write(user_id)
+        if self._cache is not None:
+            self._cache.invalidate(user_id)
         if not row:
             raise KeyError("User not found")
         return _to_user(row)
 
 
+class AsyncPostgresUserRepository(AsyncUserRepository):
+    def __init__(self, db: AsyncDatabase, *, cache: UserCache | None = None) -> None:
+        self._db = db
+        self._cache = cache
+
+    async def get_by_id(self, user_id: UUID) -> User | None:
+        if self._cache is not None:
+            cached = self._cache.get(user_id)
+            if cached is not None:
+                return cached
+        token = self._cache.read_token() if self._cache is not None else 0
+
+        async def query(conn: psycopg.AsyncConnection) -> dict | None:
+            async with conn.cursor(row_factory=dict_row) as cur:
+                await cur.execute(statements.USER_BY_ID, (user_id,), prepare=True)
+                return await cur.fetchone()
+
+        if self._cache is not None:
+            async with self._db.pool().connection() as conn:
+                row = await query(conn)
+        else:
+            row = await self._db.read(query, user_id=user_id)
+        if not row:
+            return None
+        user = _to_user(row)
+        if self._cache is not None:
+            self._cache.put(user.id, user, token=token)
+        return user
+
+
 def _to_user(row: dict) -> User:
     return User(
         id=row["id"],
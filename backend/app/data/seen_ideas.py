@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Iterable
+from uuid import UUID
+
+from app.data import statements
+from app.data.db import AsyncDatabase
+
+
+class _IdSet:
+    """Idea ids packed as sorted 16-byte keys into one bytearray.
+
+    Costs 16 bytes per id (a `set[UUID]` costs well over 100), with
+    O(log n) lookups and an O(n) memmove per insert.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, ids: Iterable[UUID] = ()) -> None:
+        self._data = bytearray(b"".join(sorted({idea_id.bytes for idea_id in ids})))
+
+    def __len__(self) -> int:
+        return len(self._data) // 16
+
+    def __getitem__(self, index: int) -> bytes:
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return bytes(self._data[index * 16 : index * 16 + 16])
+
+    def __contains__(self, idea_id: UUID) -> bool:
+        key = idea_id.bytes
+        index = bisect_left(self, key)
+        return index < len(self) and self[index] == key
+
+    def add(self, idea_id: UUID, *, cap: int) -> None:
+        key = idea_id.bytes
+        index = bisect_left(self, key)
+        if index < len(self) and self[index] == key:
+            return
+        if len(self) >= cap:
+            # Idea ids are random, so the new key picks an effectively random victim.
+            victim = int.from_bytes(key[:8], "big") % len(self)
+            del self._data[victim * 16 : victim * 16 + 16]
+            if victim < index:
+                index -= 1
+        self._data[index * 16 : index * 16] = key
+
+
+class SeenIdeaCache:
+    """Process-local record of the idea ids each user has swiped.
+
+    Swipes are never undone, so a hit is authoritative: the user has seen the
+    idea. A miss may be stale (the swipe was recorded by another worker, or
+    fell outside the per-user cap), so callers still confirm against
+    Postgres. Each user holds at most `max_ideas_per_user` ids, loaded newest
+    swipe first; users are evicted LRU-first once more than `max_users` are
+    held.
+    """
+
+    def __init__(self, db: AsyncDatabase, *, max_users: int, max_ideas_per_user: int) -> None:
+        self._db = db
+        self._max_users = max_users
+        self._max_ideas_per_user = max_ideas_per_user
+        self._lock = threading.Lock()
+        self._seen: OrderedDict[UUID, _IdSet] = OrderedDict()
+
+    async def contains_async(self, user_id: UUID, idea_id: UUID) -> bool:
+        seen = await self._get_or_load(user_id)
+        with self._lock:
+            return idea_id in seen
+
+    async def warm_async(self, user_id: UUID) -> None:
+        """Load the user's set now, so later lookups don't need a second pooled connection."""
+        await self._get_or_load(user_id)
+
+    def filter_seen(self, user_id: UUID, idea_ids: list[UUID]) -> list[UUID]:
+        """The ids in `idea_ids` the user's loaded set holds; none if it is not loaded."""
+        with self._lock:
+            seen = self._seen.get(user_id)
+            if seen is None:
+                return []
+            return [idea_id for idea_id in idea_ids if idea_id in seen]
+
+    def add(self, user_id: UUID, idea_id: UUID) -> None:
+        # Only extend sets that are already loaded; a later load reads the swipe from Postgres.
+        with self._lock:
+            seen = self._seen.get(user_id)
+            if seen is not None:
+                seen.add(idea_id, cap=self._max_ideas_per_user)
+                self._seen.move_to_end(user_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._seen.clear()
+
+    async def _get_or_load(self, user_id: UUID) -> _IdSet:
+        with self._lock:
+            seen = self._seen.get(user_id)
+            if seen is not None:
+                self._seen.move_to_end(user_id)
+                return seen
+
+        async with self._db.pool().connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(statements.SEEN_IDEA_IDS, (user_id, self._max_ideas_per_user), prepare=True)
+                loaded = _IdSet(r[0] for r in await cur.fetchall())
+
+        with self._lock:
+            seen = self._seen.get(user_id)
+            if seen is None:
+                seen = self._seen[user_id] = loaded
+            self._seen.move_to_end(user_id)
+            while len(self._seen) > self._max_users:
+                self._seen.popitem(last=False)
+            return seen
@@ -0,0 +1,249 @@
+"""Registry of the hot repository statements.
+
+Repositories execute these with `prepare=True`, so each one is parsed and
+planned once per pooled connection and then run as a server-side prepared
+statement. psycopg keeps the prepared handles per connection; a recycled or
+reconnected connection prepares them again on first use. Setting
+DB_PREPARED_STATEMENTS=false (e.g. behind pgbouncer in transaction mode)
+turns preparing off on every connection. Keep the text of each statement
+constant: psycopg identifies prepared statements by their query text.
+"""
+
+from __future__ import annotations
+
+
+# ── users ────────────────────────────────────────────────────────
+
+USER_BY_ID = "SELECT * FROM users WHERE id = %s"
+
+USER_BY_AUTH = "SELECT * FROM users WHERE auth_provider = %s AND auth_subject = %s"
+
+
+# ── ideas ────────────────────────────────────────────────────────
+
+IDEA_BY_ID = "SELECT * FROM ideas WHERE id = %s"
+
+IDEAS_EXISTING = "SELECT id FROM ideas WHERE id = ANY(%s::uuid[])"
+
+IDEAS_BY_IDS = "SELECT * FROM ideas WHERE id = ANY(%s::uuid[])"
+
+# LIMIT NULL means no limit. Pages resume with an index seek on (author_id, created_at, id).
+IDEAS_BY_AUTHOR = """
+    SELECT * FROM ideas
+    WHERE author_id = %s
+    ORDER BY created_at DESC, id DESC
+    LIMIT %s
+"""
+
+IDEAS_BY_AUTHOR_AFTER = """
+    SELECT * FROM ideas
+    WHERE author_id = %s AND (created_at, id) < (%s, %s)
+    ORDER BY created_at DESC, id DESC
+    LIMIT %s
+"""
+
+# An idea row plus its media, ordered by position, as a JSON array in the `media` column.
+_CARD_SELECT = """
+    SELECT i.*, COALESCE(m.media, '[]'::json) AS media
+    FROM ideas i
+    LEFT JOIN LATERAL (
+      SELECT json_agg(im ORDER BY im.position) AS media
+      FROM idea_media im
+      WHERE im.idea_id = i.id
+    ) m ON true
+"""
+
+IDEA_CARD_BY_ID = f"{_CARD_SELECT} WHERE i.id = %s"
+
+IDEA_CARDS_BY_AUTHOR = f"""
+    {_CARD_SELECT}
+    WHERE i.author_id = %s
+    ORDER BY i.created_at DESC, i.id DESC
+    LIMIT %s
+"""
+
+IDEA_CARDS_BY_AUTHOR_AFTER = f"""
+    {_CARD_SELECT}
+    WHERE i.author_id = %s AND (i.created_at, i.id) < (%s, %s)
+    ORDER BY i.created_at DESC, i.id DESC
+    LIMIT %s
+"""
+
+
+# ── feed queue ───────────────────────────────────────────────────
+
+# Ranking columns of the user's next queued ideas, newest first; full rows
+# are loaded (IDEAS_BY_IDS, IDEA_CARD_BY_ID) only for the ideas served.
+FEED_QUEUE_CANDIDATES = """
+    SELECT i.id, i.category, i.tags, i.created_at
+    FROM feed_queue q
+    JOIN ideas i ON i.id = q.idea_id
+    WHERE q.user_id = %s
+      AND q.idea_id <> ALL(%s::uuid[])
+      AND i.status = 'published'
+    ORDER BY q.created_at DESC, q.idea_id DESC
+    LIMIT %s
+"""
+
+# Serialize refills per user so a concurrent refill can't mark the queue exhausted early.
+FEED_QUEUE_LOCK = "SELECT pg_advisory_xact_lock(hashtextextended(%s::text, 0))"
+
+# Ideas published since the last refill are still waiting in feed_queue_pending
+# for the fan-out job; a queue that ran dry pulls them in itself.
+FEED_QUEUE_EXHAUSTED = """
+    SELECT st.exhausted AND NOT EXISTS (
+      SELECT 1 FROM feed_queue_pending p WHERE p.queued_at >= st.refilled_at
+    ) AS exhausted
+    FROM feed_queue_state st
+    WHERE st.user_id = %s
+"""
+
+FEED_QUEUE_REFILL = """
+    INSERT INTO feed_queue(user_id, idea_id, created_at)
+    SELECT %s, i.id, i.created_at
+    FROM ideas i
+    WHERE i.status = 'published'
+      AND i.author_id IS DISTINCT FROM %s
+      AND NOT EXISTS (
+        SELECT 1 FROM feed_queue q
+        WHERE q.user_id = %s AND q.idea_id = i.id
+      )
+      AND NOT EXISTS (
+        SELECT 1 FROM swipes s
+        WHERE s.user_id = %s AND s.idea_id = i.id
+      )
+    ORDER BY i.created_at DESC
+    LIMIT %s
+    ON CONFLICT DO NOTHING
+"""
+
+# Entries for ideas the user has already swiped, left behind by a refill that
+# raced the swipe; the peek drops them when the seen-set spots them.
+FEED_QUEUE_DROP = "DELETE FROM feed_queue WHERE user_id = %s AND idea_id = ANY(%s::uuid[])"
+
+FEED_QUEUE_STATE_UPSERT = """
+    INSERT INTO feed_queue_state(user_id, exhausted)
+    VALUES (%s, %s)
+    ON CONFLICT (user_id) DO UPDATE SET exhausted = EXCLUDED.exhausted, refilled_at = now()
+"""
+
+
+# ── idea media ───────────────────────────────────────────────────
+
+MEDIA_BY_IDEAS = "SELECT * FROM idea_media WHERE idea_id = ANY(%s::uuid[]) ORDER BY idea_id, position"
+
+
+# ── swipes ───────────────────────────────────────────────────────
+
+SWIPE_INSERT = """
+    INSERT INTO swipes(user_id, idea_id, direction, decision_time_ms)
+    VALUES (%s, %s, %s, %s)
+    RETURNING *
+"""
+
+# Many swipes in one statement. Rows for missing ideas are skipped and
+# conflicts are ignored; every input row comes back with its outcome:
+# 'created', 'duplicate' or 'invalid_idea'. The idea check decides between
+# the latter two because a swipe committed concurrently is not visible to
+# this statement's snapshot.
+SWIPE_INSERT_MANY = """
+    WITH v AS (
+      SELECT *
+      FROM unnest(
+        %s::uuid[], %s::uuid[], %s::uuid[], %s::text[], %s::int[], %s::timestamptz[]
+      ) AS v(id, user_id, idea_id, direction, decision_time_ms, created_at)
+    ),
+    ins AS (
+      INSERT INTO swipes(id, user_id, idea_id, direction, decision_time_ms, created_at)
+      SELECT v.id, v.user_id, v.idea_id, v.direction::swipe_direction, v.decision_time_ms, v.created_at
+      FROM v
+      WHERE EXISTS (SELECT 1 FROM ideas i WHERE i.id = v.idea_id)
+      ON CONFLICT DO NOTHING
+      RETURNING id
+    )
+    SELECT
+      v.id,
+      CASE
+        WHEN ins.id IS NOT NULL THEN 'created'
+        WHEN EXISTS (SELECT 1 FROM ideas i WHERE i.id = v.idea_id) THEN 'duplicate'
+        ELSE 'invalid_idea'
+      END AS status
+    FROM v
+    LEFT JOIN ins ON ins.id = v.id
+"""
+
+SEEN_IDEA_IDS = "SELECT idea_id FROM swipes WHERE user_id = %s ORDER BY created_at DESC LIMIT %s"
+
+# The trigger-maintained per-category rollup (migration 0009): one row per
+# category the user has swiped in; user totals are the sum of the rows.
+USER_CATEGORY_STATS = """
+    SELECT category, total, vibes, no_vibes
+    FROM user_category_stats
+    WHERE user_id = %s AND total > 0
+    ORDER BY total DESC, category
+"""
+
+# Per-idea totals come from the trigger-maintained idea_swipe_counters
+# (migration 0008); an idea without a counter row has no swipes yet.
+AUTHOR_IDEA_SWIPE_TOTALS = """
+    SELECT
+      i.id AS idea_id,
+      i.title,
+      i.category,
+      COALESCE(c.total, 0) AS total,
+      COALESCE(c.vibes, 0) AS vibes,
+      COALESCE(c.no_vibes, 0) AS no_vibes,
+      COALESCE(c.decision_time_ms_sum, 0) AS decision_time_ms_sum,
+      COALESCE(c.decision_time_count, 0) AS decision_time_count,
+      c.decision_time_sketch
+    FROM ideas i
+    LEFT JOIN idea_swipe_counters c ON c.idea_id = i.id
+    WHERE i.author_id = %s
+    ORDER BY i.created_at DESC, i.id DESC
+"""
+
+# Decision-time sketch shards (migration 0011); callers merge the shards per category.
+CATEGORY_DECISION_SKETCHES = """
+    SELECT category, sketch FROM category_decision_sketches WHERE category = ANY(%s::text[])
+"""
+
+# Rolled-up buckets (migration 0010) below the rollup watermark plus raw swipes
+# at or after it, merged per bucket. %(granularity)s is 'hour' or 'day'.
+IDEA_SWIPE_TIMESERIES = """
+    WITH tail_start AS (
+      SELECT COALESCE(
+        (SELECT watermark FROM rollup_watermarks WHERE name = 'swipe_rollups'),
+        '-infinity'::timestamptz
+      ) AS at
+    ),
+    buckets AS (
+      SELECT bucket, total, vibes, no_vibes, decision_time_ms_sum, decision_time_count
+      FROM swipe_rollups
+      WHERE idea_id = %(idea_id)s
+        AND granularity = %(granularity)s
+        AND bucket >= %(since)s AND bucket < %(until)s
+      UNION ALL
+      SELECT
+        date_trunc(%(granularity)s, s.created_at, 'UTC'),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE s.direction = 'vibe'),
+        COUNT(*) FILTER (WHERE s.direction = 'no_vibe'),
+        COALESCE(SUM(s.decision_time_ms), 0),
+        COUNT(s.decision_time_ms)
+      FROM swipes s, tail_start t
+      WHERE s.idea_id = %(idea_id)s
+        AND s.created_at >= t.at
+        AND s.created_at >= %(since)s AND s.created_at < %(until)s
+      GROUP BY 1
+    )
+    SELECT
+      bucket,
+      SUM(total)::bigint AS total,
+      SUM(vibes)::bigint AS vibes,
+      SUM(no_vibes)::bigint AS no_vibes,
+      SUM(decision_time_ms_sum)::bigint AS decision_time_ms_sum,
+      SUM(decision_time_count)::bigint AS decision_time_count
+    FROM buckets
+    GROUP BY bucket
+    ORDER BY bucket
+"""
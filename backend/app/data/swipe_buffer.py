@@ -0,0 +1,374 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timezone
+from uuid import UUID
+
+from psycopg.rows import dict_row
+
+from app.data import statements
+from app.data.db import AsyncDatabase
+from app.data.idea_cache import IdeaCache
+from app.data.repositories.swipes import (
+    SWIPE_CREATED,
+    SWIPE_DUPLICATE,
+    SWIPE_INVALID_IDEA,
+    DuplicateSwipeError,
+    UnknownIdeaError,
+    insert_swipes_async,
+)
+from app.data.seen_ideas import SeenIdeaCache
+from app.domain.models import Swipe
+
+
+logger = logging.getLogger(__name__)
+
+SWIPE_WRITE_DIRECT = "direct"
+SWIPE_WRITE_GROUP = "group"
+SWIPE_WRITE_BEHIND = "write_behind"
+
+# Backoff between retries of a failed write-behind flush: doubles from _RETRY_SECONDS up to _MAX_RETRY_SECONDS.
+_RETRY_SECONDS = 0.1
+_MAX_RETRY_SECONDS = 5.0
+# Consecutive failed flushes of the same write-behind batch before it is dead-lettered (while running).
+_MAX_ATTEMPTS = 8
+
+
+class SwipeBufferFullError(Exception):
+    pass
+
+
+class SwipeWriteBuffer:
+    """Collects swipes on the event loop and inserts them in batches.
+
+    A batch is flushed when it reaches `max_batch` swipes or `flush_interval`
+    seconds after its first swipe arrived, with one statement and one commit.
+    In `group` mode `submit` waits for its batch to commit and reports
+    duplicates and unknown ideas like a direct insert would. In `write_behind`
+    mode `submit` checks that the idea exists and returns as soon as the swipe
+    is queued. A swipe repeating one that is still queued is a duplicate in
+    both modes. Once `max_pending` swipes are queued, new submits raise
+    `SwipeBufferFullError`.
+
+    A failed write-behind flush is retried with backoff: up to `_MAX_ATTEMPTS`
+    times while running, and until `drain_timeout` seconds after `stop()`
+    while draining. A batch that runs out of retries is appended to the
+    `dead_letter_path` spool (JSON lines, see `read_dead_letters`) for replay.
+    Swipes still queued when the process dies without `stop()` are lost. In
+    `group` mode a failed flush fails its waiting submits instead.
+    Feed reads exclude `pending_idea_ids` so queued swipes are not re-served.
+
+    Swipe ids and timestamps are assigned on submit, so the returned `Swipe`
+    is the row that will be stored.
+    """
+
+    def __init__(
+        self,
+        db: AsyncDatabase,
+        *,
+        mode: str,
+        seen: SeenIdeaCache | None = None,
+        cache: IdeaCache | None = None,
+        max_batch: int = 500,
+        flush_interval: float = 0.02,
+        max_pending: int = 10_000,
+        drain_timeout: float = 30.0,
+        dead_letter_path: str | None = None,
+    ) -> None:
+        if mode not in (SWIPE_WRITE_GROUP, SWIPE_WRITE_BEHIND):
+            raise ValueError(f"Unsupported swipe write mode: {mode}")
+        self._db = db
+        self._mode = mode
+        self._seen = seen
+        self._cache = cache
+        self._max_batch = max_batch
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._drain_timeout = drain_timeout
+        self._dead_letter_path = dead_letter_path
+        self._pending: list[tuple[Swipe, asyncio.Future[str]]] = []
+        # Idea ids of each user's queued swipes: the recent set that catches repeats before they flush.
+        self._pending_ideas: dict[UUID, set[UUID]] = {}
+        self._has_pending = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        self._drain_deadline = 0.0
+        self._attempts = 0
+        self._flushes = 0
+        self._flushed = 0
+        self._rejected = 0
+        self._failures = 0
+        self._dropped = 0
+        self._dead_lettered = 0
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stopping = False
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="swipe-write-buffer")
+
+    async def stop(self) -> None:
+        """Flush everything queued, retrying failures for up to `drain_timeout` seconds, then stop."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._drain_deadline = asyncio.get_running_loop().time() + self._drain_timeout
+        self._has_pending.set()
+        self._batch_full.set()
+        await self._task
+        self._task = None
+
+    async def submit(self, *, user_id: UUID, idea_id: UUID, direction: str, decision_time_ms: int | None) -> Swipe:
+        swipe = Swipe(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            idea_id=idea_id,
+            direction=direction,
+            decision_time_ms=decision_time_ms,
+            created_at=datetime.now(timezone.utc),
+        )
+        [status] = await self.submit_many([swipe])
+        if status == SWIPE_DUPLICATE:
+            raise DuplicateSwipeError("Swipe already recorded")
+        if status != SWIPE_CREATED:
+            raise UnknownIdeaError("Idea not found")
+        return swipe
+
+    async def submit_many(self, swipes: list[Swipe]) -> list[str]:
+        """Queue swipes built by the caller; returns each one's SWIPE_* outcome, in order.
+
+        In `write_behind` mode queued swipes report `created` without waiting
+        for their flush.
+        """
+        if self._task is None or self._stopping:
+            raise RuntimeError("Swipe write buffer is not running")
+        if len(self._pending) + len(swipes) > self._max_pending:
+            raise SwipeBufferFullError("Swipe write buffer is full")
+        known: set[UUID] | None = None
+        if self._mode == SWIPE_WRITE_BEHIND:
+            known = await self._existing_ideas({swipe.idea_id for swipe in swipes})
+
+        # Checked after the existence lookup awaited, so repeats queued meanwhile are caught.
+        statuses: list[str | None] = []
+        waiting: list[tuple[int, asyncio.Future[str]]] = []
+        loop = asyncio.get_running_loop()
+        for swipe in swipes:
+            if self.is_pending(swipe.user_id, swipe.idea_id):
+                statuses.append(SWIPE_DUPLICATE)
+                continue
+            if known is not None and swipe.idea_id not in known:
+                statuses.append(SWIPE_INVALID_IDEA)
+                continue
+            done: asyncio.Future[str] = loop.create_future()
+            self._pending.append((swipe, done))
+            self._pending_ideas.setdefault(swipe.user_id, set()).add(swipe.idea_id)
+            waiting.append((len(statuses), done))
+            statuses.append(None)
+        if waiting:
+            self._has_pending.set()
+            if len(self._pending) >= self._max_batch:
+                self._batch_full.set()
+
+        if self._mode == SWIPE_WRITE_BEHIND:
+            return [SWIPE_CREATED if status is None else status for status in statuses]
+
+        outcomes = await asyncio.gather(*(asyncio.shield(done) for _, done in waiting), return_exceptions=True)
+        for (idx, _), outcome in zip(waiting, outcomes):
+            if isinstance(outcome, BaseException):
+                raise outcome
+            statuses[idx] = outcome
+        return statuses  # type: ignore[return-value]
+
+    def is_pending(self, user_id: UUID, idea_id: UUID) -> bool:
+        """Whether the user's swipe on `idea_id` is queued but not yet flushed."""
+        return idea_id in self._pending_ideas.get(user_id, ())
+
+    def pending_idea_ids(self, user_id: UUID) -> list[UUID]:
+        """Ideas the user swiped that are queued but not yet flushed."""
+        return list(self._pending_ideas.get(user_id, ()))
+
+    def stats(self) -> dict:
+        return {
+            "mode": self._mode,
+            "pending": len(self._pending),
+            "flushes": self._flushes,
+            "flushed": self._flushed,
+            "rejected": self._rejected,
+            "failures": self._failures,
+            "dropped": self._dropped,
+            "dead_lettered": self._dead_lettered,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_pending.wait()
+            if not self._stopping and len(self._pending) < self._max_batch:
+                # Give the batch one flush interval to fill up.
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), timeout=self._flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            while self._pending:
+                if not await self._flush():
+                    await asyncio.sleep(self._retry_delay())
+                    break
+                if not self._stopping and len(self._pending) < self._max_batch:
+                    break
+            if self._stopping and not self._pending:
+                return
+
+    async def _flush(self) -> bool:
+        """Flush one batch. Returns False if it was put back to be retried."""
+        batch = self._pending[: self._max_batch]
+        del self._pending[: self._max_batch]
+        if not self._pending:
+            self._has_pending.clear()
+        if len(self._pending) < self._max_batch:
+            self._batch_full.clear()
+        swipes = [swipe for swipe, _ in batch]
+
+        if self._mode == SWIPE_WRITE_BEHIND and self._stopping and self._drain_expired():
+            # Out of drain time: spool the rest rather than wait on a database that is not answering.
+            await self._drop(batch, RuntimeError("Swipe buffer drain timed out"))
+            return True
+        try:
+            async with self._db.pool().connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    outcomes = await insert_swipes_async(cur, swipes)
+                await conn.commit()
+        except Exception as ex:
+            self._failures += 1
+            self._attempts += 1
+            if self._mode == SWIPE_WRITE_BEHIND and self._may_retry():
+                logger.warning("Swipe flush of %d swipes failed; retrying", len(batch), exc_info=True)
+                self._pending[:0] = batch
+                self._has_pending.set()
+                return False
+            logger.exception("Swipe flush of %d swipes failed; dropping them", len(batch))
+            await self._drop(batch, ex)
+            return True
+
+        self._attempts = 0
+        self._flushes += 1
+        users: set[UUID] = set()
+        for swipe, done in batch:
+            status = outcomes.get(swipe.id, SWIPE_DUPLICATE)
+            self._forget(swipe)
+            if status == SWIPE_CREATED:
+                self._flushed += 1
+                users.add(swipe.user_id)
+            else:
+                self._rejected += 1
+                if self._mode == SWIPE_WRITE_BEHIND:
+                    logger.info("Buffered swipe %s rejected: %s", swipe.id, status)
+            if status in (SWIPE_CREATED, SWIPE_DUPLICATE) and self._seen is not None:
+                self._seen.add(swipe.user_id, swipe.idea_id)
+            if not done.done():
+                done.set_result(status)
+        for user_id in users:
+            self._db.note_write(user_id)
+        return True
+
+    async def _drop(self, batch: list[tuple[Swipe, asyncio.Future[str]]], ex: Exception) -> None:
+        self._attempts = 0
+        self._dropped += len(batch)
+        if self._mode == SWIPE_WRITE_BEHIND:
+            # Nobody awaits write-behind swipes; the dead letter is all that is left of them.
+            await self._dead_letter([swipe for swipe, _ in batch])
+        for swipe, done in batch:
+            self._forget(swipe)
+            if not done.done():
+                done.set_exception(ex)
+                done.exception()  # Write-behind submits never await theirs.
+
+    async def _dead_letter(self, swipes: list[Swipe]) -> None:
+        if self._dead_letter_path is not None:
+            try:
+                await asyncio.to_thread(append_dead_letters, self._dead_letter_path, swipes)
+            except OSError:
+                logger.exception("Could not spool %d dropped swipes to %s", len(swipes), self._dead_letter_path)
+            else:
+                self._dead_lettered += len(swipes)
+                logger.error("Spooled %d dropped swipes to %s", len(swipes), self._dead_letter_path)
+                return
+        for swipe in swipes:
+            logger.error("Dropped swipe %s", json.dumps(_dead_letter_record(swipe)))
+
+    def _may_retry(self) -> bool:
+        if self._stopping:
+            return not self._drain_expired()
+        return self._attempts < _MAX_ATTEMPTS
+
+    def _drain_expired(self) -> bool:
+        return asyncio.get_running_loop().time() >= self._drain_deadline
+
+    def _retry_delay(self) -> float:
+        delay = min(_RETRY_SECONDS * 2 ** max(self._attempts - 1, 0), _MAX_RETRY_SECONDS)
+        if self._stopping:
+            delay = min(delay, max(0.0, self._drain_deadline - asyncio.get_running_loop().time()))
+        return delay
+
+    async def _existing_ideas(self, idea_ids: set[UUID]) -> set[UUID]:
+        if self._cache is not None:
+            known = {idea_id for idea_id in idea_ids if self._cache.get_idea(idea_id) is not None}
+        else:
+            known = set()
+        missing = list(idea_ids - known)
+        if missing:
+            async with self._db.pool().connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(statements.IDEAS_EXISTING, (missing,), prepare=True)
+                    known.update(row[0] for row in await cur.fetchall())
+        return known
+
+    def _forget(self, swipe: Swipe) -> None:
+        pending = self._pending_ideas.get(swipe.user_id)
+        if pending is None:
+            return
+        pending.discard(swipe.idea_id)
+        if not pending:
+            del self._pending_ideas[swipe.user_id]
+
+
+def append_dead_letters(path: str, swipes: list[Swipe]) -> None:
+    """Append swipes to the dead-letter spool and fsync it."""
+    with open(path, "a", encoding="utf-8") as spool:
+        for swipe in swipes:
+            spool.write(json.dumps(_dead_letter_record(swipe)) + "\n")
+        spool.flush()
+        os.fsync(spool.fileno())
+
+
+def read_dead_letters(path: str) -> list[Swipe]:
+    with open(path, encoding="utf-8") as spool:
+        return [
+            Swipe(
+                id=UUID(record["id"]),
+                user_id=UUID(record["user_id"]),
+                idea_id=UUID(record["idea_id"]),
+                direction=record["direction"],
+                decision_time_ms=record["decision_time_ms"],
+                created_at=datetime.fromisoformat(record["created_at"]),
+            )
+            for record in map(json.loads, filter(str.strip, spool))
+        ]
+
+
+def _dead_letter_record(swipe: Swipe) -> dict:
+    return {
+        "id": str(swipe.id),
+        "user_id": str(swipe.user_id),
+        "idea_id": str(swipe.idea_id),
+        "direction": swipe.direction,
+        "decision_time_ms": swipe.decision_time_ms,
+        "created_at": swipe.created_at.isoformat(),
+    }
@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from app.data.keyed_cache import KeyedCache
+from app.domain.models import User
+
+
+# Fired by the trigger in migrations/0012_user_cache_notify.sql with the user id as payload.
+USER_CHANGED_CHANNEL = "user_changed"
+
+
+class UserCache(KeyedCache[User]):
+    """Size-bounded LRU of user rows, keyed by user id."""
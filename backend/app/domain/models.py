@@ -37,6 +37,15 @@ class Idea:
     status: str = "published"
 
 
+@dataclass(frozen=True)
+class FeedCandidate:
+    """The columns feed ranking reads; full ideas are loaded only for the candidates served."""
+    id: UUID
+    category: str
+    tags: list[str] | None
+    created_at: datetime
+
+
 @dataclass(frozen=True)
 class IdeaMedia:
     id: UUID
@@ -47,6 +56,20 @@ class IdeaMedia:
     created_at: datetime
 
 
+@dataclass(frozen=True)
+class KeysetCursor:
+    """Position after the last row of a page ordered by (created_at, id) descending."""
+    created_at: datetime
+    id: UUID
+
+
+@dataclass(frozen=True)
+class IdeaCard:
+    """An idea together with its ordered media gallery."""
+    idea: Idea
+    media: list[IdeaMedia] = field(default_factory=list)
+
+
 @dataclass(frozen=True)
 class Swipe:
     id: UUID
@@ -57,6 +80,22 @@ class Swipe:
     created_at: datetime
 
 
+@dataclass(frozen=True)
+class NewSwipe:
+    idea_id: UUID
+    direction: str  # 'vibe' | 'no_vibe'
+    decision_time_ms: int | None = None
+    swiped_at: datetime | None = None  # When the client recorded it (queued offline); clamped on insert
+
+
+@dataclass(frozen=True)
+class SwipeResult:
+    """Outcome of one swipe in a bulk insert."""
+    idea_id: UUID
+    status: str  # 'created' | 'duplicate' | 'invalid_idea'
+    swipe: Swipe | None = None  # Set when created
+
+
 @dataclass(frozen=True)
 class SwipeStats:
     """Aggregated swipe statistics for a user."""
@@ -66,11 +105,33 @@ class SwipeStats:
     by_category: dict = field(default_factory=dict)  # {category: {vibes, no_vibes, total}}
 
 
+@dataclass(frozen=True)
+class SwipeBucket:
+    """Swipe counts for one hour or day (UTC) of an idea's timeseries."""
+    bucket: datetime
+    total: int = 0
+    vibes: int = 0
+    no_vibes: int = 0
+    avg_decision_time_ms: float | None = None
+
+
+@dataclass(frozen=True)
+class DecisionTimeQuantiles:
+    """Time-to-decide percentiles in ms, accurate to within 2%."""
+    p50_ms: int
+    p90_ms: int
+    p99_ms: int
+
+
 @dataclass(frozen=True)
 class IdeaStats:
     """Aggregated statistics for a single idea."""
     idea_id: UUID | None = None
+    title: str | None = None
     total_views: int = 0
     total_vibes: int = 0
     total_no_vibes: int = 0
     vibe_rate: float = 0.0
+    avg_decision_time_ms: float | None = None
+    decision_time: DecisionTimeQuantiles | None = None
+    category_decision_time: DecisionTimeQuantiles | None = None  # All ideas in the same category
@@ -1,15 +1,33 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from datetime import datetime
 from uuid import UUID
 
-from app.domain.models import Idea, IdeaMedia, IdeaStats, Swipe, SwipeStats, User
+from app.domain.models import (
+    FeedCandidate,
+    Idea,
+    IdeaCard,
+    IdeaMedia,
+    IdeaStats,
+    KeysetCursor,
+    NewSwipe,
+    Swipe,
+    SwipeBucket,
+    SwipeResult,
+    SwipeStats,
+    User,
+)
 
 
 class UserRepository(ABC):
     @abstractmethod
     def get_by_id(self, user_id: UUID) -> User | None: ...
 
+    @abstractmethod
+    def get_by_auth(self, *, auth_provider: str, auth_subject: str) -> User | None: ...
+
     @abstractmethod
     def upsert_by_auth(self, *, auth_provider: str, auth_subject: str) -> User: ...
 
@@ -52,10 +70,25 @@ class IdeaRepository(ABC):
     def get_by_id(self, *, idea_id: UUID) -> Idea | None: ...
 
     @abstractmethod
-    def get_next_for_user(self, *, user_id: UUID) -> Idea | None: ...
+    def list_by_author(
+        self,
+        *,
+        author_id: UUID,
+        limit: int | None = None,
+        after: KeysetCursor | None = None,
+    ) -> list[Idea]: ...
 
     @abstractmethod
-    def list_by_author(self, *, author_id: UUID) -> list[Idea]: ...
+    def get_card(self, *, idea_id: UUID) -> IdeaCard | None: ...
+
+    @abstractmethod
+    def list_cards_by_author(
+        self,
+        *,
+        author_id: UUID,
+        limit: int | None = None,
+        after: KeysetCursor | None = None,
+    ) -> list[IdeaCard]: ...
 
     @abstractmethod
     def update(
@@ -92,6 +125,9 @@ class IdeaMediaRepository(ABC):
     @abstractmethod
     def list_by_idea(self, *, idea_id: UUID) -> list[IdeaMedia]: ...
 
+    @abstractmethod
+    def list_by_ideas(self, *, idea_ids: list[UUID]) -> dict[UUID, list[IdeaMedia]]: ...
+
     @abstractmethod
     def delete(self, *, media_id: UUID, idea_id: UUID) -> bool: ...
 
@@ -101,10 +137,67 @@ class IdeaMediaRepository(ABC):
 
 class SwipeRepository(ABC):
     @abstractmethod
-    def create(self, *, user_id: UUID, idea_id: UUID, direction: str, decision_time_ms: int | None) -> Swipe: ...
+    def get_user_stats(self, *, user_id: UUID) -> SwipeStats: ...
 
     @abstractmethod
-    def get_user_stats(self, *, user_id: UUID) -> SwipeStats: ...
+    def get_author_idea_stats(self, *, author_id: UUID) -> list[IdeaStats]: ...
+
+    @abstractmethod
+    def get_idea_timeseries(
+        self,
+        *,
+        idea_id: UUID,
+        granularity: str,
+        since: datetime,
+        until: datetime,
+    ) -> list[SwipeBucket]: ...
+
+
+# Async ports cover the feed and swipe hot path, which is served on the event
+# loop; the remaining endpoints use the sync ports above.
+
+
+class AsyncUserRepository(ABC):
+    @abstractmethod
+    async def get_by_id(self, user_id: UUID) -> User | None: ...
+
+
+class AsyncIdeaRepository(ABC):
+    @abstractmethod
+    async def list_next_for_user(
+        self,
+        *,
+        user_id: UUID,
+        limit: int,
+        exclude_ids: list[UUID],
+        window: int = 0,
+        rank: Callable[[list[FeedCandidate], SwipeStats], list[FeedCandidate]] | None = None,
+    ) -> list[Idea]: ...
+
+
+class AsyncIdeaMediaRepository(ABC):
+    @abstractmethod
+    async def list_by_ideas(self, *, idea_ids: list[UUID]) -> dict[UUID, list[IdeaMedia]]: ...
+
+
+class AsyncSwipeRepository(ABC):
+    @abstractmethod
+    async def create(self, *, user_id: UUID, idea_id: UUID, direction: str, decision_time_ms: int | None) -> Swipe: ...
+
+    @abstractmethod
+    async def create_many(self, *, user_id: UUID, swipes: list[NewSwipe]) -> list[SwipeResult]: ...
+
+    @abstractmethod
+    async def create_and_get_next(
+        self,
+        *,
+        user_id: UUID,
+        idea_id: UUID,
+        direction: str,
+        decision_time_ms: int | None,
+        window: int = 1,
+        rank: Callable[[list[FeedCandidate], SwipeStats], list[FeedCandidate]] | None = None,
+    ) -> tuple[Swipe, IdeaCard | None]: ...
 
     @abstractmethod
-    def get_idea_stats(self, *, idea_id: UUID) -> IdeaStats: ...
+    async def get_user_stats(self, *, user_id: UUID) -> SwipeStats: ...
@@ -1,10 +1,163 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TypeVar
 from uuid import UUID
 
-from app.domain.models import Idea
-from app.domain.ports import IdeaRepository
+import numpy as np
 
+from app.domain.models import FeedCandidate, Idea, SwipeStats, User
+from app.domain.ports import AsyncIdeaRepository, AsyncUserRepository
 
-def get_next_idea(*, ideas: IdeaRepository, user_id: UUID) -> Idea | None:
-    return ideas.get_next_for_user(user_id=user_id)
+
+# Unseen ideas pulled from the feed queue and scored per request.
+RANKING_WINDOW = 200
+
+# Ranking reads only category, tags and created_at, so it takes full ideas or candidates alike.
+_Rankable = TypeVar("_Rankable", Idea, FeedCandidate)
+
+_INTEREST_WEIGHT = 1.0
+_CATEGORY_RATE_WEIGHT = 2.0
+_TAG_WEIGHT = 0.5
+_RECENCY_WEIGHT = 0.5
+_RECENCY_HALF_LIFE_HOURS = 72.0
+# Pseudo-swipes pulling a category's vibe rate towards 50% until it has history.
+_CATEGORY_PRIOR_SWIPES = 5.0
+
+
+@dataclass(frozen=True)
+class FeedAffinity:
+    """Per-user preference weights keyed by lowercased category / tag."""
+    categories: dict[str, float] = field(default_factory=dict)
+    tags: dict[str, float] = field(default_factory=dict)
+
+
+def build_affinity(*, user: User | None, stats: SwipeStats) -> FeedAffinity:
+    categories: dict[str, float] = {}
+    tags: dict[str, float] = {}
+
+    interests = (user.interests if user else None) or {}
+    for name, weight in _interest_weights(interests.get("categories")).items():
+        categories[name] = categories.get(name, 0.0) + _INTEREST_WEIGHT * weight
+    for name, weight in _interest_weights(interests.get("tags")).items():
+        tags[name] = tags.get(name, 0.0) + _INTEREST_WEIGHT * weight
+
+    for cat, data in stats.by_category.items():
+        total = data.get("total", 0)
+        vibes = data.get("vibes", 0)
+        # Smoothed vibe rate centred on zero: liked categories push up, disliked push down.
+        rate = (vibes + _CATEGORY_PRIOR_SWIPES / 2) / (total + _CATEGORY_PRIOR_SWIPES) - 0.5
+        key = str(cat).lower()
+        categories[key] = categories.get(key, 0.0) + _CATEGORY_RATE_WEIGHT * rate
+
+    return FeedAffinity(categories=categories, tags=tags)
+
+
+@dataclass(frozen=True)
+class CandidateFeatures:
+    """Candidates encoded as index arrays into per-batch category/tag vocabularies."""
+    categories: list[str]
+    tags: list[str]
+    category_idx: np.ndarray  # (n,) index into `categories`
+    tag_idx: np.ndarray  # all candidates' tags, concatenated
+    tag_counts: np.ndarray  # (n,) number of tags per candidate
+    age_hours: np.ndarray  # (n,)
+
+
+def encode_candidates(candidates: Sequence[Idea | FeedCandidate], *, now: datetime | None = None) -> CandidateFeatures:
+    now = now or datetime.now(timezone.utc)
+    cat_vocab: dict[str, int] = {}
+    tag_vocab: dict[str, int] = {}
+    category_idx: list[int] = []
+    tag_idx: list[int] = []
+    tag_counts: list[int] = []
+    ages: list[float] = []
+    for idea in candidates:
+        category_idx.append(cat_vocab.setdefault(idea.category.lower(), len(cat_vocab)))
+        tags = idea.tags or ()
+        tag_counts.append(len(tags))
+        for tag in tags:
+            tag_idx.append(tag_vocab.setdefault(str(tag).lower(), len(tag_vocab)))
+        ages.append((now - idea.created_at).total_seconds())
+    return CandidateFeatures(
+        categories=list(cat_vocab),
+        tags=list(tag_vocab),
+        category_idx=np.asarray(category_idx, dtype=np.intp),
+        tag_idx=np.asarray(tag_idx, dtype=np.intp),
+        tag_counts=np.asarray(tag_counts, dtype=np.intp),
+        age_hours=np.maximum(np.asarray(ages, dtype=np.float64) / 3600.0, 0.0),
+    )
+
+
+def score_candidates(features: CandidateFeatures, affinity: FeedAffinity) -> np.ndarray:
+    """Score every candidate against the user's affinity vectors in one vectorized pass."""
+    cat_weights = np.asarray([affinity.categories.get(c, 0.0) for c in features.categories], dtype=np.float64)
+    scores = cat_weights[features.category_idx]
+    scores += _RECENCY_WEIGHT * np.exp2(-features.age_hours / _RECENCY_HALF_LIFE_HOURS)
+
+    if affinity.tags and features.tag_idx.size:
+        tag_weights = np.asarray([affinity.tags.get(t, 0.0) for t in features.tags], dtype=np.float64)
+        per_tag = tag_weights[features.tag_idx]
+        # reduceat sums each candidate's slice of the concatenated tag array.
+        offsets = np.concatenate(([0], np.cumsum(features.tag_counts)[:-1]))
+        has_tags = features.tag_counts > 0
+        sums = np.zeros(scores.shape, dtype=np.float64)
+        sums[has_tags] = np.add.reduceat(per_tag, offsets[has_tags])
+        scores += _TAG_WEIGHT * sums / np.maximum(features.tag_counts, 1)
+
+    return scores
+
+
+def rank_ideas(
+    candidates: list[_Rankable], affinity: FeedAffinity, *, now: datetime | None = None
+) -> list[_Rankable]:
+    """Order candidates best-first."""
+    if len(candidates) < 2:
+        return list(candidates)
+    scores = score_candidates(encode_candidates(candidates, now=now), affinity)
+    # Stable sort keeps the queue's newest-first order among equal scores.
+    order = np.argsort(-scores, kind="stable")
+    return [candidates[i] for i in order]
+
+
+async def get_next_idea(*, ideas: AsyncIdeaRepository, users: AsyncUserRepository, user_id: UUID) -> Idea | None:
+    deck = await get_next_ideas(ideas=ideas, users=users, user_id=user_id, limit=1)
+    return deck[0] if deck else None
+
+
+async def get_next_ideas(
+    *,
+    ideas: AsyncIdeaRepository,
+    users: AsyncUserRepository,
+    user_id: UUID,
+    limit: int,
+    exclude_ids: list[UUID] | None = None,
+) -> list[Idea]:
+    if limit < 1:
+        raise ValueError("limit must be >= 1")
+    # Users are cached; the swipe stats are read inside the feed transaction.
+    user = await users.get_by_id(user_id)
+    return await ideas.list_next_for_user(
+        user_id=user_id,
+        limit=limit,
+        exclude_ids=list(exclude_ids or []),
+        window=RANKING_WINDOW,
+        rank=lambda candidates, stats: rank_ideas(candidates, build_affinity(user=user, stats=stats)),
+    )
+
+
+def _interest_weights(value: object) -> dict[str, float]:
+    """Accept `["ai", "fintech"]` or `{"ai": 1.0, "fintech": 0.5}` from users.interests."""
+    if isinstance(value, dict):
+        weights: dict[str, float] = {}
+        for name, weight in value.items():
+            try:
+                weights[str(name).lower()] = float(weight)
+            except (TypeError, ValueError):
+                continue
+        return weights
+    if isinstance(value, (list, tuple)):
+        return {str(name).lower(): 1.0 for name in value}
+    return {}
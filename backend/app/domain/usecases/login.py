@@ -4,5 +4,8 @@ from app.domain.ports import UserRepository
 
 
 def login_with_subject(*, users: UserRepository, auth_provider: str, auth_subject: str) -> str:
-    user = users.upsert_by_auth(auth_provider=auth_provider, auth_subject=auth_subject)
+    # Returning users are the common case; only first logins need the (WAL-writing) upsert.
+    user = users.get_by_auth(auth_provider=auth_provider, auth_subject=auth_subject)
+    if user is None:
+        user = users.upsert_by_auth(auth_provider=auth_provider, auth_subject=auth_subject)
     return str(user.id)
@@ -2,25 +2,66 @@ from __future__ import annotations
 
 from uuid import UUID
 
-from app.domain.models import Swipe
-from app.domain.ports import SwipeRepository
+from app.domain.models import IdeaCard, NewSwipe, Swipe, SwipeResult
+from app.domain.ports import AsyncSwipeRepository, AsyncUserRepository
+from app.domain.usecases.feed import RANKING_WINDOW, build_affinity, rank_ideas
 
 
-def record_swipe(
+async def record_swipe(
     *,
-    swipes: SwipeRepository,
+    swipes: AsyncSwipeRepository,
     user_id: UUID,
     idea_id: UUID,
     direction: str,
     decision_time_ms: int | None,
 ) -> Swipe:
-    if direction not in {"vibe", "no_vibe"}:
-        raise ValueError("Invalid swipe direction")
-    if decision_time_ms is not None and decision_time_ms < 0:
-        raise ValueError("decision_time_ms must be >= 0")
-    return swipes.create(
+    _validate_swipe(direction=direction, decision_time_ms=decision_time_ms)
+    return await swipes.create(
+        user_id=user_id,
+        idea_id=idea_id,
+        direction=direction,
+        decision_time_ms=decision_time_ms,
+    )
+
+
+async def record_swipes(
+    *,
+    swipes: AsyncSwipeRepository,
+    user_id: UUID,
+    items: list[NewSwipe],
+) -> list[SwipeResult]:
+    """Record a batch of swipes (e.g. replayed by an offline client); one result per item, in order."""
+    for item in items:
+        _validate_swipe(direction=item.direction, decision_time_ms=item.decision_time_ms)
+    if not items:
+        return []
+    return await swipes.create_many(user_id=user_id, swipes=items)
+
+
+async def record_swipe_and_get_next(
+    *,
+    swipes: AsyncSwipeRepository,
+    users: AsyncUserRepository,
+    user_id: UUID,
+    idea_id: UUID,
+    direction: str,
+    decision_time_ms: int | None,
+) -> tuple[Swipe, IdeaCard | None]:
+    _validate_swipe(direction=direction, decision_time_ms=decision_time_ms)
+    # Users are cached; the swipe stats are read inside the swipe's transaction.
+    user = await users.get_by_id(user_id)
+    return await swipes.create_and_get_next(
         user_id=user_id,
         idea_id=idea_id,
         direction=direction,
         decision_time_ms=decision_time_ms,
+        window=RANKING_WINDOW,
+        rank=lambda candidates, stats: rank_ideas(candidates, build_affinity(user=user, stats=stats)),
     )
+
+
+def _validate_swipe(*, direction: str, decision_time_ms: int | None) -> None:
+    if direction not in {"vibe", "no_vibe"}:
+        raise ValueError("Invalid swipe direction")
+    if decision_time_ms is not None and decision_time_ms < 0:
+        raise ValueError("decision_time_ms must be >= 0")
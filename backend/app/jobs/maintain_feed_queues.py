@@ -0,0 +1,168 @@
+"""Push newly published ideas into feed queues and keep the queues bounded.
+
+Run with `python -m app.jobs.maintain_feed_queues`, e.g. every minute. Each
+run:
+  * drops the queues of users who have not refilled within the active
+    window; their next feed request refills from scratch;
+  * pushes the ideas in feed_queue_pending to the remaining queues, a batch
+    of users per transaction, then clears them from pending;
+  * trims each queue it pushed to down to the newest `_QUEUE_CAP` ideas,
+    marking trimmed queues as not exhausted so refills can bring the rest
+    back.
+Every step is idempotent, so a failed or overlapping run only repeats work.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from uuid import UUID
+
+from app.core.logging import configure_logging
+from app.core.settings import Settings
+from app.data.db import Database
+
+
+logger = logging.getLogger(__name__)
+
+_ACTIVE_WINDOW = timedelta(days=14)
+_USER_BATCH = 1000
+_IDEA_BATCH = 100
+_QUEUE_CAP = 1000
+
+# The outer refilled_at check is re-evaluated against a concurrent refill, which then keeps its queue.
+_DROP_IDLE_STATES = """
+    DELETE FROM feed_queue_state
+    WHERE refilled_at < now() - %(idle)s
+      AND user_id IN (
+        SELECT user_id FROM feed_queue_state WHERE refilled_at < now() - %(idle)s LIMIT %(batch)s
+      )
+    RETURNING user_id
+"""
+
+_DROP_QUEUES = """
+    DELETE FROM feed_queue q
+    WHERE q.user_id = ANY(%s::uuid[])
+      AND NOT EXISTS (SELECT 1 FROM feed_queue_state st WHERE st.user_id = q.user_id)
+"""
+
+_PENDING_IDEAS = "SELECT idea_id, queued_at FROM feed_queue_pending ORDER BY queued_at, idea_id LIMIT %s"
+
+_ACTIVE_USERS = """
+    SELECT user_id FROM feed_queue_state
+    WHERE user_id > %s AND refilled_at >= now() - %s
+    ORDER BY user_id
+    LIMIT %s
+"""
+
+_PUSH = """
+    INSERT INTO feed_queue(user_id, idea_id, created_at)
+    SELECT u.user_id, i.id, i.created_at
+    FROM unnest(%(user_ids)s::uuid[]) AS u(user_id)
+    CROSS JOIN ideas i
+    WHERE i.id = ANY(%(idea_ids)s::uuid[])
+      AND i.status = 'published'
+      AND i.author_id IS DISTINCT FROM u.user_id
+      AND NOT EXISTS (
+        SELECT 1 FROM swipes s WHERE s.user_id = u.user_id AND s.idea_id = i.id
+      )
+    ORDER BY u.user_id, i.id
+    ON CONFLICT DO NOTHING
+"""
+
+# The cap-th newest entry of each queue that has more; everything older goes.
+_TRIM = """
+    DELETE FROM feed_queue q
+    USING (
+      SELECT u.user_id, e.created_at, e.idea_id
+      FROM unnest(%(user_ids)s::uuid[]) AS u(user_id)
+      CROSS JOIN LATERAL (
+        SELECT created_at, idea_id FROM feed_queue
+        WHERE user_id = u.user_id
+        ORDER BY created_at DESC, idea_id DESC
+        OFFSET %(cap)s LIMIT 1
+      ) e
+    ) edge
+    WHERE q.user_id = edge.user_id AND (q.created_at, q.idea_id) <= (edge.created_at, edge.idea_id)
+    RETURNING q.user_id
+"""
+
+_REOPEN = "UPDATE feed_queue_state SET exhausted = false WHERE user_id = ANY(%s::uuid[]) AND exhausted"
+
+# An idea unpublished and republished during the run was queued again; keep that entry.
+_CLEAR_PENDING = """
+    DELETE FROM feed_queue_pending p
+    USING unnest(%s::uuid[], %s::timestamptz[]) AS d(idea_id, queued_at)
+    WHERE p.idea_id = d.idea_id AND p.queued_at = d.queued_at
+"""
+
+
+def drop_idle_queues(db: Database, *, active_window: timedelta = _ACTIVE_WINDOW) -> int:
+    """Delete the queues of users who have not refilled within `active_window`; returns how many."""
+    dropped = 0
+    while True:
+        with db.pool().connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(_DROP_IDLE_STATES, {"idle": active_window, "batch": _USER_BATCH})
+                user_ids = [r[0] for r in cur.fetchall()]
+                if user_ids:
+                    cur.execute(_DROP_QUEUES, (user_ids,))
+            conn.commit()
+        dropped += len(user_ids)
+        if len(user_ids) < _USER_BATCH:
+            return dropped
+
+
+def push_pending_ideas(db: Database, *, active_window: timedelta = _ACTIVE_WINDOW) -> int:
+    """Fan pending ideas out to active queues; returns how many ideas were pushed."""
+    pushed = 0
+    while True:
+        with db.pool().connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(_PENDING_IDEAS, (_IDEA_BATCH,))
+                pending = cur.fetchall()
+        if not pending:
+            return pushed
+
+        idea_ids = [r[0] for r in pending]
+        rows = trimmed = 0
+        after = UUID(int=0)
+        while True:
+            with db.pool().connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(_ACTIVE_USERS, (after, active_window, _USER_BATCH))
+                    user_ids = [r[0] for r in cur.fetchall()]
+                    if not user_ids:
+                        break
+                    cur.execute(_PUSH, {"user_ids": user_ids, "idea_ids": idea_ids})
+                    rows += cur.rowcount
+                    cur.execute(_TRIM, {"user_ids": user_ids, "cap": _QUEUE_CAP})
+                    trimmed_users = sorted({r[0] for r in cur.fetchall()})
+                    if trimmed_users:
+                        cur.execute(_REOPEN, (trimmed_users,))
+                        trimmed += len(trimmed_users)
+                conn.commit()
+            after = user_ids[-1]
+
+        with db.pool().connection() as conn:
+            conn.execute(_CLEAR_PENDING, (idea_ids, [r[1] for r in pending]))
+            conn.commit()
+        logger.info("Pushed %d ideas into feed queues (%d rows, %d queues trimmed)", len(idea_ids), rows, trimmed)
+        pushed += len(idea_ids)
+
+
+def main() -> None:
+    settings = Settings()
+    configure_logging(settings.log_level)
+    db = Database(settings.database_url)
+    db.open()
+    try:
+        dropped = drop_idle_queues(db)
+        pushed = push_pending_ideas(db)
+    finally:
+        db.close()
+    logger.info("Feed queue maintenance done; %d idle queues dropped, %d ideas pushed", dropped, pushed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Check user_category_stats against the swipes table and rebuild drifted users.
+
+`python -m app.jobs.rebuild_user_category_stats --check` only reports users
+whose rollup differs from their swipes (swipes in flight may show up
+transiently). Without `--check` those users' rows are rebuilt. Users are
+processed in batches; each rebuild batch holds a SHARE ROW EXCLUSIVE lock
+on the rollup, which makes concurrent swipe triggers wait for a few
+milliseconds instead of racing the recount.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from uuid import UUID
+
+from app.core.logging import configure_logging
+from app.core.settings import Settings
+from app.data.db import Database
+
+
+logger = logging.getLogger(__name__)
+
+_USER_BATCH = "SELECT id FROM users WHERE id > %s ORDER BY id LIMIT %s"
+
+_LOCK_ROLLUP = "LOCK TABLE user_category_stats IN SHARE ROW EXCLUSIVE MODE"
+
+_ACTUAL = """
+    SELECT
+      s.user_id,
+      i.category,
+      COUNT(*) AS total,
+      COUNT(*) FILTER (WHERE s.direction = 'vibe') AS vibes,
+      COUNT(*) FILTER (WHERE s.direction = 'no_vibe') AS no_vibes
+    FROM swipes s
+    JOIN ideas i ON i.id = s.idea_id
+    WHERE s.user_id = ANY(%(user_ids)s::uuid[])
+    GROUP BY s.user_id, i.category
+"""
+
+# All-zero rows are left behind by deletes and mean the same as no row.
+_MISMATCHED_USERS = f"""
+    WITH actual AS ({_ACTUAL}),
+    stored AS (
+      SELECT user_id, category, total, vibes, no_vibes
+      FROM user_category_stats
+      WHERE user_id = ANY(%(user_ids)s::uuid[]) AND (total, vibes, no_vibes) <> (0, 0, 0)
+    )
+    SELECT DISTINCT COALESCE(a.user_id, r.user_id)
+    FROM actual a
+    FULL JOIN stored r ON r.user_id = a.user_id AND r.category = a.category
+    WHERE (a.total, a.vibes, a.no_vibes) IS DISTINCT FROM (r.total, r.vibes, r.no_vibes)
+"""
+
+_DELETE_ROLLUP = "DELETE FROM user_category_stats WHERE user_id = ANY(%(user_ids)s::uuid[])"
+
+_INSERT_ROLLUP = f"""
+    INSERT INTO user_category_stats (user_id, category, total, vibes, no_vibes)
+    {_ACTUAL}
+"""
+
+
+def rebuild_user_category_stats(db: Database, *, check_only: bool = False, batch_size: int = 500) -> int:
+    """Return the number of users whose rollup was wrong (and, unless `check_only`, was rebuilt)."""
+    found = 0
+    after = UUID(int=0)
+    while True:
+        with db.pool().connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(_USER_BATCH, (after, batch_size))
+                user_ids = [r[0] for r in cur.fetchall()]
+                if not user_ids:
+                    return found
+                if not check_only:
+                    cur.execute(_LOCK_ROLLUP)
+                cur.execute(_MISMATCHED_USERS, {"user_ids": user_ids})
+                mismatched = [r[0] for r in cur.fetchall()]
+                if mismatched and not check_only:
+                    cur.execute(_DELETE_ROLLUP, {"user_ids": mismatched})
+                    cur.execute(_INSERT_ROLLUP, {"user_ids": mismatched})
+            conn.commit()
+        if mismatched:
+            logger.warning(
+                "User category stats %s for %d users",
+                "differ" if check_only else "rebuilt",
+                len(mismatched),
+            )
+        found += len(mismatched)
+        after = user_ids[-1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="report drift without rebuilding")
+    args = parser.parse_args()
+
+    settings = Settings()
+    configure_logging(settings.log_level)
+    db = Database(settings.database_url)
+    db.open()
+    try:
+        found = rebuild_user_category_stats(db, check_only=args.check)
+    finally:
+        db.close()
+    logger.info("User category stats %s done; %d users drifted", "check" if args.check else "rebuild", found)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Recount idea_swipe_counters and category_decision_sketches from swipes.
+
+Run with `python -m app.jobs.reconcile_swipe_counters`; it is safe alongside
+live traffic. Ideas are processed in batches and categories one at a time,
+each in its own transaction: the rows are created if missing and locked
+first, so swipes committed before the lock are counted and swipes written
+after it wait and are added on top of the recount.
+"""
+
+from __future__ import annotations
+
+import logging
+from uuid import UUID
+
+from app.core.logging import configure_logging
+from app.core.settings import Settings
+from app.data.db import Database
+
+
+logger = logging.getLogger(__name__)
+
+_IDEA_BATCH = "SELECT id FROM ideas WHERE id > %s ORDER BY id LIMIT %s"
+
+_ENSURE_COUNTERS = """
+    INSERT INTO idea_swipe_counters(idea_id)
+    SELECT id FROM ideas WHERE id = ANY(%s::uuid[]) ORDER BY id
+    ON CONFLICT DO NOTHING
+"""
+
+_LOCK_COUNTERS = "SELECT 1 FROM idea_swipe_counters WHERE idea_id = ANY(%s::uuid[]) ORDER BY idea_id FOR UPDATE"
+
+_RECOUNT = """
+    UPDATE idea_swipe_counters c SET
+      total = a.total,
+      vibes = a.vibes,
+      no_vibes = a.no_vibes,
+      decision_time_ms_sum = a.decision_time_ms_sum,
+      decision_time_count = a.decision_time_count,
+      decision_time_sketch = a.decision_time_sketch,
+      updated_at = now()
+    FROM (
+      SELECT totals.*, COALESCE(t.sketch, '{}') AS decision_time_sketch
+      FROM (
+        SELECT
+          ids.idea_id,
+          COUNT(s.direction) AS total,
+          COUNT(s.direction) FILTER (WHERE s.direction = 'vibe') AS vibes,
+          COUNT(s.direction) FILTER (WHERE s.direction = 'no_vibe') AS no_vibes,
+          COALESCE(SUM(s.decision_time_ms), 0) AS decision_time_ms_sum,
+          COUNT(s.decision_time_ms) AS decision_time_count
+        FROM unnest(%(idea_ids)s::uuid[]) AS ids(idea_id)
+        LEFT JOIN swipes s ON s.idea_id = ids.idea_id
+        GROUP BY ids.idea_id
+      ) totals
+      LEFT JOIN (
+        SELECT idea_id, decision_sketch_from(array_agg(pos), array_agg(n)) AS sketch
+        FROM (
+          SELECT idea_id, decision_sketch_position(decision_time_ms) AS pos, COUNT(*)::int AS n
+          FROM swipes
+          WHERE idea_id = ANY(%(idea_ids)s::uuid[]) AND decision_time_ms IS NOT NULL
+          GROUP BY idea_id, pos
+        ) b
+        GROUP BY idea_id
+      ) t ON t.idea_id = totals.idea_id
+    ) a
+    WHERE c.idea_id = a.idea_id
+      AND (c.total, c.vibes, c.no_vibes, c.decision_time_ms_sum, c.decision_time_count, c.decision_time_sketch)
+        IS DISTINCT FROM
+        (a.total, a.vibes, a.no_vibes, a.decision_time_ms_sum, a.decision_time_count, a.decision_time_sketch)
+    RETURNING c.idea_id
+"""
+
+_CATEGORIES = "SELECT DISTINCT category FROM ideas ORDER BY category"
+
+_ENSURE_CATEGORY_SHARDS = """
+    INSERT INTO category_decision_sketches(category, shard)
+    SELECT %s, shard FROM generate_series(0, 15) AS shard
+    ON CONFLICT DO NOTHING
+"""
+
+_LOCK_CATEGORY_SHARDS = "SELECT 1 FROM category_decision_sketches WHERE category = %s ORDER BY shard FOR UPDATE"
+
+_RECOUNT_CATEGORY = """
+    UPDATE category_decision_sketches c SET sketch = COALESCE(a.sketch, '{}')
+    FROM generate_series(0, 15) AS shards(shard)
+    LEFT JOIN (
+      SELECT shard, decision_sketch_from(array_agg(pos), array_agg(n)) AS sketch
+      FROM (
+        SELECT
+          decision_sketch_shard(s.user_id) AS shard,
+          decision_sketch_position(s.decision_time_ms) AS pos,
+          COUNT(*)::int AS n
+        FROM swipes s
+        JOIN ideas i ON i.id = s.idea_id
+        WHERE i.category = %(category)s AND s.decision_time_ms IS NOT NULL
+        GROUP BY shard, pos
+      ) b
+      GROUP BY shard
+    ) a ON a.shard = shards.shard
+    WHERE c.category = %(category)s
+      AND c.shard = shards.shard
+      AND c.sketch IS DISTINCT FROM COALESCE(a.sketch, '{}')
+    RETURNING c.shard
+"""
+
+
+
+def reconcile_swipe_counters(db: Database, *, batch_size: int = 1000) -> int:
+    """Recount every idea's counters; returns how many rows were corrected."""
+    fixed = 0
+    after = UUID(int=0)
+    while True:
+        with db.pool().connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(_IDEA_BATCH, (after, batch_size))
+                idea_ids = [r[0] for r in cur.fetchall()]
+                if not idea_ids:
+                    return fixed
+                cur.execute(_ENSURE_COUNTERS, (idea_ids,))
+                cur.execute(_LOCK_COUNTERS, (idea_ids,))
+                # A new statement takes a new snapshot, which sees every swipe counted before the lock.
+                cur.execute(_RECOUNT, {"idea_ids": idea_ids})
+                corrected = cur.fetchall()
+            conn.commit()
+        if corrected:
+            logger.warning("Corrected swipe counters for %d ideas", len(corrected))
+        fixed += len(corrected)
+        after = idea_ids[-1]
+
+
+def reconcile_category_sketches(db: Database) -> int:
+    """Recount every category's decision-time sketch shards; returns how many were corrected."""
+    with db.pool().connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(_CATEGORIES)
+            categories = [r[0] for r in cur.fetchall()]
+
+    fixed = 0
+    for category in categories:
+        with db.pool().connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(_ENSURE_CATEGORY_SHARDS, (category,))
+                cur.execute(_LOCK_CATEGORY_SHARDS, (category,))
+                cur.execute(_RECOUNT_CATEGORY, {"category": category})
+                corrected = cur.fetchall()
+            conn.commit()
+        if corrected:
+            logger.warning("Corrected %d decision-time sketch shards for category %s", len(corrected), category)
+        fixed += len(corrected)
+    return fixed
+
+
+def main() -> None:
+    settings = Settings()
+    configure_logging(settings.log_level)
+    db = Database(settings.database_url)
+    db.open()
+    try:
+        fixed = reconcile_swipe_counters(db)
+        fixed_shards = reconcile_category_sketches(db)
+    finally:
+        db.close()
+    logger.info(
+        "Swipe counter reconcile done; %d ideas and %d category sketch shards corrected",
+        fixed,
+        fixed_shards,
+    )
+
+
+if __name__ == "__main__":
+    main()
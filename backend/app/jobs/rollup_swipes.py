@@ -0,0 +1,129 @@
+"""Roll new swipes up into swipe_rollups (hourly, then daily).
+
+Run with `python -m app.jobs.rollup_swipes`, e.g. every few minutes. Each run
+re-aggregates the hours from just before the watermark up to now minus a
+settle lag, so swipes committed slightly out of created_at order are still
+counted. Buckets are replaced, not incremented, which makes a rerun harmless.
+Day buckets are summed from the hour buckets of the days touched. A first run
+backfills from the oldest swipe, one day per transaction.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app.core.logging import configure_logging
+from app.core.settings import Settings
+from app.data.db import Database
+
+
+logger = logging.getLogger(__name__)
+
+WATERMARK = "swipe_rollups"
+
+_SETTLE_LAG = timedelta(minutes=2)
+_REPROCESS = timedelta(hours=1)
+_CHUNK = timedelta(days=1)
+
+_CLAIM_WATERMARK = "SELECT watermark, now() FROM rollup_watermarks WHERE name = %s FOR UPDATE"
+
+_FIRST_SWIPE = "SELECT min(created_at) FROM swipes"
+
+_ROLLUP_HOURS = """
+    INSERT INTO swipe_rollups AS r
+      (idea_id, granularity, bucket, total, vibes, no_vibes, decision_time_ms_sum, decision_time_count)
+    SELECT
+      idea_id,
+      'hour',
+      date_trunc('hour', created_at, 'UTC') AS bucket,
+      COUNT(*),
+      COUNT(*) FILTER (WHERE direction = 'vibe'),
+      COUNT(*) FILTER (WHERE direction = 'no_vibe'),
+      COALESCE(SUM(decision_time_ms), 0),
+      COUNT(decision_time_ms)
+    FROM swipes
+    WHERE created_at >= %(lo)s AND created_at < %(hi)s
+    GROUP BY idea_id, bucket
+    ON CONFLICT (idea_id, granularity, bucket) DO UPDATE SET
+      total = EXCLUDED.total,
+      vibes = EXCLUDED.vibes,
+      no_vibes = EXCLUDED.no_vibes,
+      decision_time_ms_sum = EXCLUDED.decision_time_ms_sum,
+      decision_time_count = EXCLUDED.decision_time_count
+"""
+
+_ROLLUP_DAYS = """
+    INSERT INTO swipe_rollups AS r
+      (idea_id, granularity, bucket, total, vibes, no_vibes, decision_time_ms_sum, decision_time_count)
+    SELECT
+      idea_id,
+      'day',
+      date_trunc('day', bucket, 'UTC') AS day,
+      SUM(total),
+      SUM(vibes),
+      SUM(no_vibes),
+      SUM(decision_time_ms_sum),
+      SUM(decision_time_count)
+    FROM swipe_rollups
+    WHERE granularity = 'hour'
+      AND bucket >= date_trunc('day', %(lo)s::timestamptz, 'UTC')
+      AND bucket < %(hi)s
+    GROUP BY idea_id, day
+    ON CONFLICT (idea_id, granularity, bucket) DO UPDATE SET
+      total = EXCLUDED.total,
+      vibes = EXCLUDED.vibes,
+      no_vibes = EXCLUDED.no_vibes,
+      decision_time_ms_sum = EXCLUDED.decision_time_ms_sum,
+      decision_time_count = EXCLUDED.decision_time_count
+"""
+
+_ADVANCE_WATERMARK = "UPDATE rollup_watermarks SET watermark = %s, updated_at = now() WHERE name = %s"
+
+
+def rollup_swipes(db: Database) -> datetime | None:
+    """Bring the rollups up to now minus the settle lag; returns the new watermark."""
+    watermark: datetime | None = None
+    while True:
+        with db.pool().connection() as conn:
+            with conn.cursor() as cur:
+                # The row lock also keeps concurrent runs from interleaving.
+                cur.execute(_CLAIM_WATERMARK, (WATERMARK,))
+                watermark, now = cur.fetchone()
+                if watermark is None:
+                    cur.execute(_FIRST_SWIPE)
+                    first = cur.fetchone()[0]
+                    if first is None:
+                        return None
+                    lo = first
+                else:
+                    lo = watermark - _REPROCESS
+                lo = lo.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+                target = now - _SETTLE_LAG
+                if watermark is not None and watermark >= target:
+                    return watermark
+                hi = min(lo + _CHUNK, target)
+                cur.execute(_ROLLUP_HOURS, {"lo": lo, "hi": hi})
+                hours = cur.rowcount
+                cur.execute(_ROLLUP_DAYS, {"lo": lo, "hi": hi})
+                cur.execute(_ADVANCE_WATERMARK, (hi, WATERMARK))
+            conn.commit()
+        logger.info("Rolled up swipes %s .. %s (%d hour buckets)", lo.isoformat(), hi.isoformat(), hours)
+        if hi >= target:
+            return hi
+
+
+def main() -> None:
+    settings = Settings()
+    configure_logging(settings.log_level)
+    db = Database(settings.database_url)
+    db.open()
+    try:
+        watermark = rollup_swipes(db)
+    finally:
+        db.close()
+    logger.info("Swipe rollups up to %s", watermark.isoformat() if watermark else "-")
+
+
+if __name__ == "__main__":
+    main()
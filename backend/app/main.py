@@ -1,13 +1,25 @@
+from dataclasses import replace
 from pathlib import Path
 
-from fastapi import FastAPI
+import anyio.to_thread
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from psycopg_pool import PoolTimeout, TooManyRequests
 
+from app.api.pagination import NEXT_CURSOR_HEADER
 from app.api.router import api_router
 from app.core.logging import configure_logging
+from app.core.security import VerifiedTokenCache
 from app.core.settings import Settings
-from app.data.db import Database
+from app.data.db import AsyncDatabase, Database, PoolConfig, ReplicaConfig, ReplicaRouter
+from app.data.idea_cache import IDEA_CHANGED_CHANNEL, IdeaCache
+from app.data.keyed_cache import CacheInvalidator
 from app.data.migrations import run_migrations
+from app.data.oidc import JwksCache, OidcConfig, OidcVerifier
+from app.data.seen_ideas import SeenIdeaCache
+from app.data.swipe_buffer import SWIPE_WRITE_DIRECT, SwipeBufferFullError, SwipeWriteBuffer
+from app.data.user_cache import USER_CHANGED_CHANNEL, UserCache
 
 
 def create_app() -> FastAPI:
@@ -31,9 +43,75 @@ def create_app() -> FastAPI:
                 allow_credentials=True,
                 allow_methods=["GET", "POST", "PUT", "OPTIONS"],
                 allow_headers=["Authorization", "Content-Type", "X-Admin-Key"],
+                expose_headers=[NEXT_CURSOR_HEADER],
             )
 
-    db = Database(settings.database_url)
+    pool_config = PoolConfig(
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        max_waiting=settings.db_pool_max_waiting,
+        timeout=settings.db_pool_timeout_seconds,
+        max_lifetime=settings.db_pool_max_lifetime_seconds,
+        max_idle=settings.db_pool_max_idle_seconds,
+        prepared_statements=settings.db_prepared_statements,
+    )
+    replica_config = (
+        ReplicaConfig(
+            dsn=settings.database_replica_url,
+            sticky_seconds=settings.db_replica_sticky_seconds,
+            retry_seconds=settings.db_replica_retry_seconds,
+            timeout=settings.db_replica_timeout_seconds,
+        )
+        if settings.database_replica_url
+        else None
+    )
+    # One router for both pools: a swipe written on the async pool must keep /stats/me off the replica.
+    replica_router = ReplicaRouter(replica_config) if replica_config is not None else None
+    db = Database(settings.database_url, config=pool_config, replica=replica_config, router=replica_router)
+    async_db = AsyncDatabase(
+        settings.database_url,
+        config=replace(
+            pool_config,
+            min_size=settings.async_db_pool_min_size,
+            max_size=settings.async_db_pool_max_size,
+        ),
+        replica=replica_config,
+        router=replica_router,
+    )
+    token_cache = VerifiedTokenCache(max_entries=settings.token_cache_max_entries)
+    idea_cache = IdeaCache(max_entries=settings.idea_cache_max_entries)
+    idea_cache_invalidator = CacheInvalidator(settings.database_url, idea_cache, channel=IDEA_CHANGED_CHANNEL)
+    user_cache = UserCache(max_entries=settings.user_cache_max_entries)
+    user_cache_invalidator = CacheInvalidator(settings.database_url, user_cache, channel=USER_CHANGED_CHANNEL)
+    seen_ideas = SeenIdeaCache(
+        async_db,
+        max_users=settings.seen_ideas_max_users,
+        max_ideas_per_user=settings.seen_ideas_max_per_user,
+    )
+    swipe_buffer = (
+        SwipeWriteBuffer(
+            async_db,
+            mode=settings.swipe_write_mode,
+            seen=seen_ideas,
+            cache=idea_cache,
+            max_batch=settings.swipe_buffer_max_batch,
+            flush_interval=settings.swipe_buffer_flush_ms / 1000,
+            max_pending=settings.swipe_buffer_max_pending,
+            drain_timeout=settings.swipe_buffer_drain_seconds,
+            dead_letter_path=settings.swipe_dead_letter_path,
+        )
+        if settings.swipe_write_mode != SWIPE_WRITE_DIRECT
+        else None
+    )
+
+    oidc_verifier = (
+        OidcVerifier(
+            OidcConfig(issuer=settings.oidc_issuer, jwks_url=settings.oidc_jwks_url, audience=settings.oidc_audience),
+            jwks=JwksCache(settings.oidc_jwks_url, default_max_age=settings.oidc_jwks_max_age_seconds),
+        )
+        if settings.oidc_issuer and settings.oidc_jwks_url and settings.oidc_audience
+        else None
+    )
 
     migrations_dir = str(Path(__file__).resolve().parents[1] / "migrations")
 
@@ -41,13 +119,54 @@ def create_app() -> FastAPI:
     def _startup() -> None:
         db.open()
         run_migrations(db, migrations_dir=migrations_dir)
+        idea_cache_invalidator.start()
+        user_cache_invalidator.start()
+
+    @application.on_event("startup")
+    async def _startup_async() -> None:
+        # Sync handlers and dependencies run on anyio's default limiter (40 threads).
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        limiter.total_tokens = settings.threadpool_size or settings.db_pool_max_size
+        await async_db.open()
+        if swipe_buffer is not None:
+            swipe_buffer.start()
+
+    @application.on_event("shutdown")
+    async def _shutdown_async() -> None:
+        if swipe_buffer is not None:
+            await swipe_buffer.stop()
+        await async_db.close()
 
     @application.on_event("shutdown")
     def _shutdown() -> None:
+        idea_cache_invalidator.stop()
+        user_cache_invalidator.stop()
+        if oidc_verifier is not None:
+            oidc_verifier.close()
         db.close()
 
+    @application.exception_handler(PoolTimeout)
+    @application.exception_handler(TooManyRequests)
+    async def _pool_exhausted(request: Request, exc: Exception) -> JSONResponse:
+        return JSONResponse(status_code=503, content={"detail": "Database busy"}, headers={"Retry-After": "1"})
+
+    @application.exception_handler(SwipeBufferFullError)
+    async def _swipe_buffer_full(request: Request, exc: SwipeBufferFullError) -> JSONResponse:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Too many pending swipes"},
+            headers={"Retry-After": "1"},
+        )
+
     application.state.settings = settings
     application.state.db = db
+    application.state.async_db = async_db
+    application.state.token_cache = token_cache
+    application.state.idea_cache = idea_cache
+    application.state.user_cache = user_cache
+    application.state.seen_ideas = seen_ideas
+    application.state.swipe_buffer = swipe_buffer
+    application.state.oidc_verifier = oidc_verifier
 
     application.include_router(api_router)
     return application
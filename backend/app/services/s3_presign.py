@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import hashlib
+import hmac
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from urllib.parse import parse_qs, quote, urlsplit
 
 import boto3
+from botocore.config import Config
 
 
 @dataclass(frozen=True)
@@ -22,11 +31,91 @@ def _normalize_prefix(prefix: str) -> str:
     return p
 
 
+@lru_cache(maxsize=1)
+def _boto_session() -> boto3.session.Session:
+    return boto3.session.Session()
+
+
+# botocore would otherwise presign with SigV2 in us-east-1, eu-west-1 and without
+# a region, which also keeps presign_get_many off its native SigV4 path.
+_S3_CONFIG = Config(signature_version="s3v4")
+
+
 def create_s3_client(*, region: str | None):
     # Uses default AWS credential chain (IAM role on EC2 recommended).
+    session = _boto_session()
     if region:
-        return boto3.client("s3", region_name=region)
-    return boto3.client("s3")
+        return session.client("s3", region_name=region, config=_S3_CONFIG)
+    return session.client("s3", config=_S3_CONFIG)
+
+
+@lru_cache(maxsize=None)
+def get_s3_client(region: str | None):
+    """Process-wide client per region; boto3 clients are thread-safe and costly to build."""
+    return create_s3_client(region=region)
+
+
+class PresignedUrlCache:
+    """LRU of presigned GET URLs keyed by (region, bucket, key).
+
+    A URL is handed out again only while at least half of its TTL remains, so
+    clients always get a link with a useful lifetime left. A URL signed with
+    temporary credentials (IAM role, STS) stops working when they expire, so
+    its entry never outlives them.
+    """
+
+    def __init__(self, *, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str | None, str, str], tuple[str, float, float, float]] = OrderedDict()
+
+    def get(self, key: tuple[str | None, str, str], *, ttl_seconds: int) -> str | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            url, signed_at, signed_until, expires_at = entry
+            # A shorter requested TTL than the one signed with is fine; a longer one is not.
+            if signed_at + ttl_seconds > signed_until or expires_at - now < ttl_seconds / 2:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return url
+
+    def put(
+        self,
+        key: tuple[str | None, str, str],
+        url: str,
+        *,
+        signed_at: float,
+        ttl_seconds: int,
+        credentials_expire_at: float | None = None,
+    ) -> None:
+        signed_until = signed_at + ttl_seconds
+        expires_at = signed_until if credentials_expire_at is None else min(signed_until, credentials_expire_at)
+        with self._lock:
+            self._entries[key] = (url, signed_at, signed_until, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_get_url_cache = PresignedUrlCache(max_entries=10_000)
+
+
+def _credentials_expire_at() -> float | None:
+    """Monotonic time at which the signing credentials expire; None for long-lived keys."""
+    credentials = _boto_session().get_credentials()
+    # Only botocore's RefreshableCredentials (instance profile, STS, SSO) carry an expiry.
+    expiry_time = getattr(credentials, "_expiry_time", None)
+    if expiry_time is None:
+        return None
+    return time.monotonic() + (expiry_time - datetime.now(timezone.utc)).total_seconds()
 
 
 def _ext_for_content_type(content_type: str) -> str:
@@ -61,7 +150,7 @@ def presign_put_avatar(
     ext = _ext_for_content_type(content_type)
     object_key = f"{safe_prefix}{user_id}/avatar.{ext}"
 
-    client = create_s3_client(region=region)
+    client = get_s3_client(region)
 
     url = client.generate_presigned_url(
         ClientMethod="put_object",
@@ -97,7 +186,7 @@ def presign_put_idea_media(
     unique_id = uuid.uuid4().hex[:12]
     object_key = f"ideas/{idea_id}/media/{unique_id}.{ext}"
 
-    client = create_s3_client(region=region)
+    client = get_s3_client(region)
 
     url = client.generate_presigned_url(
         ClientMethod="put_object",
@@ -125,8 +214,13 @@ def presign_get(
     object_key: str,
     ttl_seconds: int,
 ) -> str:
-    client = create_s3_client(region=region)
-    return client.generate_presigned_url(
+    cache_key = (region, bucket, object_key)
+    cached = _get_url_cache.get(cache_key, ttl_seconds=ttl_seconds)
+    if cached is not None:
+        return cached
+
+    signed_at = time.monotonic()
+    url = get_s3_client(region).generate_presigned_url(
         ClientMethod="get_object",
         Params={
             "Bucket": bucket,
@@ -134,3 +228,164 @@ def presign_get(
         },
         ExpiresIn=ttl_seconds,
     )
+    _get_url_cache.put(
+        cache_key,
+        url,
+        signed_at=signed_at,
+        ttl_seconds=ttl_seconds,
+        credentials_expire_at=_credentials_expire_at(),
+    )
+    return url
+
+
+def presign_get_many(
+    *,
+    region: str | None,
+    bucket: str,
+    object_keys: list[str],
+    ttl_seconds: int,
+) -> list[str]:
+    """Presign GET URLs for several keys, in order.
+
+    botocore signs the first uncached key; its URL is the template (host, path
+    style, credential scope, X-Amz-Date) for signing the rest natively with one
+    derived SigV4 key. The native signature for the template key must equal
+    botocore's, otherwise every key goes through botocore.
+    """
+    urls: list[str | None] = []
+    missing: list[int] = []
+    for idx, object_key in enumerate(object_keys):
+        cached = _get_url_cache.get((region, bucket, object_key), ttl_seconds=ttl_seconds)
+        urls.append(cached)
+        if cached is None:
+            missing.append(idx)
+    if not missing:
+        return urls  # type: ignore[return-value]
+
+    signed_at = time.monotonic()
+    client = get_s3_client(region)
+    template_key = object_keys[missing[0]]
+    template_url = client.generate_presigned_url(
+        ClientMethod="get_object",
+        Params={"Bucket": bucket, "Key": template_key},
+        ExpiresIn=ttl_seconds,
+    )
+    signer = _SigV4QuerySigner.from_template(template_url, template_key)
+    credentials_expire_at = _credentials_expire_at()
+
+    for idx in missing:
+        object_key = object_keys[idx]
+        if object_key == template_key:
+            url = template_url
+        elif signer is not None:
+            url = signer.sign(object_key)
+        else:
+            url = client.generate_presigned_url(
+                ClientMethod="get_object",
+                Params={"Bucket": bucket, "Key": object_key},
+                ExpiresIn=ttl_seconds,
+            )
+        urls[idx] = url
+        _get_url_cache.put(
+            (region, bucket, object_key),
+            url,
+            signed_at=signed_at,
+            ttl_seconds=ttl_seconds,
+            credentials_expire_at=credentials_expire_at,
+        )
+    return urls  # type: ignore[return-value]
+
+
+@lru_cache(maxsize=16)
+def _sigv4_signing_key(secret_key: str, datestamp: str, region: str, service: str) -> bytes:
+    key = hmac.new(("AWS4" + secret_key).encode("utf-8"), datestamp.encode("utf-8"), hashlib.sha256).digest()
+    key = hmac.new(key, region.encode("utf-8"), hashlib.sha256).digest()
+    key = hmac.new(key, service.encode("utf-8"), hashlib.sha256).digest()
+    return hmac.new(key, b"aws4_request", hashlib.sha256).digest()
+
+
+def _uri_encode(value: str, safe: str) -> str:
+    return quote(value, safe=safe)
+
+
+class _SigV4QuerySigner:
+    """Re-signs a botocore SigV4 presigned GET URL for other keys in the same bucket."""
+
+    def __init__(
+        self,
+        *,
+        base: str,
+        host: str,
+        path_prefix: str,
+        query_prefix: str,
+        canonical_query: str,
+        amz_date: str,
+        scope: str,
+        signing_key: bytes,
+    ) -> None:
+        self._base = base
+        self._host = host
+        self._path_prefix = path_prefix
+        self._query_prefix = query_prefix
+        self._canonical_query = canonical_query
+        self._amz_date = amz_date
+        self._scope = scope
+        self._signing_key = signing_key
+
+    @classmethod
+    def from_template(cls, url: str, object_key: str) -> _SigV4QuerySigner | None:
+        parts = urlsplit(url)
+        query_prefix, sep, signature = parts.query.rpartition("&X-Amz-Signature=")
+        if not sep:
+            return None  # Not SigV4 query auth.
+        params = {k: v[0] for k, v in parse_qs(query_prefix, keep_blank_values=True).items()}
+        if params.get("X-Amz-Algorithm") != "AWS4-HMAC-SHA256" or params.get("X-Amz-SignedHeaders") != "host":
+            return None
+
+        encoded_key = _uri_encode(object_key, safe="/~")
+        if not parts.path.endswith(encoded_key):
+            return None
+        access_key, _, scope = params.get("X-Amz-Credential", "").partition("/")
+        scope_parts = scope.split("/")
+        if len(scope_parts) != 4:
+            return None
+        datestamp, region, service, _ = scope_parts
+
+        credentials = _boto_session().get_credentials()
+        if credentials is None:
+            return None
+        frozen = credentials.get_frozen_credentials()
+        if frozen.access_key != access_key:
+            return None
+
+        canonical_query = "&".join(
+            f"{_uri_encode(k, safe='-_.~')}={_uri_encode(v, safe='-_.~')}" for k, v in sorted(params.items())
+        )
+        signer = cls(
+            base=f"{parts.scheme}://{parts.netloc}",
+            host=parts.netloc,
+            path_prefix=parts.path[: len(parts.path) - len(encoded_key)],
+            query_prefix=query_prefix,
+            canonical_query=canonical_query,
+            amz_date=params["X-Amz-Date"],
+            scope=scope,
+            signing_key=_sigv4_signing_key(frozen.secret_key, datestamp, region, service),
+        )
+        # Only trust the native signer if it reproduces botocore's signature exactly.
+        if signer._signature(parts.path) != signature:
+            return None
+        return signer
+
+    def sign(self, object_key: str) -> str:
+        path = self._path_prefix + _uri_encode(object_key, safe="/~")
+        return f"{self._base}{path}?{self._query_prefix}&X-Amz-Signature={self._signature(path)}"
+
+    def _signature(self, path: str) -> str:
+        canonical_request = (
+            f"GET\n{path}\n{self._canonical_query}\nhost:{self._host}\n\nhost\nUNSIGNED-PAYLOAD"
+        )
+        string_to_sign = (
+            f"AWS4-HMAC-SHA256\n{self._amz_date}\n{self._scope}\n"
+            f"{hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()}"
+        )
+        return hmac.new(self._signing_key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
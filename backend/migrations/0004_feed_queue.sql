@@ -0,0 +1,61 @@
+-- 0004: Materialized per-user feed queue
+--
+-- feed_queue holds a prefix of each user's unseen published ideas (newest
+-- first). Serving a card is an index read on (user_id, created_at); the
+-- NOT EXISTS anti-join against swipes only runs when a queue is refilled.
+
+CREATE TABLE IF NOT EXISTS feed_queue (
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  idea_id UUID NOT NULL REFERENCES ideas(id) ON DELETE CASCADE,
+  created_at TIMESTAMPTZ NOT NULL,
+  PRIMARY KEY (user_id, idea_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_feed_queue_user_created_at ON feed_queue (user_id, created_at DESC, idea_id);
+CREATE INDEX IF NOT EXISTS idx_feed_queue_idea ON feed_queue (idea_id);
+
+-- One row per user that has a queue. exhausted = the last refill found no
+-- more candidates, so only newly published ideas (pushed by trigger) remain.
+CREATE TABLE IF NOT EXISTS feed_queue_state (
+  user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+  exhausted BOOLEAN NOT NULL DEFAULT false,
+  refilled_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- A swiped idea leaves the user's queue in the same transaction.
+CREATE OR REPLACE FUNCTION feed_queue_on_swipe() RETURNS trigger AS $$
+BEGIN
+  DELETE FROM feed_queue WHERE user_id = NEW.user_id AND idea_id = NEW.idea_id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_feed_queue_on_swipe ON swipes;
+CREATE TRIGGER trg_feed_queue_on_swipe
+  AFTER INSERT ON swipes
+  FOR EACH ROW EXECUTE FUNCTION feed_queue_on_swipe();
+
+-- Publishing pushes the idea into every existing queue; unpublishing removes
+-- it. Deleted ideas are removed by the ON DELETE CASCADE above.
+CREATE OR REPLACE FUNCTION feed_queue_on_idea_status() RETURNS trigger AS $$
+BEGIN
+  IF NEW.status = 'published' AND (TG_OP = 'INSERT' OR OLD.status IS DISTINCT FROM 'published') THEN
+    INSERT INTO feed_queue(user_id, idea_id, created_at)
+    SELECT st.user_id, NEW.id, NEW.created_at
+    FROM feed_queue_state st
+    WHERE st.user_id IS DISTINCT FROM NEW.author_id
+      AND NOT EXISTS (
+        SELECT 1 FROM swipes s WHERE s.user_id = st.user_id AND s.idea_id = NEW.id
+      )
+    ON CONFLICT DO NOTHING;
+  ELSIF TG_OP = 'UPDATE' AND NEW.status IS DISTINCT FROM 'published' AND OLD.status = 'published' THEN
+    DELETE FROM feed_queue WHERE idea_id = NEW.id;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_feed_queue_on_idea_status ON ideas;
+CREATE TRIGGER trg_feed_queue_on_idea_status
+  AFTER INSERT OR UPDATE OF status ON ideas
+  FOR EACH ROW EXECUTE FUNCTION feed_queue_on_idea_status();
@@ -0,0 +1,12 @@
+-- 0005: Keyset pagination indexes
+--
+-- Author listings page on (created_at, id) descending; the composite index
+-- lets each page start with an index seek instead of skipping earlier rows.
+-- It also covers lookups by author_id alone, so idx_ideas_author is dropped.
+
+CREATE INDEX IF NOT EXISTS idx_ideas_author_created_at_id ON ideas (author_id, created_at DESC, id DESC);
+DROP INDEX IF EXISTS idx_ideas_author;
+
+-- Feed queue pages walk (created_at, idea_id) in the same direction.
+CREATE INDEX IF NOT EXISTS idx_feed_queue_user_created_at_idea ON feed_queue (user_id, created_at DESC, idea_id DESC);
+DROP INDEX IF EXISTS idx_feed_queue_user_created_at;
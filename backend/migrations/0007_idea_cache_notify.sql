@@ -0,0 +1,25 @@
+-- 0007: Notify API workers when a cached idea or its media changes
+--
+-- Payload is the idea id; workers LISTEN on idea_changed and evict it from
+-- their in-process cache. Notifications are only delivered on commit.
+
+CREATE OR REPLACE FUNCTION notify_idea_changed() RETURNS trigger AS $$
+BEGIN
+  IF TG_TABLE_NAME = 'idea_media' THEN
+    PERFORM pg_notify('idea_changed', COALESCE(NEW.idea_id, OLD.idea_id)::text);
+  ELSE
+    PERFORM pg_notify('idea_changed', COALESCE(NEW.id, OLD.id)::text);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_ideas_notify_changed ON ideas;
+CREATE TRIGGER trg_ideas_notify_changed
+  AFTER UPDATE OR DELETE ON ideas
+  FOR EACH ROW EXECUTE FUNCTION notify_idea_changed();
+
+DROP TRIGGER IF EXISTS trg_idea_media_notify_changed ON idea_media;
+CREATE TRIGGER trg_idea_media_notify_changed
+  AFTER INSERT OR UPDATE OR DELETE ON idea_media
+  FOR EACH ROW EXECUTE FUNCTION notify_idea_changed();
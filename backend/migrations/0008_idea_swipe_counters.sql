@@ -0,0 +1,96 @@
+-- 0008: Per-idea swipe counters maintained by triggers
+--
+-- Idea stats read one row here instead of counting swipes. Statement-level
+-- triggers fold each INSERT/DELETE on swipes (including cascades from users
+-- and ideas) into the counters in the same transaction, one upsert per idea
+-- per statement. Inserts upsert counter rows in idea_id order so concurrent
+-- batches can't deadlock. Swipes are never updated, so there is no UPDATE
+-- trigger.
+-- Drift can be repaired with `python -m app.jobs.reconcile_swipe_counters`.
+
+CREATE TABLE IF NOT EXISTS idea_swipe_counters (
+  idea_id UUID PRIMARY KEY REFERENCES ideas(id) ON DELETE CASCADE,
+  total BIGINT NOT NULL DEFAULT 0,
+  vibes BIGINT NOT NULL DEFAULT 0,
+  no_vibes BIGINT NOT NULL DEFAULT 0,
+  decision_time_ms_sum BIGINT NOT NULL DEFAULT 0,
+  decision_time_count BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION count_inserted_swipes() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO idea_swipe_counters AS c (idea_id, total, vibes, no_vibes, decision_time_ms_sum, decision_time_count)
+  SELECT
+    idea_id,
+    COUNT(*),
+    COUNT(*) FILTER (WHERE direction = 'vibe'),
+    COUNT(*) FILTER (WHERE direction = 'no_vibe'),
+    COALESCE(SUM(decision_time_ms), 0),
+    COUNT(decision_time_ms)
+  FROM new_swipes
+  GROUP BY idea_id
+  ORDER BY idea_id
+  ON CONFLICT (idea_id) DO UPDATE SET
+    total = c.total + EXCLUDED.total,
+    vibes = c.vibes + EXCLUDED.vibes,
+    no_vibes = c.no_vibes + EXCLUDED.no_vibes,
+    decision_time_ms_sum = c.decision_time_ms_sum + EXCLUDED.decision_time_ms_sum,
+    decision_time_count = c.decision_time_count + EXCLUDED.decision_time_count,
+    updated_at = now();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_deleted_swipes() RETURNS trigger AS $$
+BEGIN
+  -- Counter rows of ideas deleted in the same statement are already gone.
+  UPDATE idea_swipe_counters c SET
+    total = c.total - d.total,
+    vibes = c.vibes - d.vibes,
+    no_vibes = c.no_vibes - d.no_vibes,
+    decision_time_ms_sum = c.decision_time_ms_sum - d.decision_time_ms_sum,
+    decision_time_count = c.decision_time_count - d.decision_time_count,
+    updated_at = now()
+  FROM (
+    SELECT
+      idea_id,
+      COUNT(*) AS total,
+      COUNT(*) FILTER (WHERE direction = 'vibe') AS vibes,
+      COUNT(*) FILTER (WHERE direction = 'no_vibe') AS no_vibes,
+      COALESCE(SUM(decision_time_ms), 0) AS decision_time_ms_sum,
+      COUNT(decision_time_ms) AS decision_time_count
+    FROM old_swipes
+    GROUP BY idea_id
+    ORDER BY idea_id
+  ) d
+  WHERE c.idea_id = d.idea_id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_swipes_count_insert ON swipes;
+CREATE TRIGGER trg_swipes_count_insert
+  AFTER INSERT ON swipes
+  REFERENCING NEW TABLE AS new_swipes
+  FOR EACH STATEMENT EXECUTE FUNCTION count_inserted_swipes();
+
+DROP TRIGGER IF EXISTS trg_swipes_count_delete ON swipes;
+CREATE TRIGGER trg_swipes_count_delete
+  AFTER DELETE ON swipes
+  REFERENCING OLD TABLE AS old_swipes
+  FOR EACH STATEMENT EXECUTE FUNCTION count_deleted_swipes();
+
+-- Backfill. CREATE TRIGGER above holds a lock that blocks swipe writes until
+-- this migration commits, so no swipe is counted twice or missed.
+INSERT INTO idea_swipe_counters (idea_id, total, vibes, no_vibes, decision_time_ms_sum, decision_time_count)
+SELECT
+  idea_id,
+  COUNT(*),
+  COUNT(*) FILTER (WHERE direction = 'vibe'),
+  COUNT(*) FILTER (WHERE direction = 'no_vibe'),
+  COALESCE(SUM(decision_time_ms), 0),
+  COUNT(decision_time_ms)
+FROM swipes
+GROUP BY idea_id
+ON CONFLICT (idea_id) DO NOTHING;
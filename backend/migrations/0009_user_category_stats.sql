@@ -0,0 +1,139 @@
+-- 0009: Per-user swipe counts by idea category, maintained by triggers
+--
+-- /stats/me reads these rows instead of aggregating the user's swipes.
+-- Counts follow the idea's current category:
+--   * swipe INSERT/DELETE adjusts the (user, category) rows;
+--   * an idea whose category changes moves its swipes' counts across;
+--   * an idea being deleted removes its swipes' counts before the cascade,
+--     which then finds no idea row and skips them.
+-- Drift can be checked and repaired with
+-- `python -m app.jobs.rebuild_user_category_stats [--check]`.
+
+CREATE TABLE IF NOT EXISTS user_category_stats (
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  category TEXT NOT NULL,
+  total BIGINT NOT NULL DEFAULT 0,
+  vibes BIGINT NOT NULL DEFAULT 0,
+  no_vibes BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, category)
+);
+
+CREATE OR REPLACE FUNCTION add_user_category_counts() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO user_category_stats AS u (user_id, category, total, vibes, no_vibes)
+  SELECT
+    s.user_id,
+    i.category,
+    COUNT(*),
+    COUNT(*) FILTER (WHERE s.direction = 'vibe'),
+    COUNT(*) FILTER (WHERE s.direction = 'no_vibe')
+  FROM new_swipes s
+  JOIN ideas i ON i.id = s.idea_id
+  GROUP BY s.user_id, i.category
+  ORDER BY s.user_id, i.category
+  ON CONFLICT (user_id, category) DO UPDATE SET
+    total = u.total + EXCLUDED.total,
+    vibes = u.vibes + EXCLUDED.vibes,
+    no_vibes = u.no_vibes + EXCLUDED.no_vibes;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION remove_user_category_counts() RETURNS trigger AS $$
+BEGIN
+  UPDATE user_category_stats u SET
+    total = u.total - d.total,
+    vibes = u.vibes - d.vibes,
+    no_vibes = u.no_vibes - d.no_vibes
+  FROM (
+    SELECT
+      s.user_id,
+      i.category,
+      COUNT(*) AS total,
+      COUNT(*) FILTER (WHERE s.direction = 'vibe') AS vibes,
+      COUNT(*) FILTER (WHERE s.direction = 'no_vibe') AS no_vibes
+    FROM old_swipes s
+    JOIN ideas i ON i.id = s.idea_id
+    GROUP BY s.user_id, i.category
+  ) d
+  WHERE u.user_id = d.user_id AND u.category = d.category;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION move_idea_category_counts() RETURNS trigger AS $$
+BEGIN
+  UPDATE user_category_stats u SET
+    total = u.total - d.total,
+    vibes = u.vibes - d.vibes,
+    no_vibes = u.no_vibes - d.no_vibes
+  FROM (
+    SELECT
+      user_id,
+      COUNT(*) AS total,
+      COUNT(*) FILTER (WHERE direction = 'vibe') AS vibes,
+      COUNT(*) FILTER (WHERE direction = 'no_vibe') AS no_vibes
+    FROM swipes
+    WHERE idea_id = OLD.id
+    GROUP BY user_id
+  ) d
+  WHERE u.user_id = d.user_id AND u.category = OLD.category;
+
+  IF TG_OP = 'UPDATE' THEN
+    INSERT INTO user_category_stats AS u (user_id, category, total, vibes, no_vibes)
+    SELECT
+      user_id,
+      NEW.category,
+      COUNT(*),
+      COUNT(*) FILTER (WHERE direction = 'vibe'),
+      COUNT(*) FILTER (WHERE direction = 'no_vibe')
+    FROM swipes
+    WHERE idea_id = NEW.id
+    GROUP BY user_id
+    ORDER BY user_id
+    ON CONFLICT (user_id, category) DO UPDATE SET
+      total = u.total + EXCLUDED.total,
+      vibes = u.vibes + EXCLUDED.vibes,
+      no_vibes = u.no_vibes + EXCLUDED.no_vibes;
+    RETURN NULL;
+  END IF;
+  RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_swipes_user_category_insert ON swipes;
+CREATE TRIGGER trg_swipes_user_category_insert
+  AFTER INSERT ON swipes
+  REFERENCING NEW TABLE AS new_swipes
+  FOR EACH STATEMENT EXECUTE FUNCTION add_user_category_counts();
+
+DROP TRIGGER IF EXISTS trg_swipes_user_category_delete ON swipes;
+CREATE TRIGGER trg_swipes_user_category_delete
+  AFTER DELETE ON swipes
+  REFERENCING OLD TABLE AS old_swipes
+  FOR EACH STATEMENT EXECUTE FUNCTION remove_user_category_counts();
+
+DROP TRIGGER IF EXISTS trg_ideas_user_category_move ON ideas;
+CREATE TRIGGER trg_ideas_user_category_move
+  AFTER UPDATE OF category ON ideas
+  FOR EACH ROW
+  WHEN (OLD.category IS DISTINCT FROM NEW.category)
+  EXECUTE FUNCTION move_idea_category_counts();
+
+DROP TRIGGER IF EXISTS trg_ideas_user_category_delete ON ideas;
+CREATE TRIGGER trg_ideas_user_category_delete
+  BEFORE DELETE ON ideas
+  FOR EACH ROW EXECUTE FUNCTION move_idea_category_counts();
+
+-- Backfill; CREATE TRIGGER above holds swipe writes back until this commits.
+INSERT INTO user_category_stats (user_id, category, total, vibes, no_vibes)
+SELECT
+  s.user_id,
+  i.category,
+  COUNT(*),
+  COUNT(*) FILTER (WHERE s.direction = 'vibe'),
+  COUNT(*) FILTER (WHERE s.direction = 'no_vibe')
+FROM swipes s
+JOIN ideas i ON i.id = s.idea_id
+GROUP BY s.user_id, i.category
+ON CONFLICT (user_id, category) DO NOTHING;
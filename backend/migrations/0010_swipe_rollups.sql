@@ -0,0 +1,30 @@
+-- 0010: Hourly and daily swipe rollups per idea for author timeseries
+--
+-- Filled by `python -m app.jobs.rollup_swipes`, which aggregates swipes
+-- created since the watermark into hour buckets and derives day buckets
+-- from the hours. Buckets are UTC. Readers add raw swipes at or after the
+-- watermark on top, so the newest buckets are never stale.
+
+CREATE TABLE IF NOT EXISTS swipe_rollups (
+  idea_id UUID NOT NULL REFERENCES ideas(id) ON DELETE CASCADE,
+  granularity TEXT NOT NULL CHECK (granularity IN ('hour', 'day')),
+  bucket TIMESTAMPTZ NOT NULL,
+  total BIGINT NOT NULL DEFAULT 0,
+  vibes BIGINT NOT NULL DEFAULT 0,
+  no_vibes BIGINT NOT NULL DEFAULT 0,
+  decision_time_ms_sum BIGINT NOT NULL DEFAULT 0,
+  decision_time_count BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (idea_id, granularity, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+  name TEXT PRIMARY KEY,
+  watermark TIMESTAMPTZ NULL,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+INSERT INTO rollup_watermarks (name) VALUES ('swipe_rollups') ON CONFLICT DO NOTHING;
+
+-- The rollup job scans swipes by time; swipes arrive roughly in created_at
+-- order, so a BRIN index covers that at almost no write cost.
+CREATE INDEX IF NOT EXISTS idx_swipes_created_at_brin ON swipes USING brin (created_at);
@@ -0,0 +1,288 @@
+-- 0011: Decision-time quantile sketches per idea and per category
+--
+-- A sketch is a DDSketch with 2% relative accuracy (gamma = 1.02 / 0.98)
+-- stored as an integer[] of bucket counts:
+--   position 1      decision_time_ms = 0
+--   position k + 2  decision_time_ms in (gamma^(k-1), gamma^k], capped at 1 h
+-- Sketches merge (and un-merge) by adding counts position by position, so
+-- the triggers keep them current the same way as the counters in 0008/0009.
+-- Trailing zero buckets are trimmed, so equal sketches compare equal.
+-- app/data/decision_sketch.py reads them; keep the two in sync.
+--
+-- Idea sketches live on idea_swipe_counters. Category sketches are split
+-- into 16 shards by user so a popular category is not a single hot row;
+-- readers merge the shards.
+
+CREATE OR REPLACE FUNCTION decision_sketch_position(ms integer) RETURNS integer AS $$
+  SELECT CASE
+    WHEN ms <= 0 THEN 1
+    ELSE 2 + ceil(ln(LEAST(ms, 3600000)) / ln(1.02 / 0.98))::integer
+  END
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION decision_sketch_merge(a integer[], b integer[], sign integer DEFAULT 1)
+RETURNS integer[] AS $$
+DECLARE
+  result integer[] := COALESCE(a, '{}');
+  have integer := COALESCE(array_length(result, 1), 0);
+  need integer := COALESCE(array_length(b, 1), 0);
+BEGIN
+  IF need > have THEN
+    result := result || array_fill(0, ARRAY[need - have]);
+  END IF;
+  FOR i IN 1 .. need LOOP
+    result[i] := result[i] + sign * COALESCE(b[i], 0);
+  END LOOP;
+  have := COALESCE(array_length(result, 1), 0);
+  WHILE have > 0 AND result[have] = 0 LOOP
+    have := have - 1;
+  END LOOP;
+  RETURN result[1:have];
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Build a sketch from parallel arrays of positions and counts.
+CREATE OR REPLACE FUNCTION decision_sketch_from(positions integer[], amounts integer[]) RETURNS integer[] AS $$
+DECLARE
+  result integer[] := '{}';
+BEGIN
+  FOR i IN 1 .. COALESCE(array_length(positions, 1), 0) LOOP
+    IF positions[i] > COALESCE(array_length(result, 1), 0) THEN
+      result := result || array_fill(0, ARRAY[positions[i] - COALESCE(array_length(result, 1), 0)]);
+    END IF;
+    result[positions[i]] := result[positions[i]] + amounts[i];
+  END LOOP;
+  RETURN result;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION decision_sketch_shard(user_id uuid) RETURNS smallint AS $$
+  SELECT (hashtextextended(user_id::text, 0) & 15)::smallint
+$$ LANGUAGE sql IMMUTABLE;
+
+ALTER TABLE idea_swipe_counters ADD COLUMN IF NOT EXISTS decision_time_sketch INTEGER[] NOT NULL DEFAULT '{}';
+
+CREATE TABLE IF NOT EXISTS category_decision_sketches (
+  category TEXT NOT NULL,
+  shard SMALLINT NOT NULL,
+  sketch INTEGER[] NOT NULL DEFAULT '{}',
+  PRIMARY KEY (category, shard)
+);
+
+-- 0008's counter triggers, now also folding decision times into the idea sketch.
+CREATE OR REPLACE FUNCTION count_inserted_swipes() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO idea_swipe_counters AS c
+    (idea_id, total, vibes, no_vibes, decision_time_ms_sum, decision_time_count, decision_time_sketch)
+  SELECT
+    a.idea_id, a.total, a.vibes, a.no_vibes, a.decision_time_ms_sum, a.decision_time_count,
+    COALESCE(t.sketch, '{}')
+  FROM (
+    SELECT
+      idea_id,
+      COUNT(*) AS total,
+      COUNT(*) FILTER (WHERE direction = 'vibe') AS vibes,
+      COUNT(*) FILTER (WHERE direction = 'no_vibe') AS no_vibes,
+      COALESCE(SUM(decision_time_ms), 0) AS decision_time_ms_sum,
+      COUNT(decision_time_ms) AS decision_time_count
+    FROM new_swipes
+    GROUP BY idea_id
+  ) a
+  LEFT JOIN (
+    SELECT idea_id, decision_sketch_from(array_agg(pos), array_agg(n)) AS sketch
+    FROM (
+      SELECT idea_id, decision_sketch_position(decision_time_ms) AS pos, COUNT(*)::int AS n
+      FROM new_swipes
+      WHERE decision_time_ms IS NOT NULL
+      GROUP BY idea_id, pos
+    ) b
+    GROUP BY idea_id
+  ) t ON t.idea_id = a.idea_id
+  ORDER BY a.idea_id
+  ON CONFLICT (idea_id) DO UPDATE SET
+    total = c.total + EXCLUDED.total,
+    vibes = c.vibes + EXCLUDED.vibes,
+    no_vibes = c.no_vibes + EXCLUDED.no_vibes,
+    decision_time_ms_sum = c.decision_time_ms_sum + EXCLUDED.decision_time_ms_sum,
+    decision_time_count = c.decision_time_count + EXCLUDED.decision_time_count,
+    decision_time_sketch = decision_sketch_merge(c.decision_time_sketch, EXCLUDED.decision_time_sketch),
+    updated_at = now();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_deleted_swipes() RETURNS trigger AS $$
+BEGIN
+  -- Counter rows of ideas deleted in the same statement are already gone.
+  UPDATE idea_swipe_counters c SET
+    total = c.total - d.total,
+    vibes = c.vibes - d.vibes,
+    no_vibes = c.no_vibes - d.no_vibes,
+    decision_time_ms_sum = c.decision_time_ms_sum - d.decision_time_ms_sum,
+    decision_time_count = c.decision_time_count - d.decision_time_count,
+    decision_time_sketch = decision_sketch_merge(c.decision_time_sketch, COALESCE(t.sketch, '{}'), -1),
+    updated_at = now()
+  FROM (
+    SELECT
+      idea_id,
+      COUNT(*) AS total,
+      COUNT(*) FILTER (WHERE direction = 'vibe') AS vibes,
+      COUNT(*) FILTER (WHERE direction = 'no_vibe') AS no_vibes,
+      COALESCE(SUM(decision_time_ms), 0) AS decision_time_ms_sum,
+      COUNT(decision_time_ms) AS decision_time_count
+    FROM old_swipes
+    GROUP BY idea_id
+  ) d
+  LEFT JOIN (
+    SELECT idea_id, decision_sketch_from(array_agg(pos), array_agg(n)) AS sketch
+    FROM (
+      SELECT idea_id, decision_sketch_position(decision_time_ms) AS pos, COUNT(*)::int AS n
+      FROM old_swipes
+      WHERE decision_time_ms IS NOT NULL
+      GROUP BY idea_id, pos
+    ) b
+    GROUP BY idea_id
+  ) t ON t.idea_id = d.idea_id
+  WHERE c.idea_id = d.idea_id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION add_category_decision_sketches() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO category_decision_sketches AS c (category, shard, sketch)
+  SELECT category, shard, decision_sketch_from(array_agg(pos), array_agg(n))
+  FROM (
+    SELECT
+      i.category,
+      decision_sketch_shard(s.user_id) AS shard,
+      decision_sketch_position(s.decision_time_ms) AS pos,
+      COUNT(*)::int AS n
+    FROM new_swipes s
+    JOIN ideas i ON i.id = s.idea_id
+    WHERE s.decision_time_ms IS NOT NULL
+    GROUP BY i.category, shard, pos
+  ) b
+  GROUP BY category, shard
+  ORDER BY category, shard
+  ON CONFLICT (category, shard) DO UPDATE SET
+    sketch = decision_sketch_merge(c.sketch, EXCLUDED.sketch);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION remove_category_decision_sketches() RETURNS trigger AS $$
+BEGIN
+  -- Swipes of ideas being deleted were already taken out by the ideas trigger.
+  UPDATE category_decision_sketches c SET
+    sketch = decision_sketch_merge(c.sketch, d.sketch, -1)
+  FROM (
+    SELECT category, shard, decision_sketch_from(array_agg(pos), array_agg(n)) AS sketch
+    FROM (
+      SELECT
+        i.category,
+        decision_sketch_shard(s.user_id) AS shard,
+        decision_sketch_position(s.decision_time_ms) AS pos,
+        COUNT(*)::int AS n
+      FROM old_swipes s
+      JOIN ideas i ON i.id = s.idea_id
+      WHERE s.decision_time_ms IS NOT NULL
+      GROUP BY i.category, shard, pos
+    ) b
+    GROUP BY category, shard
+  ) d
+  WHERE c.category = d.category AND c.shard = d.shard;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION move_idea_decision_sketches() RETURNS trigger AS $$
+DECLARE
+  shards RECORD;
+BEGIN
+  FOR shards IN
+    SELECT shard, decision_sketch_from(array_agg(pos), array_agg(n)) AS sketch
+    FROM (
+      SELECT
+        decision_sketch_shard(user_id) AS shard,
+        decision_sketch_position(decision_time_ms) AS pos,
+        COUNT(*)::int AS n
+      FROM swipes
+      WHERE idea_id = OLD.id AND decision_time_ms IS NOT NULL
+      GROUP BY shard, pos
+    ) b
+    GROUP BY shard
+    ORDER BY shard
+  LOOP
+    UPDATE category_decision_sketches
+    SET sketch = decision_sketch_merge(sketch, shards.sketch, -1)
+    WHERE category = OLD.category AND shard = shards.shard;
+
+    IF TG_OP = 'UPDATE' THEN
+      INSERT INTO category_decision_sketches AS c (category, shard, sketch)
+      VALUES (NEW.category, shards.shard, shards.sketch)
+      ON CONFLICT (category, shard) DO UPDATE SET
+        sketch = decision_sketch_merge(c.sketch, EXCLUDED.sketch);
+    END IF;
+  END LOOP;
+
+  IF TG_OP = 'UPDATE' THEN
+    RETURN NULL;
+  END IF;
+  RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_swipes_category_sketch_insert ON swipes;
+CREATE TRIGGER trg_swipes_category_sketch_insert
+  AFTER INSERT ON swipes
+  REFERENCING NEW TABLE AS new_swipes
+  FOR EACH STATEMENT EXECUTE FUNCTION add_category_decision_sketches();
+
+DROP TRIGGER IF EXISTS trg_swipes_category_sketch_delete ON swipes;
+CREATE TRIGGER trg_swipes_category_sketch_delete
+  AFTER DELETE ON swipes
+  REFERENCING OLD TABLE AS old_swipes
+  FOR EACH STATEMENT EXECUTE FUNCTION remove_category_decision_sketches();
+
+DROP TRIGGER IF EXISTS trg_ideas_category_sketch_move ON ideas;
+CREATE TRIGGER trg_ideas_category_sketch_move
+  AFTER UPDATE OF category ON ideas
+  FOR EACH ROW
+  WHEN (OLD.category IS DISTINCT FROM NEW.category)
+  EXECUTE FUNCTION move_idea_decision_sketches();
+
+DROP TRIGGER IF EXISTS trg_ideas_category_sketch_delete ON ideas;
+CREATE TRIGGER trg_ideas_category_sketch_delete
+  BEFORE DELETE ON ideas
+  FOR EACH ROW EXECUTE FUNCTION move_idea_decision_sketches();
+
+-- Backfill; CREATE TRIGGER above holds swipe writes back until this commits.
+UPDATE idea_swipe_counters c SET decision_time_sketch = t.sketch
+FROM (
+  SELECT idea_id, decision_sketch_from(array_agg(pos), array_agg(n)) AS sketch
+  FROM (
+    SELECT idea_id, decision_sketch_position(decision_time_ms) AS pos, COUNT(*)::int AS n
+    FROM swipes
+    WHERE decision_time_ms IS NOT NULL
+    GROUP BY idea_id, pos
+  ) b
+  GROUP BY idea_id
+) t
+WHERE c.idea_id = t.idea_id;
+
+INSERT INTO category_decision_sketches (category, shard, sketch)
+SELECT category, shard, decision_sketch_from(array_agg(pos), array_agg(n))
+FROM (
+  SELECT
+    i.category,
+    decision_sketch_shard(s.user_id) AS shard,
+    decision_sketch_position(s.decision_time_ms) AS pos,
+    COUNT(*)::int AS n
+  FROM swipes s
+  JOIN ideas i ON i.id = s.idea_id
+  WHERE s.decision_time_ms IS NOT NULL
+  GROUP BY i.category, shard, pos
+) b
+GROUP BY category, shard
+ON CONFLICT (category, shard) DO NOTHING;
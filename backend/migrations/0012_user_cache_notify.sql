@@ -0,0 +1,16 @@
+-- 0012: Notify API workers when a cached user changes
+--
+-- Payload is the user id; workers LISTEN on user_changed and evict it from
+-- their in-process user cache, as 0007 does for ideas.
+
+CREATE OR REPLACE FUNCTION notify_user_changed() RETURNS trigger AS $$
+BEGIN
+  PERFORM pg_notify('user_changed', COALESCE(NEW.id, OLD.id)::text);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_users_notify_changed ON users;
+CREATE TRIGGER trg_users_notify_changed
+  AFTER UPDATE OR DELETE ON users
+  FOR EACH ROW EXECUTE FUNCTION notify_user_changed();
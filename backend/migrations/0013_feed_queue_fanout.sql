@@ -0,0 +1,25 @@
+-- 0013: Fan newly published ideas out to feed queues in batches
+--
+-- 0004 pushed every published idea into every queue inside the publishing
+-- transaction, which costs one row per user with a queue. Publishing now
+-- only records the idea in feed_queue_pending;
+-- `python -m app.jobs.maintain_feed_queues` pushes it to users who refilled
+-- recently, in batches, caps each queue and drops queues of idle users
+-- (their next request refills from scratch).
+
+CREATE TABLE IF NOT EXISTS feed_queue_pending (
+  idea_id UUID PRIMARY KEY REFERENCES ideas(id) ON DELETE CASCADE,
+  queued_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION feed_queue_on_idea_status() RETURNS trigger AS $$
+BEGIN
+  IF NEW.status = 'published' AND (TG_OP = 'INSERT' OR OLD.status IS DISTINCT FROM 'published') THEN
+    INSERT INTO feed_queue_pending(idea_id) VALUES (NEW.id) ON CONFLICT DO NOTHING;
+  ELSIF TG_OP = 'UPDATE' AND NEW.status IS DISTINCT FROM 'published' AND OLD.status = 'published' THEN
+    DELETE FROM feed_queue_pending WHERE idea_id = NEW.id;
+    DELETE FROM feed_queue WHERE idea_id = NEW.id;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,85 @@
+"""Benchmark bearer-token auth: require_user_id with and without the verified-token cache.
+
+Run from backend/ with `python -m scripts.bench_auth`. Tokens are signed
+locally with a throwaway secret and nothing connects to a database. Each
+request in the "decode" runs verifies its JWT; the "cache hit" run serves the
+same tokens from VerifiedTokenCache, as repeat requests from a client do.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from app.api.deps import require_user_id
+from app.core.security import VerifiedTokenCache, create_access_token, decode_access_token
+from app.core.settings import Settings
+
+
+def _time(fn, headers: list[str], *, rounds: int) -> list[float]:
+    """Mean per-request latency in microseconds, one sample per round over all `headers`."""
+
+    async def run() -> list[float]:
+        samples = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for header in headers:
+                await fn(header)
+            samples.append((time.perf_counter() - started) * 1e6 / len(headers))
+        return samples
+
+    return asyncio.run(run())
+
+
+def _report(name: str, samples: list[float]) -> None:
+    print(f"{name:<26} median {statistics.median(samples):8.2f} us  "
+          f"p90 {statistics.quantiles(samples, n=10)[-1]:8.2f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=1000, help="distinct clients")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    settings = Settings(DATABASE_URL="postgresql://localhost/unused", JWT_SECRET="bench-secret")
+    headers = [
+        "Bearer "
+        + create_access_token(
+            subject=str(uuid.uuid4()),
+            secret=settings.jwt_secret,
+            issuer=settings.jwt_issuer,
+            audience=settings.jwt_audience,
+            ttl_seconds=settings.jwt_ttl_seconds,
+        )
+        for _ in range(args.tokens)
+    ]
+    disabled = VerifiedTokenCache(max_entries=0)
+    cache = VerifiedTokenCache(max_entries=args.tokens)
+
+    async def decode_only(header: str) -> None:
+        decode_access_token(
+            token=header.removeprefix("Bearer "),
+            secret=settings.jwt_secret,
+            issuer=settings.jwt_issuer,
+            audience=settings.jwt_audience,
+        )
+
+    def require(token_cache: VerifiedTokenCache):
+        async def run(header: str) -> None:
+            await require_user_id(authorization=header, settings=settings, token_cache=token_cache)
+        return run
+
+    _time(require(cache), headers, rounds=1)  # Fill the cache.
+
+    _report("decode_access_token", _time(decode_only, headers, rounds=args.rounds))
+    _report("require_user_id (decode)", _time(require(disabled), headers, rounds=args.rounds))
+    _report("require_user_id (cached)", _time(require(cache), headers, rounds=args.rounds))
+    print(f"cache {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Benchmark author idea stats: one grouped query vs the old per-idea loop.
+
+Run from backend/ against a migrated database that already has some users, e.g.
+`DATABASE_URL=postgresql://localhost/vibecheck python -m scripts.bench_author_stats`.
+Authors with 10, 100 and 1000 ideas (about 40 swipes each) are committed so
+both paths read settled, vacuumed rows as in production, then deleted again;
+the swipe delete triggers take their counts back out of the aggregates.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+from collections.abc import Callable
+from uuid import UUID
+
+import psycopg
+from psycopg.rows import dict_row
+
+from app.data import statements
+from app.data.repositories.swipes import PostgresSwipeRepository, _to_idea_stats
+
+
+# The per-idea statement GET /stats/my-ideas ran once per idea before the grouped query.
+_IDEA_SWIPE_TOTALS = """
+    SELECT total, vibes, no_vibes, decision_time_ms_sum, decision_time_count, decision_time_sketch
+    FROM idea_swipe_counters WHERE idea_id = %s
+"""
+
+
+class _OneConnection:
+    """Serves `Database.read` from the benchmark's connection, so both paths pay the same (no) pool cost."""
+
+    def __init__(self, conn: psycopg.Connection) -> None:
+        self._conn = conn
+
+    def read(self, fn: Callable[[psycopg.Connection], object], *, user_id: UUID | None = None) -> object:
+        return fn(self._conn)
+
+
+def _seed_author(cur: psycopg.Cursor, *, ideas: int, swipes_per_idea: int) -> UUID:
+    author_id = cur.execute(
+        "INSERT INTO users(auth_provider, auth_subject) VALUES ('bench', gen_random_uuid()::text) RETURNING id"
+    ).fetchone()["id"]
+    cur.execute(
+        """
+        INSERT INTO ideas(title, short_pitch, category, media_url, one_liner, status, author_id)
+        SELECT 'bench ' || g, 'pitch', (ARRAY['ai', 'fintech', 'health', 'climate'])[1 + g %% 4], '', 'one liner',
+               'published', %s
+        FROM generate_series(1, %s) g
+        """,
+        (author_id, ideas),
+    )
+    cur.execute(
+        """
+        INSERT INTO swipes(user_id, idea_id, direction, decision_time_ms)
+        SELECT u.id, i.id, CASE WHEN random() < 0.5 THEN 'vibe' ELSE 'no_vibe' END::swipe_direction,
+               (random() * 5000)::int
+        FROM ideas i
+        CROSS JOIN LATERAL (
+          SELECT id FROM users WHERE auth_provider <> 'bench' ORDER BY random() LIMIT %s
+        ) u
+        WHERE i.author_id = %s
+        """,
+        (swipes_per_idea, author_id),
+    )
+    return author_id
+
+
+def _time(fn, *, rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _report(name: str, samples: list[float], ideas: int, queries: int) -> None:
+    print(f"{ideas:>5} ideas  {name:<9} median {statistics.median(samples):8.2f} ms  "
+          f"p90 {statistics.quantiles(samples, n=10)[-1]:8.2f} ms  ({queries} queries)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--swipes-per-idea", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("pass --dsn or set DATABASE_URL")
+
+    with psycopg.connect(args.dsn, autocommit=True) as conn, conn.cursor(row_factory=dict_row) as cur:
+        with conn.transaction():
+            authors = {
+                size: _seed_author(cur, ideas=size, swipes_per_idea=args.swipes_per_idea) for size in args.sizes
+            }
+        try:
+            cur.execute("VACUUM ANALYZE ideas, idea_swipe_counters, category_decision_sketches")
+            swipes = PostgresSwipeRepository(_OneConnection(conn))
+            for size, author_id in authors.items():
+                def per_idea() -> list:
+                    cur.execute(statements.IDEAS_BY_AUTHOR, (author_id, None), prepare=True)
+                    idea_ids = [r["id"] for r in cur.fetchall()]
+                    return [
+                        _to_idea_stats(cur.execute(_IDEA_SWIPE_TOTALS, (idea_id,), prepare=True).fetchone() or {},
+                                       idea_id=idea_id)
+                        for idea_id in idea_ids
+                    ]
+
+                def grouped() -> list:
+                    return swipes.get_author_idea_stats(author_id=author_id)
+
+                _report("per-idea", _time(per_idea, rounds=args.rounds), size, size + 1)
+                _report("grouped", _time(grouped, rounds=args.rounds), size, 2)
+        finally:
+            with conn.transaction():
+                author_ids = list(authors.values())
+                cur.execute(
+                    "DELETE FROM swipes WHERE idea_id IN (SELECT id FROM ideas WHERE author_id = ANY(%s))",
+                    (author_ids,),
+                )
+                cur.execute("DELETE FROM ideas WHERE author_id = ANY(%s)", (author_ids,))
+                cur.execute("DELETE FROM users WHERE id = ANY(%s)", (author_ids,))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark feed ranking: encode and score a candidate window with NumPy.
+
+Run from backend/ with `python -m scripts.bench_feed`. No database is needed;
+candidates and the user's affinity are synthetic but shaped like production
+(a handful of categories, 0-5 tags per idea drawn from a few hundred, ages
+spread over a month). Reports encoding, NumPy scoring on its own, and the full
+`rank_ideas` call; at the production window (RANKING_WINDOW) ranking should
+stay under 1 ms.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.domain.models import FeedCandidate, SwipeStats, User
+from app.domain.usecases.feed import build_affinity, encode_candidates, rank_ideas, score_candidates
+
+
+_CATEGORIES = ["ai", "fintech", "health", "climate", "devtools", "consumer", "education", "gaming"]
+_TAGS = [f"tag-{i}" for i in range(300)]
+
+
+def _candidates(n: int, *, now: datetime, rng: random.Random) -> list[FeedCandidate]:
+    return [
+        FeedCandidate(
+            id=uuid.uuid4(),
+            category=rng.choice(_CATEGORIES),
+            tags=rng.sample(_TAGS, rng.randint(0, 5)),
+            created_at=now - timedelta(minutes=rng.randint(0, 30 * 24 * 60)),
+        )
+        for _ in range(n)
+    ]
+
+
+def _time(fn, *, rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _report(name: str, samples: list[float], size: int) -> None:
+    print(f"{name:<18} {size:>5} candidates  median {statistics.median(samples):7.3f} ms  "
+          f"p90 {statistics.quantiles(samples, n=10)[-1]:7.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 1000, 2000, 5000])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    user = User(
+        id=uuid.uuid4(),
+        auth_provider="bench",
+        auth_subject="bench",
+        display_name=None,
+        about=None,
+        avatar_url=None,
+        interests={"categories": ["ai", "climate"], "tags": {t: 1.0 for t in rng.sample(_TAGS, 20)}},
+        created_at=now,
+    )
+    stats = SwipeStats(
+        total_swipes=400,
+        total_vibes=180,
+        total_no_vibes=220,
+        by_category={c: {"total": 50, "vibes": rng.randint(5, 45), "no_vibes": 0} for c in _CATEGORIES},
+    )
+    affinity = build_affinity(user=user, stats=stats)
+
+    for size in args.sizes:
+        candidates = _candidates(size, now=now, rng=rng)
+        features = encode_candidates(candidates, now=now)
+        _report("encode_candidates", _time(lambda: encode_candidates(candidates, now=now), rounds=args.rounds), size)
+        _report("score_candidates", _time(lambda: score_candidates(features, affinity), rounds=args.rounds), size)
+        _report("rank_ideas", _time(lambda: rank_ideas(candidates, affinity, now=now), rounds=args.rounds), size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark presigning a feed page of media URLs: botocore per key vs presign_get_many.
+
+Run from backend/ with `python -m scripts.bench_presign`. Signing is local, so
+dummy credentials are enough, e.g.
+`AWS_ACCESS_KEY_ID=x AWS_SECRET_ACCESS_KEY=y python -m scripts.bench_presign`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from app.services import s3_presign
+
+
+def _time(fn, *, rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        s3_presign._get_url_cache.clear()
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _report(name: str, samples: list[float], keys: int) -> None:
+    median = statistics.median(samples)
+    print(f"{name:<22} median {median:8.3f} ms  p90 {statistics.quantiles(samples, n=10)[-1]:8.3f} ms  "
+          f"{median * 1000 / keys:7.1f} us/key")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--region", default="eu-north-1")
+    parser.add_argument("--bucket", default="vibecheck-media")
+    parser.add_argument("--keys", type=int, default=30, help="URLs per page (e.g. 10 cards x 3 media)")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    keys = [f"ideas/{i:04d}/media/{i:012x}.jpg" for i in range(args.keys)]
+    client = s3_presign.get_s3_client(args.region)
+
+    def botocore_each() -> None:
+        for key in keys:
+            client.generate_presigned_url(
+                ClientMethod="get_object",
+                Params={"Bucket": args.bucket, "Key": key},
+                ExpiresIn=900,
+            )
+
+    def native_many() -> None:
+        s3_presign.presign_get_many(region=args.region, bucket=args.bucket, object_keys=keys, ttl_seconds=900)
+
+    native_many()  # Warm the client, credentials and signing key.
+    _report("botocore per key", _time(botocore_each, rounds=args.rounds), args.keys)
+    _report("presign_get_many", _time(native_many, rounds=args.rounds), args.keys)
+
+    native_many()
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        native_many()
+    cached = (time.perf_counter() - started) * 1000 / args.rounds
+    print(f"{'presign_get_many hit':<22} mean   {cached:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
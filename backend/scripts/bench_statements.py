@@ -0,0 +1,89 @@
+"""Benchmark the hot statements in app/data/statements.py, unprepared vs prepared.
+
+Run from backend/ against a migrated, seeded database, e.g.
+`DATABASE_URL=postgresql://localhost/vibecheck python -m scripts.bench_statements`.
+Everything runs in one transaction that is rolled back, so the swipes and
+queue rows the benchmark writes never persist.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+
+import psycopg
+
+from app.data import statements
+
+
+def _time(cur: psycopg.Cursor, statement: str, params: list, *, prepare: bool, warmup: int) -> list[float]:
+    samples = []
+    for p in params:
+        started = time.perf_counter()
+        cur.execute(statement, p, prepare=prepare)
+        if cur.description is not None:
+            cur.fetchall()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples[warmup:]
+
+
+def _report(name: str, unprepared: list[float], prepared: list[float]) -> None:
+    before = statistics.median(unprepared)
+    after = statistics.median(prepared)
+    print(f"{name:<22} unprepared {before:7.3f} ms  prepared {after:7.3f} ms  ({(after - before) / before:+.0%})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("pass --dsn or set DATABASE_URL")
+
+    # Turn off psycopg's auto-prepare so prepare=False really re-plans every execution.
+    with psycopg.connect(args.dsn, prepare_threshold=None) as conn, conn.cursor() as cur:
+        users = [r[0] for r in cur.execute("SELECT id FROM users ORDER BY id LIMIT 200").fetchall()]
+        pairs = cur.execute(
+            """
+            SELECT u.id, i.id
+            FROM (SELECT id FROM users ORDER BY id LIMIT 50) u
+            CROSS JOIN (SELECT id FROM ideas WHERE status = 'published' ORDER BY created_at DESC LIMIT 500) i
+            WHERE NOT EXISTS (SELECT 1 FROM swipes s WHERE s.user_id = u.id AND s.idea_id = i.id)
+            LIMIT %s
+            """,
+            (2 * args.rounds,),
+        ).fetchall()
+        if not users or len(pairs) < 2 * args.rounds:
+            parser.error("the database needs users, published ideas and unswiped pairs; seed it first")
+        # Fill every sampled user's queue so the peeks read real rows.
+        for user_id in users:
+            cur.execute(statements.FEED_QUEUE_REFILL, (user_id, user_id, user_id, user_id, 200))
+
+        cases = {
+            "feed candidates (200)": (
+                statements.FEED_QUEUE_CANDIDATES, lambda i: (users[i % len(users)], [], 200)
+            ),
+            "feed refill probe": (statements.FEED_QUEUE_REFILL, lambda i: (users[i % len(users)],) * 4 + (0,)),
+            "user category stats": (statements.USER_CATEGORY_STATS, lambda i: (users[i % len(users)],)),
+        }
+        for name, (statement, make) in cases.items():
+            params = [make(i) for i in range(args.rounds)]
+            unprepared = _time(cur, statement, params, prepare=False, warmup=args.warmup)
+            prepared = _time(cur, statement, params, prepare=True, warmup=args.warmup)
+            _report(name, unprepared, prepared)
+
+        # Each swipe insert needs its own (user, idea) pair; split them between the two runs.
+        inserts = [(user_id, idea_id, "vibe", 100) for user_id, idea_id in pairs]
+        unprepared = _time(cur, statements.SWIPE_INSERT, inserts[: args.rounds], prepare=False, warmup=args.warmup)
+        prepared = _time(cur, statements.SWIPE_INSERT, inserts[args.rounds :], prepare=True, warmup=args.warmup)
+        _report("swipe insert", unprepared, prepared)
+
+        conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Replay write-behind swipes spooled to the dead-letter file by SwipeWriteBuffer.
+
+Run from backend/ once the database is reachable again, e.g.
+`DATABASE_URL=postgresql://localhost/vibecheck python -m scripts.replay_swipe_dead_letters`.
+The spool is renamed before it is read, so swipes spooled meanwhile start a
+new file. Swipes keep the ids and timestamps they were given on submit, and
+the insert skips conflicts, so a replay that fails half-way can simply be
+rerun on the renamed file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from collections import Counter
+
+import psycopg
+from psycopg.rows import dict_row
+
+from app.data import statements
+from app.data.swipe_buffer import read_dead_letters
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", default=os.environ.get("SWIPE_DEAD_LETTER_PATH", "swipe-dead-letters.jsonl"))
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("pass --dsn or set DATABASE_URL")
+
+    path = args.path
+    if not path.endswith(".replaying"):
+        if not os.path.exists(path):
+            print(f"{path}: nothing to replay")
+            return
+        os.replace(path, path + ".replaying")
+        path += ".replaying"
+
+    swipes = read_dead_letters(path)
+    outcomes: Counter[str] = Counter()
+    with psycopg.connect(args.dsn) as conn, conn.cursor(row_factory=dict_row) as cur:
+        for start in range(0, len(swipes), args.batch):
+            batch = swipes[start : start + args.batch]
+            cur.execute(
+                statements.SWIPE_INSERT_MANY,
+                (
+                    [s.id for s in batch],
+                    [s.user_id for s in batch],
+                    [s.idea_id for s in batch],
+                    [s.direction for s in batch],
+                    [s.decision_time_ms for s in batch],
+                    [s.created_at for s in batch],
+                ),
+            )
+            outcomes.update(row["status"] for row in cur.fetchall())
+            conn.commit()
+    os.remove(path)
+    print(f"replayed {len(swipes)} swipes: {dict(outcomes)}")
+
+
+if __name__ == "__main__":
+    main()
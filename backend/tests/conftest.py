@@ -0,0 +1,48 @@
+"""Shared fixtures.
+
+Database tests need a Postgres server: set TEST_DATABASE_URL to a DSN whose
+role may create databases (e.g. postgresql://postgres@localhost:5432/postgres).
+Each session creates a throwaway database on that server, migrates it and
+drops it afterwards; without TEST_DATABASE_URL those tests are skipped.
+"""
+
+from __future__ import annotations
+
+import os
+import uuid
+from collections.abc import Iterator
+from pathlib import Path
+
+import psycopg
+import pytest
+from psycopg import sql
+from psycopg.conninfo import conninfo_to_dict, make_conninfo
+
+from app.data.db import Database
+from app.data.migrations import run_migrations
+
+
+MIGRATIONS_DIR = str(Path(__file__).resolve().parents[1] / "migrations")
+
+
+@pytest.fixture(scope="session")
+def database_url() -> Iterator[str]:
+    admin_url = os.environ.get("TEST_DATABASE_URL")
+    if not admin_url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    name = f"vibecheck_test_{uuid.uuid4().hex[:12]}"
+    with psycopg.connect(admin_url, autocommit=True) as conn:
+        conn.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(name)))
+    url = make_conninfo(**{**conninfo_to_dict(admin_url), "dbname": name})
+    try:
+        db = Database(url)
+        db.open()
+        try:
+            run_migrations(db, migrations_dir=MIGRATIONS_DIR)
+        finally:
+            db.close()
+        yield url
+    finally:
+        with psycopg.connect(admin_url, autocommit=True) as conn:
+            conn.execute(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(sql.Identifier(name)))
@@ -0,0 +1,164 @@
+"""Feed ranking reads: candidates, in-transaction affinity and the served cards."""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from uuid import UUID
+
+import psycopg
+import pytest
+
+from app.data.db import AsyncDatabase
+from app.data.idea_cache import IdeaCache
+from app.data.repositories.ideas import AsyncPostgresIdeaRepository
+from app.data.repositories.swipes import AsyncPostgresSwipeRepository
+from app.data.repositories.users import AsyncPostgresUserRepository
+from app.data.seen_ideas import SeenIdeaCache
+from app.data.user_cache import UserCache
+from app.domain.models import FeedCandidate, SwipeStats
+from app.domain.usecases.feed import get_next_ideas
+from app.domain.usecases.swipe import record_swipe_and_get_next
+
+
+@pytest.fixture
+def deck(database_url: str) -> dict:
+    """A user who liked every idea of one category so far, and the newest ideas in the database: five of
+    another category and, a little older, one of the liked category.
+
+    The categories are unique to the test, so ideas left by other tests do not rank above the liked one.
+    """
+    liked_category, other_category = f"liked-{uuid.uuid4().hex[:8]}", f"other-{uuid.uuid4().hex[:8]}"
+    with psycopg.connect(database_url, autocommit=True) as conn:
+        user_id = conn.execute(
+            "INSERT INTO users(auth_provider, auth_subject) VALUES ('test', %s) RETURNING id", (uuid.uuid4().hex,)
+        ).fetchone()[0]
+
+        def ideas(category: str, count: int, age: str) -> list[UUID]:
+            return [
+                r[0]
+                for r in conn.execute(
+                    """
+                    INSERT INTO ideas(title, short_pitch, category, media_url, one_liner, created_at)
+                    SELECT 'idea ' || g, 'pitch', %s, '', 'one liner',
+                      now() + interval '1 day' - %s::interval - g * interval '1 minute'
+                    FROM generate_series(1, %s) g
+                    RETURNING id
+                    """,
+                    (category, age, count),
+                )
+            ]
+
+        history = ideas(liked_category, 10, "30 days")
+        conn.execute(
+            "INSERT INTO swipes(user_id, idea_id, direction) SELECT %s, unnest(%s::uuid[]), 'vibe'",
+            (user_id, history),
+        )
+        swiped = ideas(other_category, 1, "0 minutes")[0]
+        newest = ideas(other_category, 5, "1 hour")
+        [liked] = ideas(liked_category, 1, "2 hours")
+        conn.execute(
+            "INSERT INTO idea_media(idea_id, media_type, s3_key, position) VALUES (%s, 'image', 'k0', 0)", (liked,)
+        )
+    return {
+        "user_id": user_id,
+        "categories": (liked_category, other_category),
+        "swiped": swiped,
+        "newest": newest,
+        "liked": liked,
+    }
+
+
+@asynccontextmanager
+async def _repos(
+    database_url: str,
+) -> AsyncIterator[tuple[AsyncDatabase, SeenIdeaCache, AsyncPostgresSwipeRepository]]:
+    db = AsyncDatabase(database_url)
+    await db.open()
+    try:
+        seen = SeenIdeaCache(db, max_users=10, max_ideas_per_user=100)
+        yield db, seen, AsyncPostgresSwipeRepository(db, seen=seen, cache=IdeaCache(max_entries=100))
+    finally:
+        await db.close()
+
+
+def test_swipe_and_next_ranks_candidates_with_stats_from_its_transaction(database_url: str, deck) -> None:
+    user_id = deck["user_id"]
+    liked, other = deck["categories"]
+    ranked: list[tuple[list[FeedCandidate], SwipeStats]] = []
+
+    def rank(candidates: list[FeedCandidate], stats: SwipeStats) -> list[FeedCandidate]:
+        ranked.append((candidates, stats))
+        return sorted(candidates, key=lambda c: c.category != liked)
+
+    async def body() -> None:
+        async with _repos(database_url) as (_, _, swipes):
+            _, card = await swipes.create_and_get_next(
+                user_id=user_id,
+                idea_id=deck["swiped"],
+                direction="no_vibe",
+                decision_time_ms=None,
+                window=50,
+                rank=rank,
+            )
+            assert card is not None and card.idea.id == deck["liked"]
+            assert [m.s3_key for m in card.media] == ["k0"]
+
+    asyncio.run(body())
+    [(candidates, stats)] = ranked
+    assert {*deck["newest"], deck["liked"]} <= {c.id for c in candidates}
+    assert deck["swiped"] not in {c.id for c in candidates}
+    # The swipe recorded in the same transaction is already counted.
+    assert stats.by_category[liked]["vibes"] == 10
+    assert stats.by_category[other]["no_vibes"] == 1
+
+
+def test_swipe_and_next_uses_one_checkout_with_a_cached_user(database_url: str, deck) -> None:
+    user_id = deck["user_id"]
+
+    async def body() -> None:
+        async with _repos(database_url) as (db, seen, swipes):
+            users = AsyncPostgresUserRepository(db, cache=UserCache(max_entries=10))
+            await users.get_by_id(user_id)
+            await seen.warm_async(user_id)
+            before = db.pool().get_stats()["requests_num"]
+            _, card = await record_swipe_and_get_next(
+                swipes=swipes,
+                users=users,
+                user_id=user_id,
+                idea_id=deck["swiped"],
+                direction="vibe",
+                decision_time_ms=300,
+            )
+            assert db.pool().get_stats()["requests_num"] - before == 1
+            # Ten vibes on the liked category outweigh the newer ideas.
+            assert card is not None and card.idea.id == deck["liked"]
+
+    asyncio.run(body())
+
+
+def test_feed_deck_loads_only_the_served_ideas(database_url: str, deck) -> None:
+    user_id = deck["user_id"]
+
+    async def body() -> None:
+        async with _repos(database_url) as (db, seen, _):
+            cache = IdeaCache(max_entries=1000)
+            ideas = AsyncPostgresIdeaRepository(db, seen=seen, cache=cache)
+            users = AsyncPostgresUserRepository(db, cache=UserCache(max_entries=10))
+            await users.get_by_id(user_id)
+            await seen.warm_async(user_id)
+            before = db.pool().get_stats()["requests_num"]
+            served = await get_next_ideas(
+                ideas=ideas, users=users, user_id=user_id, limit=1, exclude_ids=[deck["swiped"]]
+            )
+            assert db.pool().get_stats()["requests_num"] - before == 1
+            # The liked category ranks first although newer ideas were candidates.
+            assert [idea.id for idea in served] == [deck["liked"]]
+            # Only the served idea was read in full (and cached); the newer candidates were not.
+            assert cache.get_idea(deck["liked"]) is not None
+            assert all(cache.get_idea(idea_id) is None for idea_id in deck["newest"])
+
+    asyncio.run(body())
+
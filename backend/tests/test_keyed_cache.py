@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import uuid
+
+from app.data.idea_cache import IdeaCache
+from app.data.keyed_cache import KeyedCache
+
+
+def test_put_after_invalidation_of_its_key_is_dropped() -> None:
+    cache: KeyedCache[str] = KeyedCache(max_entries=10)
+    key = uuid.uuid4()
+    token = cache.read_token()
+    cache.invalidate(key)
+
+    cache.put(key, "stale", token=token)
+
+    assert cache.get(key) is None
+    cache.put(key, "fresh", token=cache.read_token())
+    assert cache.get(key) == "fresh"
+
+
+def test_put_survives_invalidation_of_other_keys() -> None:
+    cache: KeyedCache[str] = KeyedCache(max_entries=10)
+    key = uuid.uuid4()
+    token = cache.read_token()
+    # Keys in other stripes: hashes that differ from the key's in the low bits.
+    others = [k for k in (uuid.uuid4() for _ in range(100)) if (hash(k) - hash(key)) % 256][:20]
+    for other in others:
+        cache.invalidate(other)
+
+    cache.put(key, "value", token=token)
+
+    assert cache.get(key) == "value"
+
+
+def test_put_after_clear_is_dropped() -> None:
+    cache: KeyedCache[str] = KeyedCache(max_entries=10)
+    key = uuid.uuid4()
+    token = cache.read_token()
+    cache.clear()
+
+    cache.put(key, "stale", token=token)
+
+    assert cache.get(key) is None
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache: KeyedCache[str] = KeyedCache(max_entries=2)
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    token = cache.read_token()
+    cache.put(a, "a", token=token)
+    cache.put(b, "b", token=token)
+    cache.get(a)
+
+    cache.put(c, "c", token=token)
+
+    assert cache.get(b) is None
+    assert cache.get(a) == "a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_idea_cache_keeps_idea_and_media_independently() -> None:
+    cache = IdeaCache(max_entries=10)
+    idea_id = uuid.uuid4()
+
+    cache.put_media(idea_id, [], token=cache.read_token())
+
+    assert cache.get_media(idea_id) == []
+    assert cache.get_idea(idea_id) is None
+    cache.invalidate(idea_id)
+    assert cache.get_media(idea_id) is None
@@ -0,0 +1,174 @@
+"""JWKS caching in OidcVerifier, against a stub JWKS endpoint on localhost."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.data.oidc import JwksCache, OidcConfig, OidcVerifier
+
+
+_ISSUER = "https://issuer.example"
+_AUDIENCE = "vibecheck-client"
+
+
+class _StubJwks:
+    """JWKS endpoint state: the served keys, whether it fails, and how often it was hit."""
+
+    def __init__(self) -> None:
+        self.keys: list[dict] = []
+        self.cache_control = "public, max-age=300"
+        self.fail = False
+        self.delay = 0.05
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def handler(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                with stub._lock:
+                    stub.hits += 1
+                # Hold the response so concurrent refreshes overlap.
+                time.sleep(stub.delay)
+                if stub.fail:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                body = json.dumps({"keys": stub.keys}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", stub.cache_control)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+
+def _signing_key(kid: str) -> tuple[bytes, dict]:
+    """A fresh RSA key as (private PEM, public JWK)."""
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public = jwk.construct(pem, "RS256").public_key().to_dict()
+    public.update(kid=kid, alg="RS256")
+    return pem, public
+
+
+@pytest.fixture(scope="module")
+def keys() -> dict[str, tuple[bytes, dict]]:
+    return {kid: _signing_key(kid) for kid in ("k1", "k2")}
+
+
+@pytest.fixture(scope="module")
+def tokens(keys) -> dict[str, str]:
+    """One ID token per kid, signed up front: RS256 signing is slow next to the refresh intervals."""
+    return {kid: _token(pem, kid) for kid, (pem, _) in keys.items()}
+
+
+@pytest.fixture
+def stub() -> Iterator[tuple[_StubJwks, str]]:
+    state = _StubJwks()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), state.handler())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield state, f"http://127.0.0.1:{server.server_address[1]}/jwks"
+    server.shutdown()
+    server.server_close()
+
+
+def _token(pem: bytes, kid: str) -> str:
+    claims = {"sub": "subject", "iss": _ISSUER, "aud": _AUDIENCE, "exp": int(time.time()) + 60}
+    return jwt.encode(claims, pem, algorithm="RS256", headers={"kid": kid})
+
+
+def _verifier(url: str, **jwks_options) -> OidcVerifier:
+    return OidcVerifier(
+        OidcConfig(issuer=_ISSUER, jwks_url=url, audience=_AUDIENCE),
+        jwks=JwksCache(url, **jwks_options),
+    )
+
+
+def test_concurrent_logins_share_one_fetch(stub, keys, tokens) -> None:
+    state, url = stub
+    state.keys = [keys["k1"][1]]
+    verifier = _verifier(url)
+    token = tokens["k1"]
+
+    with ThreadPoolExecutor(16) as pool:
+        claims = list(pool.map(lambda _: verifier.verify_id_token(token), range(64)))
+
+    assert all(c["sub"] == "subject" for c in claims)
+    assert state.hits == 1
+    assert verifier.jwks_stats()["fetches"] == 1
+    verifier.close()
+
+
+def test_unknown_kid_refreshes_once_per_interval(stub, keys, tokens) -> None:
+    state, url = stub
+    state.keys = [keys["k1"][1]]
+    verifier = _verifier(url, min_refresh_interval=0.5)
+    verifier.verify_id_token(tokens["k1"])
+
+    # Unknown kids inside the refresh interval are rejected without a fetch.
+    for _ in range(5):
+        with pytest.raises(ValueError, match="Unknown key id"):
+            verifier.verify_id_token(tokens["k2"])
+    assert state.hits == 1
+
+    # After the interval the provider has rotated in k2; the next login picks it up.
+    state.keys = [keys["k1"][1], keys["k2"][1]]
+    time.sleep(0.6)
+    with ThreadPoolExecutor(8) as pool:
+        claims = list(pool.map(lambda _: verifier.verify_id_token(tokens["k2"]), range(16)))
+
+    assert all(c["sub"] == "subject" for c in claims)
+    assert state.hits == 2
+    verifier.close()
+
+
+def test_failed_refresh_keeps_cached_keys(stub, keys, tokens) -> None:
+    state, url = stub
+    state.keys = [keys["k1"][1]]
+    state.cache_control = "max-age=0"
+    verifier = _verifier(url, min_refresh_interval=60.0)
+    token = tokens["k1"]
+    verifier.verify_id_token(token)
+
+    state.fail = True
+    assert verifier.verify_id_token(token)["sub"] == "subject"
+    # The failure pushes the next attempt out by min_refresh_interval.
+    assert verifier.verify_id_token(token)["sub"] == "subject"
+
+    assert state.hits == 2
+    stats = verifier.jwks_stats()
+    assert stats["fetches"] == 1
+    assert stats["fetch_errors"] == 1
+    verifier.close()
+
+
+def test_failed_first_fetch_raises(stub, tokens) -> None:
+    state, url = stub
+    state.fail = True
+    verifier = _verifier(url)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        verifier.verify_id_token(tokens["k1"])
+
+    assert verifier.jwks_stats()["fetch_errors"] == 1
+    verifier.close()
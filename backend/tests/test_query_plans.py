@@ -0,0 +1,315 @@
+"""Plan-regression tests for every statement in app/data/statements.py.
+
+Each statement runs under EXPLAIN (ANALYZE, BUFFERS) against a seeded,
+analyzed database, inside a transaction that is rolled back, so writes and
+their triggers run for real and leave nothing behind. Per statement the test
+checks the plan shape (the indexes it must use, the tables it must not scan
+sequentially), the shared buffers its plan touches (hit + read) and its
+execution time, which includes the triggers a write fires. Budgets are a few
+times what the seed needs, so they catch a lost index path or a plan that
+starts walking whole tables, not noise. A new statement needs a case in `_CASES`.
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import psycopg
+import pytest
+
+from app.data import statements
+from app.data.db import Database
+from app.jobs.rollup_swipes import rollup_swipes
+
+
+# Seeded users sign in with the 'plans' provider, apart from any users other test modules left behind.
+_SEED = [
+    """
+    INSERT INTO users(auth_provider, auth_subject)
+    SELECT 'plans', 'user-' || g FROM generate_series(1, 300) g
+    """,
+    """
+    INSERT INTO ideas(title, short_pitch, category, media_url, one_liner, status, author_id, created_at)
+    SELECT
+      'idea ' || g,
+      'pitch',
+      (ARRAY['ai', 'fintech', 'health', 'climate'])[1 + g % 4],
+      '',
+      'one liner',
+      CASE WHEN g % 10 = 0 THEN 'draft' ELSE 'published' END,
+      u.id,
+      now() - g * interval '5 minutes'
+    FROM generate_series(1, 30000) g
+    JOIN (
+      SELECT id, row_number() OVER (ORDER BY id) - 1 AS n FROM users WHERE auth_provider = 'plans'
+    ) u ON u.n = g % 300
+    """,
+    """
+    INSERT INTO idea_media(idea_id, media_type, s3_key, position)
+    SELECT i.id, 'image', 'ideas/' || i.id || '/' || p || '.png', p
+    FROM ideas i CROSS JOIN generate_series(0, 1) p
+    """,
+    """
+    INSERT INTO swipes(user_id, idea_id, direction, decision_time_ms, created_at)
+    SELECT
+      u.id,
+      i.id,
+      CASE WHEN (u.n + i.n) % 3 = 0 THEN 'vibe' ELSE 'no_vibe' END::swipe_direction,
+      (u.n * 37 + i.n * 11) % 5000,
+      now() - ((u.n * 131 + i.n * 7) % 43200) * interval '1 minute'
+    FROM (SELECT id, row_number() OVER (ORDER BY id) AS n FROM users WHERE auth_provider = 'plans') u
+    JOIN (SELECT id, row_number() OVER (ORDER BY id) AS n FROM ideas WHERE status = 'published') i
+      ON (i.n + u.n * 17) % 90 = 0
+    """,
+    """
+    INSERT INTO feed_queue(user_id, idea_id, created_at)
+    SELECT u.id, q.id, q.created_at
+    FROM users u
+    CROSS JOIN LATERAL (
+      SELECT i.id, i.created_at FROM ideas i
+      WHERE i.status = 'published'
+        AND NOT EXISTS (SELECT 1 FROM swipes s WHERE s.user_id = u.id AND s.idea_id = i.id)
+      ORDER BY i.created_at DESC
+      LIMIT 200
+    ) q
+    WHERE u.auth_provider = 'plans'
+    """,
+    # Signed-up users who never swiped: enough rows that lookups by key are index scans.
+    """
+    INSERT INTO users(auth_provider, auth_subject)
+    SELECT 'plans', 'idle-' || g FROM generate_series(1, 20000) g
+    """,
+    # Every user refilled recently and the fan-out job has emptied feed_queue_pending.
+    "INSERT INTO feed_queue_state(user_id, exhausted) SELECT id, false FROM users ON CONFLICT DO NOTHING",
+    "DELETE FROM feed_queue_pending",
+]
+
+
+@dataclass(frozen=True)
+class _Case:
+    params: Callable[[dict], object]
+    # Indexes the plan must use, and relations it must not scan sequentially.
+    indexes: tuple[str, ...] = ()
+    no_seq_scan: tuple[str, ...] = ()
+    # Shared blocks hit or read by the plan, and execution time in milliseconds.
+    max_blocks: int = 20
+    max_ms: float = 5.0
+
+
+def _swipe_arrays(sample: dict) -> tuple[list, ...]:
+    """SWIPE_INSERT_MANY arrays: 20 new swipes, one repeat and one unknown idea."""
+    idea_ids = [*sample["unswiped_ids"], sample["swiped_id"], uuid.uuid4()]
+    now = datetime.now(timezone.utc)
+    return (
+        [uuid.uuid4() for _ in idea_ids],
+        [sample["user_id"]] * len(idea_ids),
+        idea_ids,
+        ["vibe"] * len(idea_ids),
+        [1000] * len(idea_ids),
+        [now] * len(idea_ids),
+    )
+
+
+def _timeseries(sample: dict) -> dict:
+    now = datetime.now(timezone.utc)
+    return {"idea_id": sample["idea_id"], "granularity": "hour", "since": now - timedelta(days=30), "until": now}
+
+
+_AUTHOR_PAGE = "idx_ideas_author_created_at_id"
+_MEDIA = "idx_idea_media_idea_position"
+
+_CASES: dict[str, _Case] = {
+    # users
+    "USER_BY_ID": _Case(lambda s: (s["user_id"],), ("users_pkey",), ("users",)),
+    "USER_BY_AUTH": _Case(
+        lambda s: ("plans", s["auth_subject"]), ("users_auth_provider_auth_subject_key",), ("users",)
+    ),
+    # ideas
+    "IDEA_BY_ID": _Case(lambda s: (s["idea_id"],), ("ideas_pkey",), ("ideas",)),
+    "IDEAS_EXISTING": _Case(lambda s: (s["idea_ids"],), ("ideas_pkey",), ("ideas",), max_blocks=120),
+    "IDEAS_BY_IDS": _Case(lambda s: (s["idea_ids"],), ("ideas_pkey",), ("ideas",), 120),
+    "IDEAS_BY_AUTHOR": _Case(lambda s: (s["author_id"], 10), (_AUTHOR_PAGE,), ("ideas",), 40),
+    "IDEAS_BY_AUTHOR_AFTER": _Case(
+        lambda s: (s["author_id"], *s["author_cursor"], 10), (_AUTHOR_PAGE,), ("ideas",), 40
+    ),
+    "IDEA_CARD_BY_ID": _Case(lambda s: (s["idea_id"],), ("ideas_pkey", _MEDIA), ("ideas", "idea_media"), 30),
+    "IDEA_CARDS_BY_AUTHOR": _Case(
+        lambda s: (s["author_id"], 10), (_AUTHOR_PAGE, _MEDIA), ("ideas", "idea_media"), 150, 10.0
+    ),
+    "IDEA_CARDS_BY_AUTHOR_AFTER": _Case(
+        lambda s: (s["author_id"], *s["author_cursor"], 10), (_AUTHOR_PAGE, _MEDIA), ("ideas", "idea_media"), 150, 10.0
+    ),
+    # feed queue
+    "FEED_QUEUE_CANDIDATES": _Case(
+        lambda s: (s["user_id"], [], 200),
+        ("idx_feed_queue_user_created_at_idea", "ideas_pkey"),
+        ("feed_queue", "ideas"),
+        1500,
+        20.0,
+    ),
+    "FEED_QUEUE_LOCK": _Case(lambda s: (s["user_id"],), max_blocks=0),
+    # feed_queue_pending only holds what the fan-out job has not pushed yet, so it is scanned whole.
+    "FEED_QUEUE_EXHAUSTED": _Case(lambda s: (s["user_id"],), ("feed_queue_state_pkey",), ("feed_queue_state",)),
+    "FEED_QUEUE_REFILL": _Case(
+        lambda s: (s["user_id"],) * 4 + (200,),
+        ("idx_ideas_published_created_at", "swipes_user_id_idea_id_key", "feed_queue_pkey"),
+        ("ideas", "swipes", "feed_queue"),
+        12_000,
+        100.0,
+    ),
+    "FEED_QUEUE_DROP": _Case(
+        lambda s: (s["user_id"], s["queued_ids"]), ("feed_queue_pkey",), ("feed_queue",), 250, 10.0
+    ),
+    # The conflict check probes the primary key without a scan node.
+    "FEED_QUEUE_STATE_UPSERT": _Case(lambda s: (s["user_id"], True), max_blocks=40),
+    # idea media
+    "MEDIA_BY_IDEAS": _Case(lambda s: (s["idea_ids"],), (_MEDIA,), ("idea_media",), 150),
+    # swipes
+    "SWIPE_INSERT": _Case(lambda s: (s["user_id"], s["unswiped_ids"][0], "vibe", 1000), max_blocks=60, max_ms=20.0),
+    "SWIPE_INSERT_MANY": _Case(_swipe_arrays, ("ideas_pkey",), ("ideas",), 1500, 50.0),
+    "SEEN_IDEA_IDS": _Case(
+        lambda s: (s["user_id"], 5000), ("idx_swipes_user_id_created_at_dir",), ("swipes",), 1000, 10.0
+    ),
+    "USER_CATEGORY_STATS": _Case(lambda s: (s["user_id"],), ("user_category_stats_pkey",), ("user_category_stats",)),
+    "AUTHOR_IDEA_SWIPE_TOTALS": _Case(
+        lambda s: (s["author_id"],),
+        (_AUTHOR_PAGE, "idea_swipe_counters_pkey"),
+        ("ideas", "idea_swipe_counters"),
+        1000,
+        10.0,
+    ),
+    # 16 shards per category: a few pages however many swipes there are, so a scan is fine.
+    "CATEGORY_DECISION_SKETCHES": _Case(lambda s: (["ai", "health"],), max_blocks=30),
+    "IDEA_SWIPE_TIMESERIES": _Case(
+        _timeseries,
+        ("swipe_rollups_pkey", "idx_swipes_idea_id_created_at_dir"),
+        ("swipe_rollups", "swipes"),
+        100,
+        10.0,
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def conn(database_url: str) -> Iterator[psycopg.Connection]:
+    with psycopg.connect(database_url, autocommit=True) as conn:
+        for statement in _SEED:
+            conn.execute(statement)
+        db = Database(database_url)
+        db.open()
+        try:
+            rollup_swipes(db)
+        finally:
+            db.close()
+        # Set the visibility map as autovacuum would, so index-only scans are costed as in production.
+        conn.execute("VACUUM ANALYZE")
+        yield conn
+
+
+@pytest.fixture(scope="module")
+def sample(conn: psycopg.Connection) -> dict:
+    user_id = conn.execute(
+        "SELECT user_id FROM swipes GROUP BY user_id ORDER BY count(*) DESC, user_id LIMIT 1"
+    ).fetchone()[0]
+    author_id, auth_subject = conn.execute(
+        "SELECT u.id, u.auth_subject FROM users u JOIN ideas i ON i.author_id = u.id"
+        " GROUP BY u.id ORDER BY count(*) DESC, u.id LIMIT 1"
+    ).fetchone()
+    return {
+        "user_id": user_id,
+        "auth_subject": auth_subject,
+        "author_id": author_id,
+        "author_cursor": conn.execute(
+            "SELECT created_at, id FROM ideas WHERE author_id = %s ORDER BY created_at DESC, id DESC OFFSET 5 LIMIT 1",
+            (author_id,),
+        ).fetchone(),
+        "idea_id": conn.execute(
+            "SELECT idea_id FROM swipes GROUP BY idea_id ORDER BY count(*) DESC, idea_id LIMIT 1"
+        ).fetchone()[0],
+        "idea_ids": [r[0] for r in conn.execute("SELECT id FROM ideas ORDER BY created_at DESC LIMIT 20")],
+        "queued_ids": [
+            r[0]
+            for r in conn.execute(
+                "SELECT idea_id FROM feed_queue WHERE user_id = %s ORDER BY created_at DESC LIMIT 20", (user_id,)
+            )
+        ],
+        "swiped_id": conn.execute("SELECT idea_id FROM swipes WHERE user_id = %s LIMIT 1", (user_id,)).fetchone()[0],
+        "unswiped_ids": [
+            r[0]
+            for r in conn.execute(
+                """
+                SELECT i.id FROM ideas i
+                WHERE i.status = 'published'
+                  AND NOT EXISTS (SELECT 1 FROM swipes s WHERE s.user_id = %s AND s.idea_id = i.id)
+                ORDER BY i.created_at DESC
+                LIMIT 20
+                """,
+                (user_id,),
+            )
+        ],
+    }
+
+
+def _explain(conn: psycopg.Connection, statement: str, params) -> dict:
+    """The EXPLAIN (ANALYZE, BUFFERS) output of one run of the statement, rolled back afterwards."""
+    with conn.transaction(force_rollback=True):
+        return conn.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", params).fetchone()[0][0]
+
+
+def _scans(plan: dict) -> list[tuple[str, str | None, str | None]]:
+    """(node type, relation, index) of every scan node in the plan."""
+    scans: list[tuple[str, str | None, str | None]] = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if "Scan" in node["Node Type"]:
+            scans.append((node["Node Type"], node.get("Relation Name"), node.get("Index Name")))
+        stack.extend(node.get("Plans", []))
+    return scans
+
+
+def _assert_index(scans: list[tuple[str, str | None, str | None]], index: str) -> None:
+    assert any(index_name == index for _, _, index_name in scans), f"{index} not used: {scans}"
+
+
+def _assert_no_seq_scan(scans: list[tuple[str, str | None, str | None]], *relations: str) -> None:
+    seq = [relation for node_type, relation, _ in scans if node_type == "Seq Scan" and relation in relations]
+    assert not seq, f"sequential scan on {seq}: {scans}"
+
+
+def test_every_statement_has_a_case() -> None:
+    names = {
+        name
+        for name, value in vars(statements).items()
+        if name.isupper() and not name.startswith("_") and isinstance(value, str)
+    }
+    assert names == set(_CASES)
+
+
+@pytest.mark.parametrize("name", sorted(_CASES))
+def test_statement_plan(conn: psycopg.Connection, sample: dict, name: str) -> None:
+    case = _CASES[name]
+    explained = _explain(conn, getattr(statements, name), case.params(sample))
+    plan = explained["Plan"]
+
+    scans = _scans(plan)
+    for index in case.indexes:
+        _assert_index(scans, index)
+    _assert_no_seq_scan(scans, *case.no_seq_scan)
+
+    # AFTER triggers run outside the plan tree: their time is in Execution Time, their buffers are not counted.
+    blocks = plan["Shared Hit Blocks"] + plan["Shared Read Blocks"]
+    assert blocks <= case.max_blocks, f"{name} touched {blocks} shared blocks (budget {case.max_blocks})"
+    elapsed = explained["Execution Time"]
+    assert elapsed <= case.max_ms, f"{name} ran {elapsed:.2f} ms (ceiling {case.max_ms} ms)"
+
+
+def test_replaced_indexes_are_gone(conn: psycopg.Connection) -> None:
+    rows = conn.execute(
+        "SELECT indexname FROM pg_indexes WHERE indexname = ANY(%s)",
+        (["idx_swipes_idea_id_created_at", "idx_swipes_user_id_created_at", "idx_idea_media_idea"],),
+    ).fetchall()
+    assert rows == []
@@ -0,0 +1,136 @@
+"""Presigned GET URLs: native SigV4 parity with botocore, and the URL cache."""
+
+from __future__ import annotations
+
+import datetime as dt
+import time
+import types
+
+import botocore.auth
+import botocore.credentials
+import pytest
+
+from app.services import s3_presign
+
+
+_NOW = dt.datetime(2026, 10, 18, 12, 34, 56)
+
+_KEYS = [
+    "ideas/5b1c/media/3f2a9c1d0e4b.png",
+    "ideas/5b1c/media/with space.jpg",
+    "ideas/5b1c/media/plus+equals=amp&.webp",
+    "ideas/5b1c/media/tilde~star*quote'(1).gif",
+    "ideas/5b1c/media/ünïcødé/ключ.mp4",
+    "ideas/5b1c//double-slash.mov",
+]
+
+
+class _FrozenDatetime(dt.datetime):
+    @classmethod
+    def utcnow(cls) -> dt.datetime:
+        return _NOW
+
+
+@pytest.fixture(autouse=True)
+def aws(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "AKIDEXAMPLE")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY")
+    monkeypatch.delenv("AWS_SESSION_TOKEN", raising=False)
+    monkeypatch.delenv("AWS_PROFILE", raising=False)
+    monkeypatch.delenv("AWS_DEFAULT_REGION", raising=False)
+    monkeypatch.setenv("AWS_CONFIG_FILE", str(tmp_path / "config"))
+    monkeypatch.setenv("AWS_SHARED_CREDENTIALS_FILE", str(tmp_path / "credentials"))
+    # botocore stamps X-Amz-Date from utcnow(); pin it so both signers share one timestamp.
+    monkeypatch.setattr(botocore.auth, "datetime", types.SimpleNamespace(datetime=_FrozenDatetime))
+    _reset()
+    yield
+    _reset()
+
+
+def _reset() -> None:
+    s3_presign._boto_session.cache_clear()
+    s3_presign.get_s3_client.cache_clear()
+    s3_presign._get_url_cache.clear()
+
+
+def _botocore_urls(region: str | None, keys: list[str]) -> list[str]:
+    client = s3_presign.get_s3_client(region)
+    return [
+        client.generate_presigned_url(
+            ClientMethod="get_object",
+            Params={"Bucket": "vibecheck-media", "Key": key},
+            ExpiresIn=900,
+        )
+        for key in keys
+    ]
+
+
+@pytest.mark.parametrize("region", ["eu-north-1", "us-east-1", "eu-west-1", None])
+def test_native_signer_matches_botocore(region: str | None) -> None:
+    expected = _botocore_urls(region, _KEYS)
+    s3_presign._get_url_cache.clear()
+
+    urls = s3_presign.presign_get_many(region=region, bucket="vibecheck-media", object_keys=_KEYS, ttl_seconds=900)
+
+    assert urls == expected
+
+
+@pytest.mark.parametrize("region", ["eu-north-1", "us-east-1", "eu-west-1", None])
+def test_every_region_takes_the_native_path(region: str | None) -> None:
+    template_key = _KEYS[0]
+    template_url = _botocore_urls(region, [template_key])[0]
+
+    assert "X-Amz-Signature=" in template_url
+    assert s3_presign._SigV4QuerySigner.from_template(template_url, template_key) is not None
+
+
+def test_session_token_is_signed(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("AWS_SESSION_TOKEN", "FwoGZXIvYXdzEXAMPLE/token+with=chars")
+    _reset()
+    expected = _botocore_urls("eu-north-1", _KEYS)
+    s3_presign._get_url_cache.clear()
+
+    urls = s3_presign.presign_get_many(
+        region="eu-north-1", bucket="vibecheck-media", object_keys=_KEYS, ttl_seconds=900
+    )
+
+    assert "X-Amz-Security-Token=" in urls[1]
+    assert urls == expected
+
+
+def test_cached_urls_are_reused() -> None:
+    first = s3_presign.presign_get_many(
+        region="eu-north-1", bucket="vibecheck-media", object_keys=_KEYS, ttl_seconds=900
+    )
+    again = s3_presign.presign_get_many(
+        region="eu-north-1", bucket="vibecheck-media", object_keys=_KEYS, ttl_seconds=900
+    )
+
+    assert again == first
+
+
+def test_cache_entries_do_not_outlive_credentials() -> None:
+    cache = s3_presign.PresignedUrlCache(max_entries=10)
+    now = time.monotonic()
+    cache.put(("r", "b", "long"), "u1", signed_at=now, ttl_seconds=900, credentials_expire_at=now + 3600)
+    cache.put(("r", "b", "short"), "u2", signed_at=now, ttl_seconds=900, credentials_expire_at=now + 300)
+
+    assert cache.get(("r", "b", "long"), ttl_seconds=900) == "u1"
+    assert cache.get(("r", "b", "short"), ttl_seconds=900) is None
+
+
+def test_temporary_credentials_cap_cached_urls(monkeypatch: pytest.MonkeyPatch) -> None:
+    credentials = botocore.credentials.RefreshableCredentials(
+        access_key="ASIAEXAMPLE",
+        secret_key="secret",
+        token="token",
+        expiry_time=dt.datetime.now(dt.timezone.utc) + dt.timedelta(minutes=5),
+        refresh_using=lambda: {},
+        method="test",
+    )
+    monkeypatch.setattr(s3_presign._boto_session(), "get_credentials", lambda: credentials)
+
+    expire_at = s3_presign._credentials_expire_at()
+
+    assert expire_at is not None
+    assert 290 < expire_at - time.monotonic() <= 300
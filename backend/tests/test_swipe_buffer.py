@@ -0,0 +1,295 @@
+"""SwipeWriteBuffer and the swipe repository paths that feed it."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import UUID
+
+import psycopg
+import pytest
+from fastapi.testclient import TestClient
+
+from app.data import swipe_buffer
+from app.data.db import AsyncDatabase
+from app.data.repositories.swipes import AsyncPostgresSwipeRepository, DuplicateSwipeError
+from app.data.seen_ideas import SeenIdeaCache
+from app.data.swipe_buffer import (
+    SWIPE_WRITE_BEHIND,
+    SWIPE_WRITE_GROUP,
+    SwipeBufferFullError,
+    SwipeWriteBuffer,
+    read_dead_letters,
+)
+from app.domain.models import NewSwipe, Swipe
+
+
+@pytest.fixture
+def user_and_ideas(database_url: str) -> tuple[UUID, list[UUID]]:
+    with psycopg.connect(database_url, autocommit=True) as conn:
+        user_id = conn.execute(
+            "INSERT INTO users(auth_provider, auth_subject) VALUES ('test', %s) RETURNING id", (uuid.uuid4().hex,)
+        ).fetchone()[0]
+        idea_ids = [
+            r[0]
+            for r in conn.execute(
+                """
+                INSERT INTO ideas(title, short_pitch, category, media_url, one_liner)
+                SELECT 'idea ' || g, 'pitch', 'ai', '', 'one liner' FROM generate_series(1, 5) g
+                RETURNING id
+                """
+            )
+        ]
+    return user_id, idea_ids
+
+
+@asynccontextmanager
+async def _buffered_repo(database_url: str, **buffer_options) -> AsyncIterator[AsyncPostgresSwipeRepository]:
+    async with _running_buffer(database_url, **buffer_options) as (db, seen, buffer):
+        yield AsyncPostgresSwipeRepository(db, seen=seen, buffer=buffer)
+
+
+@asynccontextmanager
+async def _running_buffer(
+    database_url: str, **buffer_options
+) -> AsyncIterator[tuple[AsyncDatabase, SeenIdeaCache, SwipeWriteBuffer]]:
+    db = AsyncDatabase(database_url)
+    await db.open()
+    seen = SeenIdeaCache(db, max_users=10, max_ideas_per_user=100)
+    buffer = SwipeWriteBuffer(db, seen=seen, **buffer_options)
+    buffer.start()
+    try:
+        yield db, seen, buffer
+    finally:
+        await buffer.stop()
+        await db.close()
+
+
+def _swipe(user_id: UUID, idea_id: UUID, direction: str = "vibe") -> Swipe:
+    return Swipe(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        idea_id=idea_id,
+        direction=direction,
+        decision_time_ms=None,
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+def _failing_inserts(monkeypatch: pytest.MonkeyPatch, failures: int | None) -> list[int]:
+    """Make the buffer's first `failures` inserts (all of them if None) raise; returns the attempt counter."""
+    real_insert = swipe_buffer.insert_swipes_async
+    attempts = [0]
+
+    async def insert(cur, swipes):
+        attempts[0] += 1
+        if failures is None or attempts[0] <= failures:
+            raise psycopg.OperationalError("database unavailable")
+        return await real_insert(cur, swipes)
+
+    monkeypatch.setattr(swipe_buffer, "insert_swipes_async", insert)
+    monkeypatch.setattr(swipe_buffer, "_RETRY_SECONDS", 0.01)
+    monkeypatch.setattr(swipe_buffer, "_MAX_RETRY_SECONDS", 0.05)
+    return attempts
+
+
+def _run(body: Callable[[], Awaitable[None]]) -> None:
+    asyncio.run(body())
+
+
+def _stored(database_url: str, user_id: UUID) -> dict[UUID, str]:
+    with psycopg.connect(database_url) as conn:
+        rows = conn.execute("SELECT idea_id, direction::text FROM swipes WHERE user_id = %s", (user_id,)).fetchall()
+    return dict(rows)
+
+
+def test_queued_swipe_is_a_duplicate_on_every_path(database_url: str, user_and_ideas) -> None:
+    user_id, (idea_id, *_) = user_and_ideas
+
+    async def body() -> None:
+        # A long flush interval keeps the first swipe queued while the repeats arrive.
+        async with _buffered_repo(database_url, mode=SWIPE_WRITE_BEHIND, flush_interval=5.0) as swipes:
+            await swipes.create(user_id=user_id, idea_id=idea_id, direction="no_vibe", decision_time_ms=10)
+
+            [result] = await swipes.create_many(
+                user_id=user_id, swipes=[NewSwipe(idea_id=idea_id, direction="vibe")]
+            )
+            assert result.status == "duplicate"
+            with pytest.raises(DuplicateSwipeError):
+                await swipes.create_and_get_next(
+                    user_id=user_id, idea_id=idea_id, direction="vibe", decision_time_ms=None
+                )
+            with pytest.raises(DuplicateSwipeError):
+                await swipes.create(user_id=user_id, idea_id=idea_id, direction="vibe", decision_time_ms=None)
+
+    _run(body)
+    assert _stored(database_url, user_id) == {idea_id: "no_vibe"}
+
+
+def test_batch_and_swipe_and_next_go_through_the_buffer(database_url: str, user_and_ideas) -> None:
+    user_id, (first, second, *_) = user_and_ideas
+
+    async def body() -> None:
+        async with _buffered_repo(database_url, mode=SWIPE_WRITE_BEHIND, flush_interval=5.0) as swipes:
+            results = await swipes.create_many(
+                user_id=user_id,
+                swipes=[NewSwipe(idea_id=first, direction="vibe"), NewSwipe(idea_id=uuid.uuid4(), direction="vibe")],
+            )
+            assert [r.status for r in results] == ["created", "invalid_idea"]
+
+            swipe, card = await swipes.create_and_get_next(
+                user_id=user_id, idea_id=second, direction="no_vibe", decision_time_ms=5
+            )
+            assert swipe.idea_id == second
+            # Both swipes are still queued, and neither idea is served again.
+            assert card is not None and card.idea.id not in (first, second)
+            assert _stored(database_url, user_id) == {}
+
+    _run(body)
+    assert _stored(database_url, user_id) == {first: "vibe", second: "no_vibe"}
+
+
+def test_group_commit_reports_each_outcome(database_url: str, user_and_ideas) -> None:
+    user_id, (stored, first, second, *_) = user_and_ideas
+    with psycopg.connect(database_url) as conn:
+        conn.execute("INSERT INTO swipes(user_id, idea_id, direction) VALUES (%s, %s, 'vibe')", (user_id, stored))
+
+    async def body() -> None:
+        # Long enough for both submits to land in one batch.
+        async with _running_buffer(database_url, mode=SWIPE_WRITE_GROUP, flush_interval=0.2) as (_, _, buffer):
+            batch = [_swipe(user_id, first), _swipe(user_id, stored), _swipe(user_id, uuid.uuid4())]
+            statuses, swipe = await asyncio.gather(
+                buffer.submit_many(batch),
+                buffer.submit(user_id=user_id, idea_id=second, direction="no_vibe", decision_time_ms=7),
+            )
+            assert statuses == ["created", "duplicate", "invalid_idea"]
+            assert swipe.idea_id == second
+            stats = buffer.stats()
+            assert (stats["flushes"], stats["flushed"], stats["rejected"]) == (1, 2, 2)
+
+    _run(body)
+    assert _stored(database_url, user_id) == {stored: "vibe", first: "vibe", second: "no_vibe"}
+
+
+def test_full_buffer_rejects_submits_with_503(
+    database_url: str, user_and_ideas, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    user_id, idea_ids = user_and_ideas
+
+    async def body() -> None:
+        async with _running_buffer(
+            database_url, mode=SWIPE_WRITE_BEHIND, flush_interval=5.0, max_pending=3
+        ) as (_, _, buffer):
+            assert await buffer.submit_many([_swipe(user_id, i) for i in idea_ids[:2]]) == ["created"] * 2
+            # The whole batch is refused, not the part that would overflow.
+            with pytest.raises(SwipeBufferFullError):
+                await buffer.submit_many([_swipe(user_id, i) for i in idea_ids[2:4]])
+            assert buffer.stats()["pending"] == 2
+
+    _run(body)
+    assert set(_stored(database_url, user_id)) == set(idea_ids[:2])
+
+    monkeypatch.setenv("DATABASE_URL", "postgresql://localhost/unused")
+    monkeypatch.setenv("JWT_SECRET", "test-secret")
+    from app.main import create_app
+
+    app = create_app()
+
+    def full() -> None:
+        raise SwipeBufferFullError("Swipe write buffer is full")
+
+    app.add_api_route("/full", full)
+    response = TestClient(app).get("/full")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_stop_drains_queued_swipes(database_url: str, user_and_ideas, monkeypatch: pytest.MonkeyPatch) -> None:
+    user_id, idea_ids = user_and_ideas
+    attempts = _failing_inserts(monkeypatch, failures=3)
+
+    async def body() -> None:
+        async with _running_buffer(
+            database_url, mode=SWIPE_WRITE_BEHIND, flush_interval=5.0, max_batch=2
+        ) as (_, _, buffer):
+            await buffer.submit_many([_swipe(user_id, i) for i in idea_ids])
+            assert _stored(database_url, user_id) == {}
+            await buffer.stop()
+            stats = buffer.stats()
+            assert (stats["pending"], stats["failures"], stats["dropped"]) == (0, 3, 0)
+            assert buffer.pending_idea_ids(user_id) == []
+
+    _run(body)
+    # Three failed attempts, then the five swipes in batches of two.
+    assert attempts[0] == 3 + 3
+    assert set(_stored(database_url, user_id)) == set(idea_ids)
+
+
+def test_flush_retries_then_spools_to_dead_letter(
+    database_url: str, user_and_ideas, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    user_id, idea_ids = user_and_ideas
+    attempts = _failing_inserts(monkeypatch, failures=None)
+    spool = tmp_path / "dead-letters.jsonl"
+    queued = [_swipe(user_id, i) for i in idea_ids[:3]]
+
+    async def body() -> None:
+        async with _running_buffer(
+            database_url, mode=SWIPE_WRITE_BEHIND, flush_interval=0.01, dead_letter_path=str(spool)
+        ) as (_, _, buffer):
+            await buffer.submit_many(queued)
+            while buffer.stats()["dropped"] < len(queued):
+                await asyncio.sleep(0.01)
+            stats = buffer.stats()
+            assert (stats["pending"], stats["dead_lettered"]) == (0, 3)
+            assert stats["failures"] == swipe_buffer._MAX_ATTEMPTS
+            assert buffer.pending_idea_ids(user_id) == []
+
+    _run(body)
+    assert attempts[0] == swipe_buffer._MAX_ATTEMPTS
+    assert read_dead_letters(str(spool)) == queued
+    assert _stored(database_url, user_id) == {}
+
+    # Once the database is back, the replay script stores them under their original ids.
+    from scripts import replay_swipe_dead_letters
+
+    monkeypatch.setattr(sys, "argv", ["replay", str(spool), "--dsn", database_url])
+    replay_swipe_dead_letters.main()
+    assert not spool.exists()
+    with psycopg.connect(database_url) as conn:
+        ids = {r[0] for r in conn.execute("SELECT id FROM swipes WHERE user_id = %s", (user_id,))}
+    assert ids == {swipe.id for swipe in queued}
+
+
+def test_stop_spools_what_the_drain_deadline_leaves(
+    database_url: str, user_and_ideas, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    user_id, idea_ids = user_and_ideas
+    _failing_inserts(monkeypatch, failures=None)
+    spool = tmp_path / "dead-letters.jsonl"
+    queued = [_swipe(user_id, i) for i in idea_ids]
+
+    async def body() -> None:
+        async with _running_buffer(
+            database_url,
+            mode=SWIPE_WRITE_BEHIND,
+            flush_interval=5.0,
+            max_batch=2,
+            drain_timeout=0.2,
+            dead_letter_path=str(spool),
+        ) as (_, _, buffer):
+            await buffer.submit_many(queued)
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            await buffer.stop()
+            assert loop.time() - started < 1.0
+            stats = buffer.stats()
+            assert (stats["pending"], stats["dropped"], stats["dead_lettered"]) == (0, 5, 5)
+
+    _run(body)
+    assert read_dead_letters(str(spool)) == queued
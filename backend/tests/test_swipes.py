@@ -0,0 +1,186 @@
+"""Batch swipes: per-item outcomes, the seen-set, the write buffer and client timestamps."""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import psycopg
+import pytest
+from pydantic import ValidationError
+
+from app.api.routes.swipes import QueuedSwipeRequest
+from app.data.db import AsyncDatabase
+from app.data.repositories.swipes import AsyncPostgresSwipeRepository
+from app.data.seen_ideas import SeenIdeaCache
+from app.data.swipe_buffer import SWIPE_WRITE_BEHIND, SwipeWriteBuffer
+from app.domain.models import NewSwipe
+
+
+@pytest.fixture
+def user_and_ideas(database_url: str) -> tuple[UUID, list[UUID]]:
+    """A user with one stored swipe, on the first of five ideas."""
+    with psycopg.connect(database_url, autocommit=True) as conn:
+        user_id = conn.execute(
+            "INSERT INTO users(auth_provider, auth_subject) VALUES ('test', %s) RETURNING id", (uuid.uuid4().hex,)
+        ).fetchone()[0]
+        idea_ids = [
+            r[0]
+            for r in conn.execute(
+                """
+                INSERT INTO ideas(title, short_pitch, category, media_url, one_liner)
+                SELECT 'idea ' || g, 'pitch', 'ai', '', 'one liner' FROM generate_series(1, 5) g
+                RETURNING id
+                """
+            )
+        ]
+        conn.execute("INSERT INTO swipes(user_id, idea_id, direction) VALUES (%s, %s, 'vibe')", (user_id, idea_ids[0]))
+    return user_id, idea_ids
+
+
+@asynccontextmanager
+async def _repo(
+    database_url: str, *, seen: bool = True, buffered: bool = False
+) -> AsyncIterator[tuple[AsyncDatabase, SeenIdeaCache | None, AsyncPostgresSwipeRepository]]:
+    db = AsyncDatabase(database_url)
+    await db.open()
+    seen_ideas = SeenIdeaCache(db, max_users=10, max_ideas_per_user=100) if seen or buffered else None
+    buffer = None
+    if buffered:
+        buffer = SwipeWriteBuffer(db, seen=seen_ideas, mode=SWIPE_WRITE_BEHIND, flush_interval=5.0)
+        buffer.start()
+    try:
+        yield db, seen_ideas, AsyncPostgresSwipeRepository(db, seen=seen_ideas, buffer=buffer)
+    finally:
+        if buffer is not None:
+            await buffer.stop()
+        await db.close()
+
+
+def _stored(database_url: str, user_id: UUID) -> dict[UUID, tuple[str, datetime]]:
+    with psycopg.connect(database_url) as conn:
+        rows = conn.execute(
+            "SELECT idea_id, direction::text, created_at FROM swipes WHERE user_id = %s", (user_id,)
+        ).fetchall()
+    return {idea_id: (direction, created_at) for idea_id, direction, created_at in rows}
+
+
+def test_create_many_reports_each_outcome_in_order(database_url: str, user_and_ideas) -> None:
+    user_id, (stored, first, second, *_) = user_and_ideas
+    unknown = uuid.uuid4()
+
+    async def body() -> None:
+        # Without a seen-set the stored swipe is only caught by the insert itself.
+        async with _repo(database_url, seen=False) as (_, _, swipes):
+            results = await swipes.create_many(
+                user_id=user_id,
+                swipes=[
+                    NewSwipe(idea_id=first, direction="vibe", decision_time_ms=40),
+                    NewSwipe(idea_id=stored, direction="no_vibe"),
+                    NewSwipe(idea_id=unknown, direction="vibe"),
+                    NewSwipe(idea_id=first, direction="no_vibe"),
+                    NewSwipe(idea_id=second, direction="no_vibe"),
+                ],
+            )
+            assert [(r.idea_id, r.status) for r in results] == [
+                (first, "created"),
+                (stored, "duplicate"),
+                (unknown, "invalid_idea"),
+                (first, "duplicate"),
+                (second, "created"),
+            ]
+            assert results[0].swipe is not None and results[0].swipe.decision_time_ms == 40
+            assert [r.swipe for r in results[1:4]] == [None, None, None]
+
+    asyncio.run(body())
+    stored_swipes = _stored(database_url, user_id)
+    # The repeat within the batch did not overwrite the first swipe.
+    assert {idea_id: direction for idea_id, (direction, _) in stored_swipes.items()} == {
+        stored: "vibe",
+        first: "vibe",
+        second: "no_vibe",
+    }
+
+
+def test_create_many_answers_seen_ideas_without_a_query(database_url: str, user_and_ideas) -> None:
+    user_id, (stored, first, *_) = user_and_ideas
+    unknown = uuid.uuid4()
+
+    async def body() -> None:
+        async with _repo(database_url) as (db, seen, swipes):
+            await seen.warm_async(user_id)
+            before = db.pool().get_stats()["requests_num"]
+            [result] = await swipes.create_many(user_id=user_id, swipes=[NewSwipe(idea_id=stored, direction="vibe")])
+            assert result.status == "duplicate"
+            assert db.pool().get_stats()["requests_num"] == before
+
+            results = await swipes.create_many(
+                user_id=user_id,
+                swipes=[NewSwipe(idea_id=first, direction="vibe"), NewSwipe(idea_id=unknown, direction="vibe")],
+            )
+            assert [r.status for r in results] == ["created", "invalid_idea"]
+            # Created swipes join the seen-set; an unknown idea does not.
+            assert await seen.contains_async(user_id, first)
+            assert not await seen.contains_async(user_id, unknown)
+
+    asyncio.run(body())
+
+
+def test_create_many_keeps_a_recent_client_time_and_clamps_the_rest(database_url: str, user_and_ideas) -> None:
+    user_id, (_, recent, future, stale, unset) = user_and_ideas
+    now = datetime.now(timezone.utc)
+
+    async def body() -> None:
+        async with _repo(database_url) as (_, _, swipes):
+            results = await swipes.create_many(
+                user_id=user_id,
+                swipes=[
+                    NewSwipe(idea_id=recent, direction="vibe", swiped_at=now - timedelta(minutes=5)),
+                    NewSwipe(idea_id=future, direction="vibe", swiped_at=now + timedelta(hours=1)),
+                    NewSwipe(idea_id=stale, direction="vibe", swiped_at=now - timedelta(days=2)),
+                    NewSwipe(idea_id=unset, direction="vibe"),
+                ],
+            )
+            assert [r.status for r in results] == ["created"] * 4
+
+    asyncio.run(body())
+    after = datetime.now(timezone.utc)
+    created = {idea_id: created_at for idea_id, (_, created_at) in _stored(database_url, user_id).items()}
+    assert created[recent] == now - timedelta(minutes=5)
+    assert now <= created[future] <= after
+    assert now - timedelta(minutes=30) <= created[stale] <= after - timedelta(minutes=30)
+    assert now <= created[unset] <= after
+
+
+def test_buffered_create_many_flushes_client_times(database_url: str, user_and_ideas) -> None:
+    user_id, (stored, first, *_) = user_and_ideas
+    swiped_at = datetime.now(timezone.utc) - timedelta(minutes=10)
+
+    async def body() -> None:
+        async with _repo(database_url, buffered=True) as (_, _, swipes):
+            results = await swipes.create_many(
+                user_id=user_id,
+                swipes=[
+                    NewSwipe(idea_id=first, direction="no_vibe", swiped_at=swiped_at),
+                    NewSwipe(idea_id=stored, direction="vibe"),
+                ],
+            )
+            assert [r.status for r in results] == ["created", "duplicate"]
+            assert first not in _stored(database_url, user_id)
+
+    # Stopping the buffer flushes the queued swipe with the client's time.
+    asyncio.run(body())
+    assert _stored(database_url, user_id)[first] == ("no_vibe", swiped_at)
+
+
+def test_queued_swipe_request_needs_a_timezone() -> None:
+    idea_id = uuid.uuid4()
+    item = QueuedSwipeRequest(idea_id=idea_id, direction="vibe", swiped_at="2026-01-02T03:04:05+02:00")
+    assert item.swiped_at == datetime(2026, 1, 2, 1, 4, 5, tzinfo=timezone.utc)
+    assert QueuedSwipeRequest(idea_id=idea_id, direction="vibe").swiped_at is None
+    with pytest.raises(ValidationError):
+        QueuedSwipeRequest(idea_id=idea_id, direction="vibe", swiped_at="2026-01-02T03:04:05")